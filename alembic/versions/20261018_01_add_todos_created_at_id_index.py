@@ -0,0 +1,28 @@
+"""add composite created_at/id index for keyset pagination
+
+Revision ID: 20261018_01
+Revises: 20260223_03
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+revision: str = "20261018_01"
+down_revision: str | None = "20260223_03"
+branch_labels: Sequence[str] | None = None
+depends_on: Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # The composite index serves both the list ordering and the keyset seek, so the
+    # single-column created_at index becomes redundant.
+    op.create_index("ix_todos_created_at_id", "todos", ["created_at", "id"], unique=False)
+    op.drop_index("ix_todos_created_at", table_name="todos")
+
+
+def downgrade() -> None:
+    op.create_index("ix_todos_created_at", "todos", ["created_at"], unique=False)
+    op.drop_index("ix_todos_created_at_id", table_name="todos")
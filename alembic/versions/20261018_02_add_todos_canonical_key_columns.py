@@ -0,0 +1,92 @@
+"""add canonical title/category columns with a unique index
+
+Revision ID: 20261018_02
+Revises: 20261018_01
+Create Date: 2026-10-18 10:00:00.000000
+
+Backfill: existing rows are canonicalized in id-ordered batches before the columns become
+NOT NULL. The unique index creation fails if the table already holds rows that only differ by
+case or whitespace; resolve those before upgrading.
+
+"""
+
+import re
+from collections.abc import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "20261018_02"
+down_revision: str | None = "20261018_01"
+branch_labels: Sequence[str] | None = None
+depends_on: Sequence[str] | None = None
+
+BACKFILL_BATCH_SIZE = 1000
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def _canonicalize(value: str) -> str:
+    # Frozen copy of app.core.normalization.canonicalize_text as of this revision.
+    return _WHITESPACE_PATTERN.sub(" ", value.strip()).casefold()
+
+
+def upgrade() -> None:
+    op.add_column("todos", sa.Column("title_canonical", sa.String(length=400), nullable=True))
+    op.add_column("todos", sa.Column("category_canonical", sa.String(length=100), nullable=True))
+
+    todos = sa.table(
+        "todos",
+        sa.column("id", sa.BigInteger()),
+        sa.column("title", sa.String()),
+        sa.column("category", sa.String()),
+        sa.column("title_canonical", sa.String()),
+        sa.column("category_canonical", sa.String()),
+    )
+    backfill = (
+        sa.update(todos)
+        .where(todos.c.id == sa.bindparam("row_id"))
+        .values(
+            title_canonical=sa.bindparam("row_title_canonical"),
+            category_canonical=sa.bindparam("row_category_canonical"),
+        )
+    )
+
+    connection = op.get_bind()
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(todos.c.id, todos.c.title, todos.c.category)
+            .where(todos.c.id > last_id)
+            .order_by(todos.c.id)
+            .limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+
+        connection.execute(
+            backfill,
+            [
+                {
+                    "row_id": row.id,
+                    "row_title_canonical": _canonicalize(row.title),
+                    "row_category_canonical": _canonicalize(row.category),
+                }
+                for row in rows
+            ],
+        )
+        last_id = rows[-1].id
+
+    op.alter_column("todos", "title_canonical", existing_type=sa.String(length=400), nullable=False)
+    op.alter_column("todos", "category_canonical", existing_type=sa.String(length=100), nullable=False)
+    op.create_index(
+        "uq_todos_title_category_canonical",
+        "todos",
+        ["title_canonical", "category_canonical"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_todos_title_category_canonical", table_name="todos")
+    op.drop_column("todos", "category_canonical")
+    op.drop_column("todos", "title_canonical")
@@ -0,0 +1,40 @@
+"""add composite indexes for filtered and sorted todo listing
+
+Revision ID: 20261018_03
+Revises: 20261018_02
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+revision: str = "20261018_03"
+down_revision: str | None = "20261018_02"
+branch_labels: Sequence[str] | None = None
+depends_on: Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # Each index leads with the equality filter and ends in the keyset order, so a filtered page
+    # is a single range scan. updated_at/id serves the updated_* sorts and updated_since.
+    op.create_index(
+        "ix_todos_is_completed_created_at_id",
+        "todos",
+        ["is_completed", "created_at", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_todos_category_canonical_created_at_id",
+        "todos",
+        ["category_canonical", "created_at", "id"],
+        unique=False,
+    )
+    op.create_index("ix_todos_updated_at_id", "todos", ["updated_at", "id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_todos_updated_at_id", table_name="todos")
+    op.drop_index("ix_todos_category_canonical_created_at_id", table_name="todos")
+    op.drop_index("ix_todos_is_completed_created_at_id", table_name="todos")
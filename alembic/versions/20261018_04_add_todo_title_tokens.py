@@ -0,0 +1,82 @@
+"""add todo_title_tokens inverted index for title search
+
+Revision ID: 20261018_04
+Revises: 20261018_03
+Create Date: 2026-10-18 19:00:00.000000
+
+Backfill: existing titles are tokenized in id-ordered batches.
+
+"""
+
+import re
+from collections.abc import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "20261018_04"
+down_revision: str | None = "20261018_03"
+branch_labels: Sequence[str] | None = None
+depends_on: Sequence[str] | None = None
+
+BACKFILL_BATCH_SIZE = 1000
+SEARCH_TOKEN_MAX_LENGTH = 100
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def _tokenize(value: str) -> list[str]:
+    # Frozen copy of app.core.normalization.tokenize_text as of this revision.
+    canonical = _WHITESPACE_PATTERN.sub(" ", value.strip()).casefold()
+    return list(dict.fromkeys(token[:SEARCH_TOKEN_MAX_LENGTH] for token in _TOKEN_PATTERN.findall(canonical)))
+
+
+def upgrade() -> None:
+    todo_title_tokens = op.create_table(
+        "todo_title_tokens",
+        sa.Column("token", sa.String(length=100), nullable=False),
+        sa.Column("todo_id", sa.BigInteger(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=False), nullable=False),
+        sa.ForeignKeyConstraint(["todo_id"], ["todos.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("token", "todo_id"),
+    )
+    op.create_index("ix_todo_title_tokens_todo_id", "todo_title_tokens", ["todo_id"], unique=False)
+    op.create_index(
+        "ix_todo_title_tokens_token_created_at_todo_id",
+        "todo_title_tokens",
+        ["token", "created_at", "todo_id"],
+        unique=False,
+    )
+
+    todos = sa.table(
+        "todos",
+        sa.column("id", sa.BigInteger()),
+        sa.column("title", sa.String()),
+        sa.column("created_at", sa.DateTime()),
+    )
+    connection = op.get_bind()
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(todos.c.id, todos.c.title, todos.c.created_at)
+            .where(todos.c.id > last_id)
+            .order_by(todos.c.id)
+            .limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+
+        token_rows = [
+            {"token": token, "todo_id": row.id, "created_at": row.created_at}
+            for row in rows
+            for token in _tokenize(row.title)
+        ]
+        if token_rows:
+            connection.execute(sa.insert(todo_title_tokens), token_rows)
+        last_id = rows[-1].id
+
+
+def downgrade() -> None:
+    op.drop_index("ix_todo_title_tokens_token_created_at_todo_id", table_name="todo_title_tokens")
+    op.drop_index("ix_todo_title_tokens_todo_id", table_name="todo_title_tokens")
+    op.drop_table("todo_title_tokens")
@@ -0,0 +1,45 @@
+"""add todo_category_stats summary table
+
+Revision ID: 20261018_05
+Revises: 20261018_04
+Create Date: 2026-10-18 20:00:00.000000
+
+Backfill: counters are computed from todos in a single INSERT ... SELECT.
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "20261018_05"
+down_revision: str | None = "20261018_04"
+branch_labels: Sequence[str] | None = None
+depends_on: Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    todo_category_stats = op.create_table(
+        "todo_category_stats",
+        sa.Column("category_canonical", sa.String(length=100), nullable=False),
+        sa.Column("total", sa.Integer(), nullable=False),
+        sa.Column("completed", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("category_canonical"),
+    )
+
+    todos = sa.table("todos", sa.column("category_canonical", sa.String()), sa.column("is_completed", sa.Boolean()))
+    op.execute(
+        sa.insert(todo_category_stats).from_select(
+            ["category_canonical", "total", "completed"],
+            sa.select(
+                todos.c.category_canonical,
+                sa.func.count(),
+                sa.func.sum(sa.case((todos.c.is_completed == sa.true(), 1), else_=0)),
+            ).group_by(todos.c.category_canonical),
+        )
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("todo_category_stats")
@@ -0,0 +1,67 @@
+"""add change sequence, tombstones and change_seq column for the todo change feed
+
+Revision ID: 20261018_06
+Revises: 20261018_05
+Create Date: 2026-10-18 21:00:00.000000
+
+Existing rows get change_seq 0, so they are served by an initial sync and by no later one.
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "20261018_06"
+down_revision: str | None = "20261018_05"
+branch_labels: Sequence[str] | None = None
+depends_on: Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column("todos", sa.Column("change_seq", sa.BigInteger(), nullable=False, server_default=sa.text("0")))
+    op.create_index("ix_todos_change_seq_id", "todos", ["change_seq", "id"], unique=False)
+
+    todo_change_sequence = op.create_table(
+        "todo_change_sequence",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("last_seq", sa.BigInteger(), nullable=False),
+        sa.Column("compacted_seq", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.bulk_insert(todo_change_sequence, [{"id": 1, "last_seq": 0, "compacted_seq": 0}])
+
+    op.create_table(
+        "todo_tombstones",
+        sa.Column("todo_id", sa.BigInteger(), nullable=False),
+        sa.Column("change_seq", sa.BigInteger(), nullable=False),
+        sa.Column("deleted_at", sa.DateTime(timezone=False), nullable=False),
+        sa.PrimaryKeyConstraint("todo_id"),
+    )
+    op.create_index(
+        "ix_todo_tombstones_change_seq_todo_id", "todo_tombstones", ["change_seq", "todo_id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_todo_tombstones_change_seq_todo_id", table_name="todo_tombstones")
+    op.drop_table("todo_tombstones")
+    op.drop_table("todo_change_sequence")
+    op.drop_index("ix_todos_change_seq_id", table_name="todos")
+    op.execute(
+        """
+        DECLARE @df_name NVARCHAR(128);
+        SELECT @df_name = dc.name
+        FROM sys.default_constraints dc
+        JOIN sys.columns c
+            ON c.default_object_id = dc.object_id
+        JOIN sys.tables t
+            ON t.object_id = c.object_id
+        WHERE t.name = 'todos' AND c.name = 'change_seq';
+
+        IF @df_name IS NOT NULL
+            EXEC('ALTER TABLE todos DROP CONSTRAINT [' + @df_name + ']');
+        """
+    )
+    op.drop_column("todos", "change_seq")
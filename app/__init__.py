@@ -1 +1,6 @@
 """Backend application package."""
+
+import time
+
+# Taken before any submodule is imported, so app.main can report how long its imports took.
+IMPORT_STARTED_AT = time.perf_counter()
@@ -0,0 +1,79 @@
+from collections.abc import AsyncGenerator
+
+import anyio
+from fastapi import Depends, Query, Request
+from fastapi.exceptions import RequestValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.cache import ResponseCache, get_response_cache
+from app.core.config import Settings
+from app.core.database import Database, get_async_db_session, get_db_session
+from app.core.events import EventBroker, get_event_broker
+from app.services.async_todo_service import AsyncTodoService
+
+
+def get_app_settings(request: Request) -> Settings:
+    return request.app.state.settings
+
+
+def get_page_limit(
+    limit: int | None = Query(default=None, ge=1),
+    settings: Settings = Depends(get_app_settings),
+) -> int:
+    # Bounds come from the app's settings, which are only known per request, not at import.
+    if limit is None:
+        return settings.TODO_PAGE_SIZE_DEFAULT
+    if limit > settings.TODO_PAGE_SIZE_MAX:
+        raise RequestValidationError(
+            [
+                {
+                    "type": "less_than_equal",
+                    "loc": ("query", "limit"),
+                    "msg": f"Input should be less than or equal to {settings.TODO_PAGE_SIZE_MAX}",
+                    "input": limit,
+                    "ctx": {"le": settings.TODO_PAGE_SIZE_MAX},
+                }
+            ]
+        )
+    return limit
+
+
+def get_threaded_todo_service(
+    db_session: Session = Depends(get_db_session),
+    response_cache: ResponseCache | None = Depends(get_response_cache),
+    event_broker: EventBroker = Depends(get_event_broker),
+) -> AsyncTodoService:
+    return AsyncTodoService.from_session(db_session, response_cache, event_broker)
+
+
+def get_async_driver_todo_service(
+    db_session: AsyncSession = Depends(get_async_db_session),
+    response_cache: ResponseCache | None = Depends(get_response_cache),
+    event_broker: EventBroker = Depends(get_event_broker),
+) -> AsyncTodoService:
+    return AsyncTodoService.from_async_session(db_session, response_cache, event_broker)
+
+
+async def get_todo_service(
+    request: Request,
+    response_cache: ResponseCache | None = Depends(get_response_cache),
+    event_broker: EventBroker = Depends(get_event_broker),
+) -> AsyncGenerator[AsyncTodoService, None]:
+    """The service on the driver the app was created with: async, or sync sessions in worker threads.
+
+    Chosen per request from `app.state`, so `create_app(settings)` decides it rather than whatever
+    settings were current when this module was imported.
+    """
+    database: Database = request.app.state.database
+    if database.settings.DATABASE_ASYNC_ENABLED:
+        async with database.async_session() as async_session:
+            yield AsyncTodoService.from_async_session(async_session, response_cache, event_broker)
+        return
+
+    db_session = database.session()
+    try:
+        yield AsyncTodoService.from_session(db_session, response_cache, event_broker)
+    finally:
+        # Closing hands the connection back to the pool (a rollback); keep it off the event loop.
+        await anyio.to_thread.run_sync(db_session.close)
@@ -1,39 +1,358 @@
-from fastapi import APIRouter, Depends, status
-from sqlalchemy.orm import Session
+import csv
+import dataclasses
+import io
+import json
+from collections.abc import AsyncIterable, AsyncIterator
+from datetime import datetime
+from typing import Annotated, Any, Literal
 
-from app.core.database import get_db_session
-from app.schemas.todo import TodoCreateRequest, TodoResponse, TodoUpdateRequest
-from app.services.todo_service import TodoService
+from fastapi import APIRouter, Body, Depends, Header, Path, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+
+from app.api.v1.dependencies import get_app_settings, get_page_limit, get_todo_service
+from app.core.cache import CachedResponse
+from app.core.config import Settings
+from app.core.errors import TodoValidationError
+from app.core.etags import etag_matches, todo_etag, todo_page_etag
+from app.core.events import EventBroker, EventSubscription, TodoEvent, get_event_broker
+from app.core.pagination import DEFAULT_TODO_SORT, MAX_ROW_INT, TodoSort
+from app.models.todo import Todo
+from app.schemas.todo import (
+    TODO_BATCH_MAX_ITEMS,
+    TODO_LIST_ADAPTER,
+    TodoBatchCreateResponse,
+    TodoBatchItemError,
+    TodoBatchItemResult,
+    TodoBulkDeleteRequest,
+    TodoBulkResult,
+    TodoBulkUpdateRequest,
+    TodoCategoryStatsResponse,
+    TodoChangesResponse,
+    TodoCreateRequest,
+    TodoImportJobResponse,
+    TodoResponse,
+    TodoStatsResponse,
+    TodoUpdateRequest,
+)
+from app.services.async_todo_service import AsyncTodoService
+from app.services.todo_import import ImportFormat, ImportJobRegistry, get_import_jobs, run_import
+from app.services.todo_service import TodoBatchItemOutcome, TodoListQuery, TodoPage
 
 router = APIRouter(prefix="/todos", tags=["todos"])
 
+EXPORT_CSV_COLUMNS = ("id", "title", "category", "is_completed", "created_at", "updated_at")
+
+
+async def _iter_ndjson(chunks: AsyncIterable[list[Todo]]) -> AsyncIterator[bytes]:
+    async for chunk in chunks:
+        yield b"".join(
+            TodoResponse.model_validate(todo).model_dump_json().encode("utf-8") + b"\n" for todo in chunk
+        )
+
+
+async def _iter_csv(chunks: AsyncIterable[list[Todo]]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+
+    writer.writerow(EXPORT_CSV_COLUMNS)
+    yield buffer.getvalue().encode("utf-8")
+
+    async for chunk in chunks:
+        buffer.seek(0)
+        buffer.truncate()
+        for todo in chunk:
+            row = TodoResponse.model_validate(todo).model_dump(mode="json")
+            writer.writerow([row[column] for column in EXPORT_CSV_COLUMNS])
+        yield buffer.getvalue().encode("utf-8")
+
+
+def _format_event(event: TodoEvent) -> bytes:
+    return f"id: {event.change_seq}\nevent: {event.type}\ndata: {json.dumps(event.data)}\n\n".encode("utf-8")
+
+
+async def _iter_events(
+    broker: EventBroker, subscription: EventSubscription, *, heartbeat_seconds: float
+) -> AsyncIterator[bytes]:
+    try:
+        yield b"retry: 3000\n\n"
+        while True:
+            event = await subscription.get(timeout=heartbeat_seconds)
+            if event is not None:
+                yield _format_event(event)
+            elif subscription.evicted:
+                # The client reconnects and catches up through GET /todos/changes.
+                yield b"event: evicted\ndata: {}\n\n"
+                return
+            else:
+                # Keeps proxies from closing an idle stream.
+                yield b": keepalive\n\n"
+    finally:
+        broker.unsubscribe(subscription)
+
+
+def _not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"etag": etag})
+
 
 @router.post("", response_model=TodoResponse, status_code=status.HTTP_201_CREATED)
-def create_todo(payload: TodoCreateRequest, db_session: Session = Depends(get_db_session)) -> TodoResponse:
-    todo_service = TodoService(db_session)
-    todo = todo_service.create_todo(payload)
+async def create_todo(
+    response: Response,
+    payload: TodoCreateRequest,
+    todo_service: AsyncTodoService = Depends(get_todo_service),
+) -> TodoResponse:
+    todo = await todo_service.create_todo(payload)
+    response.headers["etag"] = todo_etag(todo)
     return TodoResponse.model_validate(todo)
 
 
+def _to_batch_result(index: int, outcome: TodoBatchItemOutcome) -> TodoBatchItemResult:
+    return TodoBatchItemResult(
+        index=index,
+        status=outcome.status,
+        todo=TodoResponse.model_validate(outcome.todo) if outcome.todo is not None else None,
+        error=(
+            TodoBatchItemError(code=outcome.error.code, message=outcome.error.message)
+            if outcome.error is not None
+            else None
+        ),
+    )
+
+
+def _validate_batch_item(item: Any) -> TodoCreateRequest | TodoBatchItemOutcome:
+    if not isinstance(item, dict):
+        return TodoBatchItemOutcome(status="invalid", error=TodoValidationError("Each item must be a JSON object"))
+    try:
+        return TodoCreateRequest.model_validate(item)
+    except ValidationError as error:
+        first = error.errors()[0]
+        field = ".".join(str(part) for part in first["loc"])
+        reason = str(first["ctx"]["error"]) if first["type"] == "value_error" else first["msg"]
+        message = f"{field}: {reason}" if field else reason
+        return TodoBatchItemOutcome(status="invalid", error=TodoValidationError(message))
+
+
+@router.post(":batch", response_model=TodoBatchCreateResponse, status_code=status.HTTP_200_OK)
+async def create_todos_batch(
+    payload: Annotated[list[Any], Body(min_length=1, max_length=TODO_BATCH_MAX_ITEMS)],
+    todo_service: AsyncTodoService = Depends(get_todo_service),
+) -> TodoBatchCreateResponse:
+    # Items are validated one by one, so a bad item is reported as "invalid" instead of failing
+    # the whole batch with 422; only the valid ones reach the service.
+    validated = [_validate_batch_item(item) for item in payload]
+    created = iter(
+        await todo_service.create_todos_batch([item for item in validated if isinstance(item, TodoCreateRequest)])
+    )
+    outcomes = [next(created) if isinstance(item, TodoCreateRequest) else item for item in validated]
+    results = [_to_batch_result(index, outcome) for index, outcome in enumerate(outcomes)]
+    return TodoBatchCreateResponse(
+        created=sum(1 for result in results if result.status == "created"),
+        duplicates=sum(1 for result in results if result.status == "duplicate"),
+        invalid=sum(1 for result in results if result.status == "invalid"),
+        results=results,
+    )
+
+
+@router.post(":import", response_model=TodoImportJobResponse, status_code=status.HTTP_200_OK)
+async def import_todos(
+    request: Request,
+    import_format: ImportFormat = Query(alias="format"),
+    # Chosen by the client so it can poll GET /todos/imports/{job_id} while the upload is running.
+    job_id: str | None = Query(default=None, pattern=r"^[A-Za-z0-9_-]{1,64}$"),
+    todo_service: AsyncTodoService = Depends(get_todo_service),
+    import_jobs: ImportJobRegistry = Depends(get_import_jobs),
+    settings: Settings = Depends(get_app_settings),
+) -> TodoImportJobResponse:
+    # The raw body is consumed as it arrives (no multipart spooling), one chunk of rows at a time.
+    job = import_jobs.start(import_format=import_format, max_errors=settings.TODO_IMPORT_MAX_ERRORS, job_id=job_id)
+    await run_import(job, request.stream(), todo_service=todo_service, chunk_size=settings.TODO_IMPORT_CHUNK_SIZE)
+    return TodoImportJobResponse.model_validate(job)
+
+
+@router.get("/imports/{job_id}", response_model=TodoImportJobResponse, status_code=status.HTTP_200_OK)
+async def get_import_job(
+    job_id: str,
+    import_jobs: ImportJobRegistry = Depends(get_import_jobs),
+) -> TodoImportJobResponse:
+    return TodoImportJobResponse.model_validate(import_jobs.get(job_id))
+
+
+@router.patch(":bulk", response_model=TodoBulkResult, status_code=status.HTTP_200_OK)
+async def update_todos_bulk(
+    payload: TodoBulkUpdateRequest,
+    todo_service: AsyncTodoService = Depends(get_todo_service),
+) -> TodoBulkResult:
+    affected = await todo_service.update_todos_bulk(payload)
+    return TodoBulkResult(affected=affected)
+
+
+@router.delete(":bulk", response_model=TodoBulkResult, status_code=status.HTTP_200_OK)
+async def delete_todos_bulk(
+    payload: TodoBulkDeleteRequest,
+    todo_service: AsyncTodoService = Depends(get_todo_service),
+) -> TodoBulkResult:
+    affected = await todo_service.delete_todos_bulk(payload)
+    return TodoBulkResult(affected=affected)
+
+
+def serialize_todo_list(todos: list[Todo]) -> bytes:
+    return TODO_LIST_ADAPTER.dump_json(TODO_LIST_ADAPTER.validate_python(todos, from_attributes=True))
+
+
+def _render_todo_page(page: TodoPage, etag: str) -> CachedResponse:
+    headers = {"etag": etag}
+    if page.next_cursor is not None:
+        headers["x-next-cursor"] = page.next_cursor
+    return CachedResponse(body=serialize_todo_list(page.items), headers=headers)
+
+
 @router.get("", response_model=list[TodoResponse], status_code=status.HTTP_200_OK)
-def list_todos(db_session: Session = Depends(get_db_session)) -> list[TodoResponse]:
-    todo_service = TodoService(db_session)
-    todos = todo_service.list_todos()
-    return [TodoResponse.model_validate(todo) for todo in todos]
+async def list_todos(
+    limit: int = Depends(get_page_limit),
+    cursor: str | None = Query(default=None),
+    category: str | None = Query(default=None),
+    is_completed: bool | None = Query(default=None),
+    created_after: datetime | None = Query(default=None),
+    created_before: datetime | None = Query(default=None),
+    updated_since: datetime | None = Query(default=None),
+    sort: TodoSort = Query(default=DEFAULT_TODO_SORT),
+    if_none_match: str | None = Header(default=None),
+    todo_service: AsyncTodoService = Depends(get_todo_service),
+) -> Response:
+    query = TodoListQuery(
+        category=category,
+        is_completed=is_completed,
+        created_after=created_after,
+        created_before=created_before,
+        updated_since=updated_since,
+        sort=sort,
+    )
+    response_cache = todo_service.response_cache
+    cache_key = None
+    if response_cache is not None:
+        # The key pins the collection version before the query runs; see ResponseCache.
+        cache_key, cached = await response_cache.lookup(
+            "todos:list", limit=limit, cursor=cursor, **dataclasses.asdict(query)
+        )
+        if cached is not None:
+            cached_etag = cached.headers.get("etag")
+            if cached_etag is not None and etag_matches(if_none_match, cached_etag):
+                return _not_modified(cached_etag)
+            return Response(cached.body, media_type="application/json", headers=cached.headers)
+
+    page = await todo_service.list_todo_page(limit=limit, cursor=cursor, query=query)
+    etag = todo_page_etag(page.items, page.next_cursor)
+    if etag_matches(if_none_match, etag):
+        return _not_modified(etag)
+
+    rendered = _render_todo_page(page, etag)
+    if cache_key is not None:
+        await response_cache.store(cache_key, rendered)
+    return Response(rendered.body, media_type="application/json", headers=rendered.headers)
+
+
+@router.get("/search", response_model=list[TodoResponse], status_code=status.HTTP_200_OK)
+async def search_todos(
+    q: str = Query(min_length=1, max_length=200),
+    limit: int = Depends(get_page_limit),
+    cursor: str | None = Query(default=None),
+    todo_service: AsyncTodoService = Depends(get_todo_service),
+) -> Response:
+    page = await todo_service.search_todos(q=q, limit=limit, cursor=cursor)
+    headers = {"x-next-cursor": page.next_cursor} if page.next_cursor is not None else None
+    return Response(serialize_todo_list(page.items), media_type="application/json", headers=headers)
+
+
+@router.get("/events", status_code=status.HTTP_200_OK)
+async def stream_todo_events(
+    broker: EventBroker = Depends(get_event_broker),
+    settings: Settings = Depends(get_app_settings),
+) -> StreamingResponse:
+    # No database dependency: a stream can stay open for hours without holding a connection.
+    return StreamingResponse(
+        _iter_events(broker, broker.subscribe(), heartbeat_seconds=settings.TODO_EVENTS_HEARTBEAT_SECONDS),
+        media_type="text/event-stream",
+        headers={"cache-control": "no-cache", "x-accel-buffering": "no"},
+    )
+
+
+@router.get("/changes", response_model=TodoChangesResponse, status_code=status.HTTP_200_OK)
+async def list_todo_changes(
+    since: str | None = Query(default=None),
+    limit: int = Depends(get_page_limit),
+    todo_service: AsyncTodoService = Depends(get_todo_service),
+) -> TodoChangesResponse:
+    return TodoChangesResponse.model_validate(await todo_service.list_changes(since=since, limit=limit))
+
+
+@router.get("/stats", response_model=TodoStatsResponse, status_code=status.HTTP_200_OK)
+async def get_todo_stats(todo_service: AsyncTodoService = Depends(get_todo_service)) -> TodoStatsResponse:
+    categories = [
+        TodoCategoryStatsResponse(
+            category=stats.category_canonical,
+            total=stats.total,
+            completed=stats.completed,
+            open=stats.total - stats.completed,
+        )
+        for stats in await todo_service.get_category_stats()
+    ]
+    total = sum(category.total for category in categories)
+    completed = sum(category.completed for category in categories)
+    return TodoStatsResponse(total=total, completed=completed, open=total - completed, categories=categories)
+
+
+@router.get("/export", status_code=status.HTTP_200_OK)
+async def export_todos(
+    export_format: Literal["ndjson", "csv"] = Query(default="ndjson", alias="format"),
+    todo_service: AsyncTodoService = Depends(get_todo_service),
+    settings: Settings = Depends(get_app_settings),
+) -> StreamingResponse:
+    chunks = todo_service.export_todos(chunk_size=settings.TODO_EXPORT_CHUNK_SIZE)
+
+    if export_format == "csv":
+        return StreamingResponse(
+            _iter_csv(chunks),
+            media_type="text/csv",
+            headers={"content-disposition": 'attachment; filename="todos.csv"'},
+        )
+    return StreamingResponse(
+        _iter_ndjson(chunks),
+        media_type="application/x-ndjson",
+        headers={"content-disposition": 'attachment; filename="todos.ndjson"'},
+    )
+
+
+@router.get("/{todo_id}", response_model=TodoResponse, status_code=status.HTTP_200_OK)
+async def get_todo(
+    todo_id: Annotated[int, Path(le=MAX_ROW_INT)],
+    response: Response,
+    if_none_match: str | None = Header(default=None),
+    todo_service: AsyncTodoService = Depends(get_todo_service),
+) -> TodoResponse | Response:
+    todo = await todo_service.get_todo(todo_id=todo_id)
+    etag = todo_etag(todo)
+    if etag_matches(if_none_match, etag):
+        return _not_modified(etag)
+    response.headers["etag"] = etag
+    return TodoResponse.model_validate(todo)
 
 
 @router.patch("/{todo_id}", response_model=TodoResponse, status_code=status.HTTP_200_OK)
-def update_todo(
-    todo_id: int,
+async def update_todo(
+    todo_id: Annotated[int, Path(le=MAX_ROW_INT)],
     payload: TodoUpdateRequest,
-    db_session: Session = Depends(get_db_session),
+    response: Response,
+    if_match: str | None = Header(default=None),
+    todo_service: AsyncTodoService = Depends(get_todo_service),
 ) -> TodoResponse:
-    todo_service = TodoService(db_session)
-    todo = todo_service.update_todo(todo_id=todo_id, payload=payload)
+    todo = await todo_service.update_todo(todo_id=todo_id, payload=payload, if_match=if_match)
+    response.headers["etag"] = todo_etag(todo)
     return TodoResponse.model_validate(todo)
 
 
 @router.delete("/{todo_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_todo(todo_id: int, db_session: Session = Depends(get_db_session)) -> None:
-    todo_service = TodoService(db_session)
-    todo_service.delete_todo(todo_id=todo_id)
+async def delete_todo(
+    todo_id: Annotated[int, Path(le=MAX_ROW_INT)],
+    todo_service: AsyncTodoService = Depends(get_todo_service),
+) -> None:
+    await todo_service.delete_todo(todo_id=todo_id)
@@ -0,0 +1,193 @@
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import anyio
+from fastapi import Request
+
+from app.core.config import Settings
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    body: bytes
+    headers: dict[str, str] = field(default_factory=dict)
+
+
+class ResponseCache(ABC):
+    """Serialized responses keyed by a collection version.
+
+    Writers bump the version after they commit. Keys embed the version read before the query, so a
+    response built from pre-write data can only be stored under a version nobody reads any more;
+    such entries age out through LRU or TTL eviction.
+
+    Async handlers use `lookup` and `store`, which run backends that do disk I/O in a worker thread.
+    """
+
+    # Whether get/set/get_version touch disk; if so they must not run on the event loop.
+    blocking_io = False
+
+    def __init__(self, *, max_entries: int, ttl_seconds: float) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+    def build_key(self, namespace: str, **params: object) -> str:
+        query = "&".join(f"{name}={value}" for name, value in sorted(params.items()) if value is not None)
+        return f"{namespace}:v{self.get_version()}:{query}"
+
+    def _lookup(self, namespace: str, params: dict[str, object]) -> tuple[str, CachedResponse | None]:
+        key = self.build_key(namespace, **params)
+        return key, self.get(key)
+
+    async def lookup(self, namespace: str, **params: object) -> tuple[str, CachedResponse | None]:
+        """Build the key for the current version and fetch its entry, in one worker-thread hop if needed."""
+        if self.blocking_io:
+            return await anyio.to_thread.run_sync(self._lookup, namespace, params)
+        return self._lookup(namespace, params)
+
+    async def store(self, key: str, response: CachedResponse) -> None:
+        if self.blocking_io:
+            await anyio.to_thread.run_sync(self.set, key, response)
+        else:
+            self.set(key, response)
+
+    @abstractmethod
+    def get(self, key: str) -> CachedResponse | None: ...
+
+    @abstractmethod
+    def set(self, key: str, response: CachedResponse) -> None: ...
+
+    @abstractmethod
+    def get_version(self) -> int: ...
+
+    @abstractmethod
+    def bump_version(self) -> None: ...
+
+
+class MemoryResponseCache(ResponseCache):
+    """Per-process LRU cache. Only safe for a single worker: other workers never see its version bumps."""
+
+    def __init__(self, *, max_entries: int, ttl_seconds: float) -> None:
+        super().__init__(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[float, CachedResponse]] = OrderedDict()
+        self._version = 0
+
+    def get(self, key: str) -> CachedResponse | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, response = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return response
+
+    def set(self, key: str, response: CachedResponse) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_version(self) -> int:
+        return self._version
+
+    def bump_version(self) -> None:
+        with self._lock:
+            self._version += 1
+
+
+class SqliteResponseCache(ResponseCache):
+    """Cache in a local SQLite file shared by every worker on the host, including the version counter."""
+
+    blocking_io = True
+
+    def __init__(self, path: Path, *, max_entries: int, ttl_seconds: float) -> None:
+        super().__init__(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self.path = path
+        self._local = threading.local()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        connection = self._connection()
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS response_cache ("
+            "key TEXT PRIMARY KEY, body BLOB NOT NULL, headers TEXT NOT NULL, "
+            "expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        connection.execute("CREATE INDEX IF NOT EXISTS ix_response_cache_accessed_at ON response_cache (accessed_at)")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS response_cache_version (id INTEGER PRIMARY KEY, version INTEGER NOT NULL)"
+        )
+        connection.execute("INSERT OR IGNORE INTO response_cache_version (id, version) VALUES (1, 0)")
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections must stay on the thread that opened them; requests run on several.
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def get(self, key: str) -> CachedResponse | None:
+        now = time.time()
+        connection = self._connection()
+        row = connection.execute(
+            "SELECT body, headers FROM response_cache WHERE key = ? AND expires_at > ?", (key, now)
+        ).fetchone()
+        if row is None:
+            return None
+        connection.execute("UPDATE response_cache SET accessed_at = ? WHERE key = ?", (now, key))
+        return CachedResponse(body=row[0], headers=json.loads(row[1]))
+
+    def set(self, key: str, response: CachedResponse) -> None:
+        now = time.time()
+        connection = self._connection()
+        connection.execute(
+            "INSERT OR REPLACE INTO response_cache (key, body, headers, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+            (key, response.body, json.dumps(response.headers), now + self.ttl_seconds, now),
+        )
+        connection.execute("DELETE FROM response_cache WHERE expires_at <= ?", (now,))
+        connection.execute(
+            "DELETE FROM response_cache WHERE key IN "
+            "(SELECT key FROM response_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    def get_version(self) -> int:
+        return self._connection().execute("SELECT version FROM response_cache_version WHERE id = 1").fetchone()[0]
+
+    def bump_version(self) -> None:
+        self._connection().execute("UPDATE response_cache_version SET version = version + 1 WHERE id = 1")
+
+
+def build_response_cache(settings: Settings, *, shared: bool = False) -> ResponseCache | None:
+    """The configured cache; `shared` (for CLI tools) swaps "memory" for the file the server's workers share.
+
+    A tool's own memory cache would only invalidate itself.
+    """
+    backend = "sqlite" if shared and settings.RESPONSE_CACHE_BACKEND == "memory" else settings.RESPONSE_CACHE_BACKEND
+    if backend == "memory":
+        return MemoryResponseCache(
+            max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS,
+        )
+    if backend == "sqlite":
+        return SqliteResponseCache(
+            Path(settings.RESPONSE_CACHE_SQLITE_PATH),
+            max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS,
+        )
+    return None
+
+
+def get_response_cache(request: Request) -> ResponseCache | None:
+    return request.app.state.response_cache
@@ -1,4 +1,5 @@
 from functools import lru_cache
+from typing import Literal
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -15,6 +16,73 @@ class Settings(BaseSettings):
         "?driver=ODBC+Driver+17+for+SQL+Server&Trusted_Connection=yes&TrustServerCertificate=yes"
     )
     SQL_ECHO: bool = False
+    DATABASE_ASYNC_ENABLED: bool = False
+    # Defaults to DATABASE_URL with its driver swapped for the async equivalent.
+    DATABASE_ASYNC_URL: str | None = None
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = -1
+    DB_POOL_PRE_PING: bool = False
+    # Connections opened during startup, before the app accepts traffic. Capped at DB_POOL_SIZE.
+    DB_PREWARM_CONNECTIONS: int = 0
+    # Connections the database grants this host. `python -m app.server` divides it between its
+    # workers, overriding DB_POOL_SIZE/DB_MAX_OVERFLOW so that no worker's pool exceeds its share.
+    DB_POOL_BUDGET: int | None = None
+    # Adds x-db-queries / x-db-time-ms to every response. Counts and time are always logged.
+    DB_STATS_HEADERS_ENABLED: bool = False
+
+    LOG_QUEUE_SIZE: int = 10_000
+    # Keep 1 in N successful (< 400) request logs; errors and slow requests are always logged.
+    LOG_SUCCESS_SAMPLE_RATE: int = 1
+    LOG_SLOW_REQUEST_MS: float = 1000.0
+
+    # Lets a request sent with `x-profile: 1` run under cProfile and leave a pstats file named after
+    # its trace id in PROFILING_DIR. Meant for staging: profiled requests are several times slower.
+    PROFILING_ENABLED: bool = False
+    PROFILING_DIR: str = ".cache/profiles"
+
+    # Set when running several workers so /metrics reports all of them; each worker writes its
+    # snapshot here every METRICS_FLUSH_INTERVAL_SECONDS. Clear the directory on deploy.
+    METRICS_MULTIPROCESS_DIR: str | None = None
+    METRICS_FLUSH_INTERVAL_SECONDS: float = 5.0
+
+    # "memory" is per process; use "sqlite" when several workers serve the API on one host.
+    RESPONSE_CACHE_BACKEND: Literal["none", "memory", "sqlite"] = "memory"
+    RESPONSE_CACHE_MAX_ENTRIES: int = 256
+    RESPONSE_CACHE_TTL_SECONDS: float = 30.0
+    RESPONSE_CACHE_SQLITE_PATH: str = ".cache/response-cache.sqlite3"
+
+    # "memory" only reaches subscribers of the worker that made the change; "sqlite" shares
+    # events between the workers on one host through a local file polled every interval.
+    TODO_EVENTS_BACKEND: Literal["memory", "sqlite"] = "memory"
+    TODO_EVENTS_SQLITE_PATH: str = ".cache/todo-events.sqlite3"
+    TODO_EVENTS_POLL_INTERVAL_SECONDS: float = 0.2
+    # Events buffered per subscriber before it is evicted as a slow consumer.
+    TODO_EVENTS_QUEUE_SIZE: int = 256
+    TODO_EVENTS_HEARTBEAT_SECONDS: float = 15.0
+
+    # Used by `python -m app.server`. SERVER_WORKERS=0 starts one worker per available CPU.
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    SERVER_WORKERS: int = 0
+    # Longer than the usual 60 s load balancer idle timeout, so the balancer closes idle connections
+    # first and never sends a request on a connection the server is closing.
+    SERVER_KEEPALIVE_SECONDS: int = 65
+    SERVER_BACKLOG: int = 2048
+    # Open connections per worker before new ones get 503; unset means no limit.
+    SERVER_LIMIT_CONCURRENCY: int | None = None
+    SERVER_GRACEFUL_SHUTDOWN_SECONDS: int = 30
+    # Each request already logs request_completed, so uvicorn's access log is off by default.
+    SERVER_ACCESS_LOG: bool = False
+
+    TODO_PAGE_SIZE_DEFAULT: int = 100
+    TODO_PAGE_SIZE_MAX: int = 500
+    TODO_EXPORT_CHUNK_SIZE: int = 1000
+    TODO_IMPORT_CHUNK_SIZE: int = 1000
+    TODO_IMPORT_MAX_ERRORS: int = 1000
+    # Clients that have not synced within this window get 410 and must re-download everything.
+    TODO_TOMBSTONE_RETENTION_DAYS: int = 30
 
 
 @lru_cache
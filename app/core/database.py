@@ -1,18 +1,195 @@
-from collections.abc import Generator
+import threading
+from collections.abc import AsyncGenerator, Generator
+from typing import Any
 
-from sqlalchemy import create_engine
+import anyio
+from fastapi import Request
+from sqlalchemy import Engine, create_engine, event, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
 
-from app.core.config import get_settings
+from app.core.config import Settings
+from app.core.db_metrics import PoolMetrics, instrumented_pool_class, register_pool_events, register_query_events
 
-settings = get_settings()
-engine = create_engine(settings.DATABASE_URL, echo=settings.SQL_ECHO, future=True)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ASYNC_DRIVERS = {
+    "mssql": "mssql+aioodbc",
+    "sqlite": "sqlite+aiosqlite",
+}
 
 
-def get_db_session() -> Generator[Session, None, None]:
-    db_session = SessionLocal()
+def get_async_database_url(settings: Settings) -> str:
+    if settings.DATABASE_ASYNC_URL:
+        return settings.DATABASE_ASYNC_URL
+
+    url = make_url(settings.DATABASE_URL)
+    return url.set(drivername=ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername)).render_as_string(
+        hide_password=False
+    )
+
+
+def build_engine_options(
+    settings: Settings,
+    database_url: str,
+    *,
+    pool_class: type[QueuePool],
+    metrics: PoolMetrics,
+) -> dict[str, Any]:
+    options: dict[str, Any] = {
+        "echo": settings.SQL_ECHO,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        # In-memory SQLite shares a single connection; there is no pool to size.
+        return options
+
+    options.update(
+        poolclass=instrumented_pool_class(pool_class, metrics),
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+    )
+    return options
+
+
+def enable_sqlite_foreign_keys(engine: Engine) -> None:
+    """Turn on FK enforcement for SQLite connections, which is off by default.
+
+    Title tokens are removed by their FK's ON DELETE CASCADE; without this SQLite would orphan them.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+
+    def on_connect(dbapi_connection: Any, _connection_record: Any) -> None:
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+    event.listen(engine, "connect", on_connect)
+
+
+class Database:
+    """Engines and session factories for one set of settings, created on first use.
+
+    Importing the app therefore costs no driver import or engine construction. `app.main.create_app`
+    keeps one on `app.state.database`; its lifespan can pre-warm the pool before traffic arrives and
+    disposes it on shutdown. CLI tools build their own from `get_settings()`.
+    """
+
+    def __init__(self, settings: Settings) -> None:
+        self.settings = settings
+        self.pool_metrics = PoolMetrics()
+        self.async_pool_metrics = PoolMetrics()
+        self._lock = threading.Lock()
+        self._engine: Engine | None = None
+        self._session_factory = sessionmaker(autocommit=False, autoflush=False)
+        self._async_engine: AsyncEngine | None = None
+        self._async_session_factory = async_sessionmaker(autoflush=False)
+
+    @property
+    def engine(self) -> Engine:
+        if self._engine is None:
+            with self._lock:
+                if self._engine is None:
+                    database_url = self.settings.DATABASE_URL
+                    engine = create_engine(
+                        database_url,
+                        future=True,
+                        **build_engine_options(
+                            self.settings, database_url, pool_class=QueuePool, metrics=self.pool_metrics
+                        ),
+                    )
+                    enable_sqlite_foreign_keys(engine)
+                    register_pool_events(engine, self.pool_metrics)
+                    register_query_events(engine)
+                    self._engine = engine
+        return self._engine
+
+    @property
+    def async_engine(self) -> AsyncEngine:
+        if not self.settings.DATABASE_ASYNC_ENABLED:
+            raise RuntimeError("The async engine is only available with DATABASE_ASYNC_ENABLED")
+        if self._async_engine is None:
+            with self._lock:
+                if self._async_engine is None:
+                    database_url = get_async_database_url(self.settings)
+                    async_engine = create_async_engine(
+                        database_url,
+                        **build_engine_options(
+                            self.settings,
+                            database_url,
+                            pool_class=AsyncAdaptedQueuePool,
+                            metrics=self.async_pool_metrics,
+                        ),
+                    )
+                    enable_sqlite_foreign_keys(async_engine.sync_engine)
+                    register_pool_events(async_engine.sync_engine, self.async_pool_metrics)
+                    register_query_events(async_engine.sync_engine)
+                    self._async_engine = async_engine
+        return self._async_engine
+
+    def session(self) -> Session:
+        return self._session_factory(bind=self.engine)
+
+    def async_session(self) -> AsyncSession:
+        return self._async_session_factory(bind=self.async_engine)
+
+    def active_pool(self) -> Pool | None:
+        """The pool serving requests, or None before it has been created."""
+        if self.settings.DATABASE_ASYNC_ENABLED:
+            return self._async_engine.sync_engine.pool if self._async_engine is not None else None
+        return self._engine.pool if self._engine is not None else None
+
+    def pool_stats(self) -> dict[str, Any]:
+        # Reported without creating engines, so polling this never opens a connection.
+        stats = {"sync": self.pool_metrics.snapshot(self._engine.pool if self._engine is not None else None)}
+        if self.settings.DATABASE_ASYNC_ENABLED:
+            async_pool = self._async_engine.sync_engine.pool if self._async_engine is not None else None
+            stats["async"] = self.async_pool_metrics.snapshot(async_pool)
+        return stats
+
+    async def prewarm(self, connections: int) -> int:
+        """Open up to `connections` pooled connections of the active engine; returns how many.
+
+        They are checked out together so the pool has to open each one, then returned to it.
+        Connections beyond DB_POOL_SIZE would be closed on return, so the count is capped there.
+        """
+        connections = min(connections, self.settings.DB_POOL_SIZE)
+        if connections <= 0:
+            return 0
+        if self.settings.DATABASE_ASYNC_ENABLED:
+            opened = [await self.async_engine.connect() for _ in range(connections)]
+            for connection in opened:
+                await connection.close()
+            return len(opened)
+
+        def open_connections() -> int:
+            opened = [self.engine.connect() for _ in range(connections)]
+            for connection in opened:
+                connection.close()
+            return len(opened)
+
+        return await anyio.to_thread.run_sync(open_connections)
+
+    async def dispose(self) -> None:
+        """Close every pooled connection. Engines stay usable and reconnect on next use."""
+        if self._async_engine is not None:
+            await self._async_engine.dispose()
+        if self._engine is not None:
+            self._engine.dispose()
+
+
+def get_db_session(request: Request) -> Generator[Session, None, None]:
+    db_session = request.app.state.database.session()
     try:
         yield db_session
     finally:
         db_session.close()
+
+
+async def get_async_db_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    async with request.app.state.database.async_session() as db_session:
+        yield db_session
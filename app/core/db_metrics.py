@@ -0,0 +1,134 @@
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import Pool, QueuePool
+
+
+@dataclass
+class RequestDbStats:
+    pool_wait_ms: float = 0.0
+    query_count: int = 0
+    query_time_ms: float = 0.0
+
+
+request_db_stats_context: ContextVar[RequestDbStats | None] = ContextVar("request_db_stats", default=None)
+
+
+def start_request_db_stats() -> RequestDbStats:
+    # A mutable holder set once per request, so worker threads and greenlets that inherit a copy
+    # of the context still report into the same object.
+    request_db_stats = RequestDbStats()
+    request_db_stats_context.set(request_db_stats)
+    return request_db_stats
+
+
+def get_pool_status(pool: Pool | None) -> dict[str, int]:
+    if not isinstance(pool, QueuePool):
+        return {}
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        # QueuePool counts overflow from -pool_size until the core pool is full.
+        "overflow": max(pool.overflow(), 0),
+    }
+
+
+class PoolMetrics:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkins = 0
+        self.timeouts = 0
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+        self.checked_out_peak = 0
+        self.overflow_peak = 0
+
+    def record_checkout_wait(self, wait_ms: float, *, timed_out: bool) -> None:
+        with self._lock:
+            self.wait_ms_total += wait_ms
+            self.wait_ms_max = max(self.wait_ms_max, wait_ms)
+            if timed_out:
+                self.timeouts += 1
+
+        request_db_stats = request_db_stats_context.get()
+        if request_db_stats is not None:
+            request_db_stats.pool_wait_ms += wait_ms
+
+    def record_checkout(self, pool: Pool) -> None:
+        status = get_pool_status(pool)
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out_peak = max(self.checked_out_peak, status.get("checked_out", 0))
+            self.overflow_peak = max(self.overflow_peak, status.get("overflow", 0))
+
+    def record_checkin(self) -> None:
+        with self._lock:
+            self.checkins += 1
+
+    def snapshot(self, pool: Pool | None) -> dict[str, Any]:
+        with self._lock:
+            counters = {
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "timeouts": self.timeouts,
+                "checkout_wait_ms_total": round(self.wait_ms_total, 2),
+                "checkout_wait_ms_max": round(self.wait_ms_max, 2),
+                "checked_out_peak": self.checked_out_peak,
+                "overflow_peak": self.overflow_peak,
+            }
+        # `pool` is None until the engine has been created by its first use or the startup pre-warm.
+        return {"pool": type(pool).__name__ if pool is not None else None, **get_pool_status(pool), **counters}
+
+
+def instrumented_pool_class(pool_class: type[QueuePool], metrics: PoolMetrics) -> type[QueuePool]:
+    # Pool events fire only once a connection is handed out, so the wait for a free slot is timed
+    # around the pool's own acquire step instead.
+    class InstrumentedPool(pool_class):  # type: ignore[valid-type, misc]
+        def _do_get(self) -> Any:
+            started_at = time.perf_counter()
+            timed_out = False
+            try:
+                return super()._do_get()
+            except PoolTimeoutError:
+                timed_out = True
+                raise
+            finally:
+                metrics.record_checkout_wait((time.perf_counter() - started_at) * 1000, timed_out=timed_out)
+
+    InstrumentedPool.__name__ = f"Instrumented{pool_class.__name__}"
+    return InstrumentedPool
+
+
+def register_pool_events(engine: Engine, metrics: PoolMetrics) -> None:
+    # Listening on the engine (not the pool) keeps the hooks when dispose() recreates the pool.
+    event.listen(engine, "checkout", lambda *_: metrics.record_checkout(engine.pool))
+    event.listen(engine, "checkin", lambda *_: metrics.record_checkin())
+
+
+def register_query_events(engine: Engine) -> None:
+    """Count and time the statements run for the current request (see `start_request_db_stats`)."""
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+        request_db_stats = request_db_stats_context.get()
+        if request_db_stats is None:
+            return
+        request_db_stats.query_count += 1
+        if context is not None:
+            context._request_query_started_at = time.perf_counter()
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+        request_db_stats = request_db_stats_context.get()
+        started_at = getattr(context, "_request_query_started_at", None)
+        if request_db_stats is not None and started_at is not None:
+            request_db_stats.query_time_ms += (time.perf_counter() - started_at) * 1000
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
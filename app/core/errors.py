@@ -54,6 +54,56 @@ class TodoDuplicateError(AppError):
         )
 
 
+class TodoPreconditionFailedError(AppError):
+    def __init__(self, *, todo_id: int, etag: str) -> None:
+        super().__init__(
+            code="TODO_PRECONDITION_FAILED",
+            message="Todo was modified since the supplied ETag",
+            status_code=412,
+            details={"todo_id": todo_id, "etag": etag},
+        )
+
+
+class ImportJobNotFoundError(AppError):
+    def __init__(self, job_id: str) -> None:
+        super().__init__(
+            code="IMPORT_JOB_NOT_FOUND",
+            message="Import job not found",
+            status_code=404,
+            details={"job_id": job_id},
+        )
+
+
+class ImportJobConflictError(AppError):
+    def __init__(self, job_id: str) -> None:
+        super().__init__(
+            code="IMPORT_JOB_EXISTS",
+            message="An import job with this id already exists",
+            status_code=409,
+            details={"job_id": job_id},
+        )
+
+
+class InvalidCursorError(AppError):
+    def __init__(self, cursor: str) -> None:
+        super().__init__(
+            code="INVALID_CURSOR",
+            message="Pagination cursor is invalid",
+            status_code=422,
+            details={"cursor": cursor},
+        )
+
+
+class ChangeTokenExpiredError(AppError):
+    def __init__(self, *, token: str, compacted_seq: int) -> None:
+        super().__init__(
+            code="CHANGE_TOKEN_EXPIRED",
+            message="Sync token is older than the retained change history; re-sync without `since`",
+            status_code=410,
+            details={"since": token, "compacted_seq": compacted_seq},
+        )
+
+
 def build_error_response(*, code: str, message: str, details: Any, status_code: int) -> JSONResponse:
     return JSONResponse(
         status_code=status_code,
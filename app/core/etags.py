@@ -0,0 +1,49 @@
+import hashlib
+from collections.abc import Sequence
+from datetime import datetime, timezone
+from typing import Protocol
+
+
+class Versioned(Protocol):
+    id: int
+    updated_at: datetime
+
+
+def _version_stamp(updated_at: datetime) -> str:
+    if updated_at.tzinfo is not None:
+        updated_at = updated_at.astimezone(timezone.utc).replace(tzinfo=None)
+    return updated_at.strftime("%Y%m%d%H%M%S%f")
+
+
+def todo_etag(todo: Versioned) -> str:
+    # Strong: a todo's JSON is fully determined by its row, and If-Match needs strong tags.
+    return f'"{todo.id}-{_version_stamp(todo.updated_at)}"'
+
+
+def todo_page_etag(todos: Sequence[Versioned], next_cursor: str | None) -> str:
+    # Derived from the rows rather than a process-local counter, so it survives restarts and is
+    # the same on every worker.
+    digest = hashlib.blake2b(digest_size=12)
+    for todo in todos:
+        digest.update(f"{todo.id}:{_version_stamp(todo.updated_at)};".encode("ascii"))
+    digest.update((next_cursor or "").encode("ascii"))
+    return f'W/"{digest.hexdigest()}"'
+
+
+def _opaque_tag(etag: str) -> str:
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def etag_matches(header_value: str | None, etag: str, *, strong: bool = False) -> bool:
+    """Compare against an If-None-Match (weak) or If-Match (`strong=True`) header value, including `*`.
+
+    Strong comparison (RFC 9110 section 8.8.3.2) never matches when either tag is weak.
+    """
+    if header_value is None:
+        return False
+    if header_value.strip() == "*":
+        return True
+    if strong:
+        return not etag.startswith("W/") and any(candidate.strip() == etag for candidate in header_value.split(","))
+    opaque_tag = _opaque_tag(etag)
+    return any(_opaque_tag(candidate.strip()) == opaque_tag for candidate in header_value.split(","))
@@ -0,0 +1,217 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Literal
+
+from fastapi import Request
+
+from app.core.config import Settings
+
+TodoEventType = Literal["todo.created", "todo.updated", "todo.deleted", "todos.changed"]
+
+
+@dataclass(frozen=True)
+class TodoEvent:
+    type: TodoEventType
+    # Sequence of the committing transaction; clients hand it to GET /todos/changes to catch up.
+    change_seq: int
+    data: dict[str, Any] = field(default_factory=dict)
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, raw: str) -> "TodoEvent":
+        return cls(**json.loads(raw))
+
+
+class EventSubscription:
+    """One listener's bounded queue. Filled on the listener's event loop, never blocking the publisher."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, *, max_queue: int) -> None:
+        self.loop = loop
+        self.queue: asyncio.Queue[TodoEvent] = asyncio.Queue(maxsize=max_queue)
+        self.evicted = False
+
+    def offer(self, event: TodoEvent) -> None:
+        if self.evicted:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # A consumer this far behind is dropped instead of buffering without bound; it
+            # reconnects and catches up from the change feed.
+            self.evicted = True
+
+    async def get(self, *, timeout: float) -> TodoEvent | None:
+        """Next event, or None after `timeout` seconds (or once evicted and drained)."""
+        if self.evicted and self.queue.empty():
+            return None
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except TimeoutError:
+            return None
+
+
+class EventBackend(ABC):
+    """Carries published events to every process's broker, including the publisher's own."""
+
+    @abstractmethod
+    def publish(self, event: TodoEvent) -> None: ...
+
+    @abstractmethod
+    def start(self, deliver: Callable[[TodoEvent], None]) -> None: ...
+
+    @abstractmethod
+    def stop(self) -> None: ...
+
+
+class MemoryEventBackend(EventBackend):
+    """Delivers in process. Only subscribers connected to the publishing worker see the event."""
+
+    def __init__(self) -> None:
+        self._deliver: Callable[[TodoEvent], None] | None = None
+
+    def publish(self, event: TodoEvent) -> None:
+        if self._deliver is not None:
+            self._deliver(event)
+
+    def start(self, deliver: Callable[[TodoEvent], None]) -> None:
+        self._deliver = deliver
+
+    def stop(self) -> None:
+        self._deliver = None
+
+
+class SqliteEventBackend(EventBackend):
+    """Shares events between the workers on one host through a local SQLite file.
+
+    Publishers append rows; each worker polls for rows newer than the last one it delivered.
+    Rows older than `retention_seconds` are pruned, since only live subscribers read them.
+    """
+
+    def __init__(self, path: Path, *, poll_interval_seconds: float, retention_seconds: float = 60.0) -> None:
+        self.path = path
+        self.poll_interval_seconds = poll_interval_seconds
+        self.retention_seconds = retention_seconds
+        self._local = threading.local()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        path.parent.mkdir(parents=True, exist_ok=True)
+        connection = self._connection()
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS todo_events ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, payload TEXT NOT NULL, published_at REAL NOT NULL)"
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def publish(self, event: TodoEvent) -> None:
+        now = time.time()
+        connection = self._connection()
+        connection.execute("INSERT INTO todo_events (payload, published_at) VALUES (?, ?)", (event.to_json(), now))
+        connection.execute("DELETE FROM todo_events WHERE published_at < ?", (now - self.retention_seconds,))
+
+    def start(self, deliver: Callable[[TodoEvent], None]) -> None:
+        last_id = self._connection().execute("SELECT COALESCE(MAX(id), 0) FROM todo_events").fetchone()[0]
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(deliver, last_id), name="todo-events", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_interval_seconds * 2)
+            self._thread = None
+
+    def _run(self, deliver: Callable[[TodoEvent], None], last_id: int) -> None:
+        connection = self._connection()
+        while not self._stop.wait(self.poll_interval_seconds):
+            rows = connection.execute(
+                "SELECT id, payload FROM todo_events WHERE id > ? ORDER BY id", (last_id,)
+            ).fetchall()
+            for row_id, payload in rows:
+                last_id = row_id
+                deliver(TodoEvent.from_json(payload))
+
+
+class EventBroker:
+    """Fans events out to the subscribers of this process.
+
+    `publish` may be called from any thread (services run in worker threads); each event is
+    handed to every subscriber's own event loop. The backend starts with the first subscriber, so
+    processes that only publish (CLI tools, tests) never run a poller.
+    """
+
+    def __init__(self, backend: EventBackend, *, max_queue: int) -> None:
+        self.backend = backend
+        self.max_queue = max_queue
+        self._lock = threading.Lock()
+        self._subscriptions: set[EventSubscription] = set()
+        self._started = False
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscriptions)
+
+    def publish(self, event: TodoEvent) -> None:
+        self.backend.publish(event)
+
+    def subscribe(self) -> EventSubscription:
+        subscription = EventSubscription(asyncio.get_running_loop(), max_queue=self.max_queue)
+        with self._lock:
+            if not self._started:
+                self.backend.start(self._fan_out)
+                self._started = True
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: EventSubscription) -> None:
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def stop(self) -> None:
+        with self._lock:
+            if self._started:
+                self.backend.stop()
+                self._started = False
+
+    def _fan_out(self, event: TodoEvent) -> None:
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.offer, event)
+            except RuntimeError:
+                # The subscriber's loop has closed; its stream is gone.
+                self.unsubscribe(subscription)
+
+
+def build_event_broker(settings: Settings, *, shared: bool = False) -> EventBroker:
+    """The configured broker; `shared` (for CLI tools) always publishes through the workers' file."""
+    backend: EventBackend
+    if shared or settings.TODO_EVENTS_BACKEND == "sqlite":
+        backend = SqliteEventBackend(
+            Path(settings.TODO_EVENTS_SQLITE_PATH),
+            poll_interval_seconds=settings.TODO_EVENTS_POLL_INTERVAL_SECONDS,
+        )
+    else:
+        backend = MemoryEventBackend()
+    return EventBroker(backend, max_queue=settings.TODO_EVENTS_QUEUE_SIZE)
+
+
+def get_event_broker(request: Request) -> EventBroker:
+    return request.app.state.event_broker
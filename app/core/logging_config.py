@@ -1,9 +1,18 @@
+import atexit
+import itertools
 import logging
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener
 
 from pythonjsonlogger import jsonlogger
 
+from app.core.config import Settings, get_settings
 from app.core.request_context import get_trace_id
 
+_listener: QueueListener | None = None
+_queue_handler: "DroppingQueueHandler | None" = None
+
 
 class TraceIdJsonFormatter(jsonlogger.JsonFormatter):
     def add_fields(self, log_record, record, message_dict):
@@ -11,13 +20,97 @@ class TraceIdJsonFormatter(jsonlogger.JsonFormatter):
         log_record.setdefault("trace_id", get_trace_id())
 
 
-def configure_logging() -> None:
+class DroppingQueueHandler(QueueHandler):
+    """Hands records to a bounded queue without blocking; drops and counts them when it is full."""
+
+    def __init__(self, log_queue: queue.Queue) -> None:
+        super().__init__(log_queue)
+        self._dropped_lock = threading.Lock()
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Formatting is left to the listener thread; only request-scoped context, which that thread
+        # cannot see, is captured here.
+        if not hasattr(record, "trace_id"):
+            record.trace_id = get_trace_id()
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+
+
+class RequestLogSampler(logging.Filter):
+    """Keeps 1 in N successful request logs; errors and slow requests are always kept."""
+
+    def __init__(self, *, success_sample_rate: int, slow_request_ms: float) -> None:
+        super().__init__()
+        self.success_sample_rate = max(success_sample_rate, 1)
+        self.slow_request_ms = slow_request_ms
+        self._successes = itertools.count(1)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        status_code = getattr(record, "status_code", None)
+        if status_code is None or status_code >= 400:
+            return True
+        if getattr(record, "latency_ms", 0) >= self.slow_request_ms:
+            return True
+        if self.success_sample_rate == 1:
+            return True
+
+        record.sample_rate = self.success_sample_rate
+        return next(self._successes) % self.success_sample_rate == 0
+
+
+def get_dropped_log_count() -> int:
+    return _queue_handler.dropped if _queue_handler is not None else 0
+
+
+def stop_logging() -> None:
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def configure_logging(settings: Settings | None = None, *, use_queue: bool = True) -> None:
+    """Send JSON logs to stderr, through a bounded queue and listener thread unless `use_queue` is off.
+
+    Processes that serve no requests, such as the `app.server` supervisor, log synchronously and
+    start no thread.
+    """
+    global _listener, _queue_handler
+    settings = settings or get_settings()
+
     formatter = TraceIdJsonFormatter(
         "%(asctime)s %(levelname)s %(name)s %(message)s %(trace_id)s %(route)s %(method)s %(status_code)s %(latency_ms)s"
     )
     handler = logging.StreamHandler()
     handler.setFormatter(formatter)
 
+    stop_logging()
     root_logger = logging.getLogger()
     root_logger.setLevel(logging.INFO)
-    root_logger.handlers = [handler]
+    if use_queue:
+        log_queue: queue.Queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+        _queue_handler = DroppingQueueHandler(log_queue)
+        _listener = QueueListener(log_queue, handler, respect_handler_level=True)
+        _listener.start()
+        root_logger.handlers = [_queue_handler]
+    else:
+        _queue_handler = None
+        root_logger.handlers = [handler]
+
+    request_logger = logging.getLogger("app.request")
+    request_logger.filters = [
+        RequestLogSampler(
+            success_sample_rate=settings.LOG_SUCCESS_SAMPLE_RATE,
+            slow_request_ms=settings.LOG_SLOW_REQUEST_MS,
+        )
+    ]
+
+
+atexit.register(stop_logging)
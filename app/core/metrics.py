@@ -0,0 +1,313 @@
+import atexit
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any, Literal
+
+from starlette.types import Scope
+
+from app.core.config import Settings, get_settings
+
+# Seconds. Dense around the 300 ms p95 target so the quantile estimate stays sharp there.
+LATENCY_BUCKETS: tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 1.0, 2.5, 5.0)
+UNMATCHED_ROUTE = "unmatched"
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+GaugeMerge = Literal["sum", "max"]
+
+METRIC_HELP = {
+    "http_request_duration_seconds": "Request latency by route template, method and status.",
+    "http_requests_total": "Completed requests by route template, method and status.",
+    "http_requests_in_progress": "Requests currently being handled.",
+}
+
+
+class _Histogram:
+    __slots__ = ("bucket_counts", "count", "total")
+
+    def __init__(self, bucket_count: int) -> None:
+        # One slot per bound plus +Inf; counts are per bucket and made cumulative when rendered.
+        self.bucket_counts = [0] * (bucket_count + 1)
+        self.count = 0
+        self.total = 0.0
+
+
+def get_route_label(scope: Scope) -> str:
+    """Return the matched route template with any router prefix, or "unmatched"."""
+    route = scope.get("route")
+    template = getattr(route, "path_format", None) or getattr(route, "path", None)
+    if not template:
+        return UNMATCHED_ROUTE
+
+    # Routes inside an included router may report their template without the include prefix. The
+    # template has one segment per path segment, so the leading remainder of the path is the prefix.
+    path_segments = scope["path"].strip("/").split("/")
+    template_segments = template.strip("/").split("/")
+    prefix_length = len(path_segments) - len(template_segments)
+    if prefix_length <= 0:
+        return template
+    return "/" + "/".join(path_segments[:prefix_length]) + template
+
+
+class MetricsRegistry:
+    """Process-local request metrics.
+
+    Histograms live in nested dicts (route -> method -> status) so recording a request is a few
+    lookups and integer increments with no per-request objects once a series exists.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._histograms: dict[str, dict[str, dict[int, _Histogram]]] = {}
+        self._in_progress = 0
+        self._gauge_collectors: dict[str, Callable[[], float]] = {}
+        self._gauge_merge: dict[str, GaugeMerge] = {}
+        self._counter_collectors: dict[str, Callable[[], float]] = {}
+        self._help: dict[str, str] = dict(METRIC_HELP)
+
+    def add_gauge_collector(
+        self, name: str, help_text: str, collect: Callable[[], float], *, merge: GaugeMerge = "sum"
+    ) -> None:
+        """Register a gauge. `merge` is how workers' values combine: "sum" for amounts, "max" for durations."""
+        self._gauge_collectors[name] = collect
+        self._gauge_merge[name] = merge
+        self._help[name] = help_text
+
+    def add_counter_collector(self, name: str, help_text: str, collect: Callable[[], float]) -> None:
+        self._counter_collectors[name] = collect
+        self._help[name] = help_text
+
+    def request_started(self) -> None:
+        with self._lock:
+            self._in_progress += 1
+
+    def request_finished(self, *, route: str, method: str, status_code: int, seconds: float) -> None:
+        with self._lock:
+            self._in_progress -= 1
+            by_method = self._histograms.get(route)
+            if by_method is None:
+                by_method = self._histograms[route] = {}
+            by_status = by_method.get(method)
+            if by_status is None:
+                by_status = by_method[method] = {}
+            histogram = by_status.get(status_code)
+            if histogram is None:
+                histogram = by_status[status_code] = _Histogram(len(self.buckets))
+
+            histogram.bucket_counts[bisect_left(self.buckets, seconds)] += 1
+            histogram.count += 1
+            histogram.total += seconds
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            histograms = [
+                {
+                    "route": route,
+                    "method": method,
+                    "status": status_code,
+                    "buckets": list(histogram.bucket_counts),
+                    "count": histogram.count,
+                    "sum": histogram.total,
+                }
+                for route, by_method in self._histograms.items()
+                for method, by_status in by_method.items()
+                for status_code, histogram in by_status.items()
+            ]
+            in_progress = self._in_progress
+
+        gauges = {"http_requests_in_progress": in_progress}
+        gauges.update({name: collect() for name, collect in self._gauge_collectors.items()})
+        counters = {name: collect() for name, collect in self._counter_collectors.items()}
+        return {
+            "pid": os.getpid(),
+            "buckets": list(self.buckets),
+            "histograms": histograms,
+            "gauges": gauges,
+            "gauge_merge": {name: merge for name, merge in self._gauge_merge.items() if merge != "sum"},
+            "counters": counters,
+        }
+
+    def render(self, snapshot: dict[str, Any] | None = None) -> str:
+        return render_prometheus(snapshot or self.snapshot(), self._help)
+
+
+def merge_snapshots(snapshots: list[dict[str, Any]], *, live_pids: set[int] | None = None) -> dict[str, Any]:
+    """Sum per-worker snapshots. Gauges only count for workers in `live_pids` (all if omitted).
+
+    Gauges registered with merge="max" take the largest worker value instead of the sum.
+    """
+    buckets: list[float] = snapshots[0]["buckets"] if snapshots else list(LATENCY_BUCKETS)
+    histograms: dict[tuple[str, str, int], dict[str, Any]] = {}
+    gauges: dict[str, float] = {}
+    counters: dict[str, float] = {}
+
+    for snapshot in snapshots:
+        for series in snapshot["histograms"]:
+            key = (series["route"], series["method"], series["status"])
+            merged = histograms.get(key)
+            if merged is None:
+                histograms[key] = {**series, "buckets": list(series["buckets"])}
+                continue
+            merged["buckets"] = [left + right for left, right in zip(merged["buckets"], series["buckets"])]
+            merged["count"] += series["count"]
+            merged["sum"] += series["sum"]
+        for name, value in snapshot["counters"].items():
+            counters[name] = counters.get(name, 0) + value
+        if live_pids is None or snapshot["pid"] in live_pids:
+            gauge_merge = snapshot.get("gauge_merge", {})
+            for name, value in snapshot["gauges"].items():
+                if gauge_merge.get(name) == "max":
+                    gauges[name] = max(gauges.get(name, value), value)
+                else:
+                    gauges[name] = gauges.get(name, 0) + value
+
+    return {"buckets": buckets, "histograms": list(histograms.values()), "gauges": gauges, "counters": counters}
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _series_labels(item: dict[str, Any]) -> str:
+    return f'route="{_escape_label(item["route"])}",method="{_escape_label(item["method"])}",status="{item["status"]}"'
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def render_prometheus(snapshot: dict[str, Any], help_texts: dict[str, str] | None = None) -> str:
+    help_texts = help_texts or METRIC_HELP
+    lines: list[str] = []
+
+    def header(name: str, metric_type: str) -> None:
+        lines.append(f"# HELP {name} {help_texts.get(name, name)}")
+        lines.append(f"# TYPE {name} {metric_type}")
+
+    series = sorted(snapshot["histograms"], key=lambda item: (item["route"], item["method"], item["status"]))
+    bounds = [_format_value(bound) for bound in snapshot["buckets"]] + ["+Inf"]
+
+    header("http_request_duration_seconds", "histogram")
+    for item in series:
+        labels = _series_labels(item)
+        cumulative = 0
+        for bound, bucket_count in zip(bounds, item["buckets"]):
+            cumulative += bucket_count
+            lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f"http_request_duration_seconds_sum{{{labels}}} {_format_value(item['sum'])}")
+        lines.append(f"http_request_duration_seconds_count{{{labels}}} {item['count']}")
+
+    header("http_requests_total", "counter")
+    for item in series:
+        labels = _series_labels(item)
+        lines.append(f"http_requests_total{{{labels}}} {item['count']}")
+
+    for name, value in sorted(snapshot["gauges"].items()):
+        header(name, "gauge")
+        lines.append(f"{name} {_format_value(value)}")
+    for name, value in sorted(snapshot["counters"].items()):
+        header(name, "counter")
+        lines.append(f"{name} {_format_value(value)}")
+
+    return "\n".join(lines) + "\n"
+
+
+class MultiprocessMetricsWriter:
+    """Shares metrics between uvicorn/gunicorn workers through one JSON file per worker.
+
+    Each worker flushes its snapshot every `interval_seconds` and right before it serves /metrics.
+    Counters and histograms from every file are summed, so a restarted worker's history is kept;
+    gauges only come from files refreshed recently enough to belong to a live worker.
+    """
+
+    def __init__(self, registry: MetricsRegistry, directory: Path, *, interval_seconds: float) -> None:
+        self.registry = registry
+        self.directory = directory
+        self.interval_seconds = interval_seconds
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def path(self) -> Path:
+        return self.directory / f"metrics-{os.getpid()}.json"
+
+    def start(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="metrics-flush", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval_seconds)
+            self._thread = None
+        self.flush()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            self.flush()
+
+    def flush(self) -> None:
+        path = self.path
+        temporary_path = path.with_suffix(".tmp")
+        temporary_path.write_text(json.dumps(self.registry.snapshot()), encoding="utf-8")
+        os.replace(temporary_path, path)
+
+    def collect(self) -> dict[str, Any]:
+        self.flush()
+        fresh_after = time.time() - self.interval_seconds * 3
+        snapshots: list[dict[str, Any]] = []
+        live_pids: set[int] = set()
+        for path in sorted(self.directory.glob("metrics-*.json")):
+            try:
+                snapshot = json.loads(path.read_text(encoding="utf-8"))
+                modified_at = path.stat().st_mtime
+            except (OSError, ValueError):
+                # A worker may be replacing its file at this moment; it is picked up next scrape.
+                continue
+            snapshots.append(snapshot)
+            if modified_at >= fresh_after:
+                live_pids.add(snapshot["pid"])
+        return merge_snapshots(snapshots, live_pids=live_pids)
+
+
+metrics_registry = MetricsRegistry()
+_writer: MultiprocessMetricsWriter | None = None
+
+
+def configure_metrics(settings: Settings | None = None) -> None:
+    global _writer
+    settings = settings or get_settings()
+    if _writer is not None:
+        _writer.stop()
+        _writer = None
+    if settings.METRICS_MULTIPROCESS_DIR:
+        _writer = MultiprocessMetricsWriter(
+            metrics_registry,
+            Path(settings.METRICS_MULTIPROCESS_DIR),
+            interval_seconds=settings.METRICS_FLUSH_INTERVAL_SECONDS,
+        )
+        _writer.start()
+
+
+def render_metrics() -> str:
+    if _writer is not None:
+        return metrics_registry.render(_writer.collect())
+    return metrics_registry.render()
+
+
+def stop_metrics() -> None:
+    global _writer
+    if _writer is not None:
+        _writer.stop()
+        _writer = None
+
+
+atexit.register(stop_metrics)
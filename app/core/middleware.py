@@ -1,33 +1,96 @@
 import logging
 import time
 import uuid
+from pathlib import Path
 
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from app.core.database import Database
+from app.core.db_metrics import get_pool_status, start_request_db_stats
+from app.core.metrics import get_route_label, metrics_registry
+from app.core.profiling import finish_request_profile, start_request_profile
 from app.core.request_context import set_trace_id
 
 logger = logging.getLogger("app.request")
 
 
-class RequestContextMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        trace_id = request.headers.get("x-trace-id") or str(uuid.uuid4())
+class RequestContextMiddleware:
+    """Pure ASGI middleware: no extra task or memory stream per request, and bodies stream through.
+
+    With `profile_dir` set, a request sent with `x-profile: 1` runs under cProfile and its stats
+    are written to `<profile_dir>/<trace id>.prof`; the response names the file in `x-profile`.
+    With `db_stats_headers`, responses carry the statements run so far in `x-db-queries` and
+    `x-db-time-ms` (a streamed body's later queries only reach the log). With `database`, the log
+    line also reports its pool's checked-out and overflow connections.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        profile_dir: str | Path | None = None,
+        db_stats_headers: bool = False,
+        database: Database | None = None,
+    ) -> None:
+        self.app = app
+        self.database = database
+        self.profile_dir = Path(profile_dir) if profile_dir is not None else None
+        self.db_stats_headers = db_stats_headers
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        trace_id = headers.get("x-trace-id") or str(uuid.uuid4())
         set_trace_id(trace_id)
+        request_db_stats = start_request_db_stats()
+        status_code = 500
+        request_profile = None
+        if self.profile_dir is not None and headers.get("x-profile") == "1":
+            request_profile = start_request_profile(self.profile_dir, trace_id)
+
+        async def send_with_trace_id(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                response_headers = MutableHeaders(scope=message)
+                response_headers["x-trace-id"] = trace_id
+                if request_profile is not None:
+                    response_headers["x-profile"] = request_profile.path.name
+                if self.db_stats_headers:
+                    response_headers["x-db-queries"] = str(request_db_stats.query_count)
+                    response_headers["x-db-time-ms"] = f"{request_db_stats.query_time_ms:.2f}"
+            await send(message)
 
+        metrics_registry.request_started()
         started_at = time.perf_counter()
-        response = await call_next(request)
-        elapsed_ms = round((time.perf_counter() - started_at) * 1000, 2)
-
-        response.headers["x-trace-id"] = trace_id
-
-        logger.info(
-            "request_completed",
-            extra={
-                "route": request.url.path,
-                "method": request.method,
-                "status_code": response.status_code,
-                "latency_ms": elapsed_ms,
-            },
-        )
-        return response
+        try:
+            await self.app(scope, receive, send_with_trace_id)
+        finally:
+            elapsed = time.perf_counter() - started_at
+            if request_profile is not None:
+                finish_request_profile(request_profile)
+            route = get_route_label(scope)
+            metrics_registry.request_finished(
+                route=route, method=scope["method"], status_code=status_code, seconds=elapsed
+            )
+            elapsed_ms = round(elapsed * 1000, 2)
+            pool_status = get_pool_status(self.database.active_pool() if self.database is not None else None)
+            logger.info(
+                "request_completed",
+                extra={
+                    "route": scope["path"],
+                    "route_template": route,
+                    "method": scope["method"],
+                    "status_code": status_code,
+                    "latency_ms": elapsed_ms,
+                    "db_query_count": request_db_stats.query_count,
+                    "db_time_ms": round(request_db_stats.query_time_ms, 2),
+                    "db_pool_wait_ms": round(request_db_stats.pool_wait_ms, 2),
+                    "db_pool_checked_out": pool_status.get("checked_out"),
+                    "db_pool_overflow": pool_status.get("overflow"),
+                },
+            )
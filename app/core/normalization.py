@@ -1,7 +1,9 @@
 import re
 
 DEFAULT_CATEGORY = "general"
+SEARCH_TOKEN_MAX_LENGTH = 100
 _WHITESPACE_PATTERN = re.compile(r"\s+")
+_TOKEN_PATTERN = re.compile(r"\w+")
 
 
 def normalize_single_line_whitespace(value: str) -> str:
@@ -49,4 +51,10 @@ def normalize_category(
 
 
 def canonicalize_text(value: str) -> str:
-    return normalize_single_line_whitespace(value).casefold()
\ No newline at end of file
+    return normalize_single_line_whitespace(value).casefold()
+
+
+def tokenize_text(value: str) -> list[str]:
+    """Distinct search tokens of `value` in first-seen order, canonicalized like duplicate keys."""
+    tokens = _TOKEN_PATTERN.findall(canonicalize_text(value))
+    return list(dict.fromkeys(token[:SEARCH_TOKEN_MAX_LENGTH] for token in tokens))
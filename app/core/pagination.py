@@ -0,0 +1,88 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Literal, get_args
+
+from app.core.errors import InvalidCursorError
+
+TodoSort = Literal["created_desc", "created_asc", "updated_desc", "updated_asc"]
+TODO_SORTS: tuple[str, ...] = get_args(TodoSort)
+DEFAULT_TODO_SORT: TodoSort = "created_desc"
+MAX_ROW_INT = 2**63 - 1
+
+
+def _encode(payload: list[Any]) -> str:
+    raw_payload = json.dumps(payload, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw_payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode(cursor: str) -> Any:
+    padded_cursor = cursor + "=" * (-len(cursor) % 4)
+    try:
+        return json.loads(base64.urlsafe_b64decode(padded_cursor.encode("ascii")))
+    except (binascii.Error, UnicodeError, ValueError) as error:
+        raise InvalidCursorError(cursor) from error
+
+
+def _is_int(value: object) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _is_row_int(value: object) -> bool:
+    # Ids, sequence numbers and scores are compared against BIGINT columns; anything outside that
+    # range can only come from a forged cursor and would fail in the driver instead.
+    return _is_int(value) and 0 <= value <= MAX_ROW_INT
+
+
+def encode_cursor(*, sort: TodoSort, sort_value: datetime, todo_id: int) -> str:
+    return _encode([sort, sort_value.isoformat(), todo_id])
+
+
+def decode_cursor(cursor: str, *, sort: TodoSort) -> tuple[datetime, int]:
+    """Return the (sort value, id) position a cursor points after, if it was issued for `sort`."""
+    payload = _decode(cursor)
+    # Cursors issued before sorting existed are [created_at, id] for the default order.
+    if isinstance(payload, list) and len(payload) == 2:
+        payload = [DEFAULT_TODO_SORT, *payload]
+    try:
+        cursor_sort, raw_sort_value, todo_id = payload
+        sort_value = datetime.fromisoformat(raw_sort_value)
+    except (TypeError, ValueError) as error:
+        raise InvalidCursorError(cursor) from error
+
+    if cursor_sort != sort or not _is_row_int(todo_id):
+        raise InvalidCursorError(cursor)
+    return sort_value, todo_id
+
+
+def encode_search_cursor(*, score: int, created_at: datetime, todo_id: int) -> str:
+    return _encode(["relevance", score, created_at.isoformat(), todo_id])
+
+
+def decode_search_cursor(cursor: str) -> tuple[int, datetime, int]:
+    try:
+        kind, score, raw_created_at, todo_id = _decode(cursor)
+        created_at = datetime.fromisoformat(raw_created_at)
+    except (TypeError, ValueError) as error:
+        raise InvalidCursorError(cursor) from error
+
+    if kind != "relevance" or not _is_row_int(score) or not _is_row_int(todo_id):
+        raise InvalidCursorError(cursor)
+    return score, created_at, todo_id
+
+
+def encode_change_token(*, change_seq: int, todo_id: int, horizon_seq: int) -> str:
+    return _encode(["changes", change_seq, todo_id, horizon_seq])
+
+
+def decode_change_token(token: str) -> tuple[int, int, int]:
+    """Return (change_seq, todo_id, horizon_seq): the feed position and the oldest deletion still needed."""
+    try:
+        kind, change_seq, todo_id, horizon_seq = _decode(token)
+    except (TypeError, ValueError) as error:
+        raise InvalidCursorError(token) from error
+
+    if kind != "changes" or not all(_is_row_int(value) for value in (change_seq, todo_id, horizon_seq)):
+        raise InvalidCursorError(token)
+    return change_seq, todo_id, horizon_seq
@@ -0,0 +1,86 @@
+import cProfile
+import functools
+import pstats
+import re
+import threading
+from collections.abc import Callable
+from contextvars import ContextVar, Token
+from pathlib import Path
+from typing import ParamSpec, TypeVar
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+# One profiled request per process at a time: cProfile hooks are per thread, and a second request
+# profiling the event loop thread would replace the first one's hook.
+_profile_slot = threading.Lock()
+
+
+class RequestProfile:
+    """cProfile data for one request, from the event loop and every worker thread it used.
+
+    The event loop thread's profile also sees other requests' coroutines that ran while this one
+    was waiting, so profile with little concurrent traffic.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._loop_profile = cProfile.Profile()
+        self._thread_profiles: list[cProfile.Profile] = []
+        self._lock = threading.Lock()
+        self.context_token: Token[RequestProfile | None] | None = None
+
+    def start(self) -> None:
+        self._loop_profile.enable()
+
+    def stop(self) -> None:
+        self._loop_profile.disable()
+
+    def run_in_thread(self, operation: Callable[P, T], *args: P.args, **kwargs: P.kwargs) -> T:
+        profile = cProfile.Profile()
+        with self._lock:
+            self._thread_profiles.append(profile)
+        return profile.runcall(operation, *args, **kwargs)
+
+    def dump(self) -> None:
+        stats = pstats.Stats(self._loop_profile)
+        with self._lock:
+            for profile in self._thread_profiles:
+                stats.add(profile)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        stats.dump_stats(self.path)
+
+
+request_profile_context: ContextVar[RequestProfile | None] = ContextVar("request_profile", default=None)
+
+
+def profile_path(directory: Path, trace_id: str) -> Path:
+    # The trace id comes from a request header; keep it from naming a path outside `directory`.
+    return directory / f"{re.sub(r'[^A-Za-z0-9_.-]', '_', trace_id)[:128]}.prof"
+
+
+def start_request_profile(directory: Path, trace_id: str) -> RequestProfile | None:
+    """Profile the current request, or return None while another request is being profiled."""
+    if not _profile_slot.acquire(blocking=False):
+        return None
+    request_profile = RequestProfile(profile_path(directory, trace_id))
+    request_profile.context_token = request_profile_context.set(request_profile)
+    request_profile.start()
+    return request_profile
+
+
+def finish_request_profile(request_profile: RequestProfile) -> None:
+    request_profile.stop()
+    request_profile_context.reset(request_profile.context_token)
+    try:
+        request_profile.dump()
+    finally:
+        _profile_slot.release()
+
+
+def profile_in_thread(operation: Callable[P, T]) -> Callable[P, T]:
+    """Wrap work handed to a worker thread so the current request's profile includes it."""
+    request_profile = request_profile_context.get()
+    if request_profile is None:
+        return operation
+    return functools.partial(request_profile.run_in_thread, operation)
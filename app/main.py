@@ -1,20 +1,124 @@
-from fastapi import FastAPI
+import logging
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
 
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse
+
+from app import IMPORT_STARTED_AT
 from app.api.v1.router import api_router
-from app.core.config import get_settings
+from app.core.cache import build_response_cache
+from app.core.config import Settings, get_settings
+from app.core.database import Database
+from app.core.db_metrics import get_pool_status
 from app.core.errors import register_exception_handlers
-from app.core.logging_config import configure_logging
+from app.core.events import build_event_broker
+from app.core.logging_config import configure_logging, get_dropped_log_count
+from app.core.metrics import PROMETHEUS_CONTENT_TYPE, configure_metrics, metrics_registry, render_metrics
 from app.core.middleware import RequestContextMiddleware
 
-settings = get_settings()
-configure_logging()
+logger = logging.getLogger("app.startup")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Pre-warm the database pool before traffic arrives; stop the event poller and close the pool on shutdown."""
+    started_at = time.perf_counter()
+    database: Database = app.state.database
+    prewarmed_connections = await database.prewarm(database.settings.DB_PREWARM_CONNECTIONS)
+    app.state.startup_seconds = time.perf_counter() - started_at
+    logger.info(
+        "app_started",
+        extra={
+            "import_ms": round(IMPORT_SECONDS * 1000, 2),
+            "create_app_ms": round(app.state.create_app_seconds * 1000, 2),
+            "startup_ms": round(app.state.startup_seconds * 1000, 2),
+            "prewarmed_connections": prewarmed_connections,
+        },
+    )
+    try:
+        yield
+    finally:
+        app.state.event_broker.stop()
+        await database.dispose()
+
+
+def create_app(settings: Settings | None = None) -> FastAPI:
+    started_at = time.perf_counter()
+    settings = settings or get_settings()
+    configure_logging(settings)
+    configure_metrics(settings)
+
+    database = Database(settings)
+    event_broker = build_event_broker(settings)
+
+    app = FastAPI(title=settings.APP_NAME, version="1.0.0", lifespan=lifespan)
+    # Everything a request needs from the settings lives here, so routes follow this app's settings.
+    app.state.settings = settings
+    app.state.database = database
+    app.state.response_cache = build_response_cache(settings)
+    app.state.event_broker = event_broker
+    app.state.startup_seconds = 0.0
+    app.add_middleware(
+        RequestContextMiddleware,
+        profile_dir=settings.PROFILING_DIR if settings.PROFILING_ENABLED else None,
+        db_stats_headers=settings.DB_STATS_HEADERS_ENABLED,
+        database=database,
+    )
+    register_exception_handlers(app)
+    app.include_router(api_router, prefix=settings.API_V1_PREFIX)
+
+    @app.get("/health", tags=["health"])
+    def health() -> dict[str, str]:
+        return {"status": "ok"}
+
+    @app.get("/internal/db-pool", tags=["internal"])
+    def db_pool_stats(request: Request) -> dict[str, Any]:
+        return request.app.state.database.pool_stats()
+
+    @app.get("/metrics", tags=["internal"], response_class=PlainTextResponse, include_in_schema=False)
+    def metrics() -> PlainTextResponse:
+        return PlainTextResponse(render_metrics(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+    metrics_registry.add_gauge_collector(
+        "db_pool_checked_out",
+        "Database connections currently checked out of the pool.",
+        lambda: get_pool_status(database.active_pool()).get("checked_out", 0),
+    )
+    metrics_registry.add_gauge_collector(
+        "db_pool_overflow",
+        "Connections open beyond the pool size.",
+        lambda: get_pool_status(database.active_pool()).get("overflow", 0),
+    )
+    metrics_registry.add_gauge_collector(
+        "todo_event_subscribers",
+        "Open GET /todos/events streams on this worker.",
+        lambda: event_broker.subscriber_count,
+    )
+    metrics_registry.add_counter_collector(
+        "log_records_dropped_total",
+        "Log records dropped because the log queue was full.",
+        get_dropped_log_count,
+    )
+    metrics_registry.add_gauge_collector(
+        "app_import_seconds",
+        "Time spent importing the app package, app.main and their dependencies (slowest worker).",
+        lambda: IMPORT_SECONDS,
+        merge="max",
+    )
+    metrics_registry.add_gauge_collector(
+        "app_startup_seconds",
+        "Time from create_app() to the lifespan accepting traffic, pool pre-warm included (slowest worker).",
+        lambda: app.state.create_app_seconds + app.state.startup_seconds,
+        merge="max",
+    )
+
+    app.state.create_app_seconds = time.perf_counter() - started_at
+    return app
 
-app = FastAPI(title=settings.APP_NAME, version="1.0.0")
-app.add_middleware(RequestContextMiddleware)
-register_exception_handlers(app)
-app.include_router(api_router, prefix=settings.API_V1_PREFIX)
 
+IMPORT_SECONDS = time.perf_counter() - IMPORT_STARTED_AT
 
-@app.get("/health", tags=["health"])
-def health() -> dict[str, str]:
-    return {"status": "ok"}
+app = create_app()
@@ -1,4 +1,7 @@
 from app.models.base import Base
 from app.models.todo import Todo
+from app.models.todo_category_stats import TodoCategoryStats
+from app.models.todo_change import TodoChangeSequence, TodoTombstone
+from app.models.todo_title_token import TodoTitleToken
 
-__all__ = ["Base", "Todo"]
+__all__ = ["Base", "Todo", "TodoCategoryStats", "TodoChangeSequence", "TodoTitleToken", "TodoTombstone"]
@@ -1,15 +1,29 @@
-from datetime import datetime
+from datetime import datetime, timezone
 
-from sqlalchemy import BigInteger, Boolean, CheckConstraint, DateTime, Integer, String, func, text
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import BigInteger, Boolean, CheckConstraint, DateTime, Index, Integer, String, text
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base
+from app.models.todo_title_token import TodoTitleToken
+
+
+def utc_now() -> datetime:
+    # Stored naive in UTC (matching the GETUTCDATE() server defaults) and bound from Python so
+    # persisted values compare exactly against keyset cursors on every backend.
+    return datetime.now(timezone.utc).replace(tzinfo=None)
 
 
 class Todo(Base):
     __tablename__ = "todos"
     __table_args__ = (
         CheckConstraint("length(category) <= 50", name="ck_todos_category_len"),
+        Index("ix_todos_created_at_id", "created_at", "id"),
+        # Equality filter first, then the keyset order, so filtered pages are range scans.
+        Index("ix_todos_is_completed_created_at_id", "is_completed", "created_at", "id"),
+        Index("ix_todos_category_canonical_created_at_id", "category_canonical", "created_at", "id"),
+        Index("ix_todos_updated_at_id", "updated_at", "id"),
+        Index("ix_todos_change_seq_id", "change_seq", "id"),
+        Index("uq_todos_title_category_canonical", "title_canonical", "category_canonical", unique=True),
     )
 
     id: Mapped[int] = mapped_column(
@@ -22,8 +36,17 @@ class Todo(Base):
         default="general",
         server_default=text("'general'"),
     )
+    # Casefolded, whitespace-collapsed copies used for duplicate detection; casefold can expand
+    # characters (for example "ß" -> "ss"), hence the wider columns.
+    title_canonical: Mapped[str] = mapped_column(String(400), nullable=False)
+    category_canonical: Mapped[str] = mapped_column(String(100), nullable=False)
     is_completed: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=False), nullable=False, default=func.now())
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=False), nullable=False, default=utc_now)
     updated_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=False), nullable=False, default=func.now(), onupdate=func.now()
+        DateTime(timezone=False), nullable=False, default=utc_now, onupdate=utc_now
     )
+    # Sequence number of the transaction that last wrote the row; drives GET /todos/changes.
+    change_seq: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0, server_default=text("0"))
+
+    # Kept in step with `title` by TodoRepository; never loaded by list queries.
+    title_tokens: Mapped[list[TodoTitleToken]] = relationship(cascade="all, delete-orphan", passive_deletes=True)
@@ -0,0 +1,14 @@
+from sqlalchemy import Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class TodoCategoryStats(Base):
+    """Running todo counts per canonical category, adjusted in the same transaction as each write."""
+
+    __tablename__ = "todo_category_stats"
+
+    category_canonical: Mapped[str] = mapped_column(String(100), primary_key=True)
+    total: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    completed: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
@@ -0,0 +1,32 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, Index, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class TodoChangeSequence(Base):
+    """Single-row counter handing out change sequence numbers to writing transactions.
+
+    A writer increments it right before committing and holds the row lock until then, so
+    sequence numbers become visible in increasing order and a reader never skips one.
+    """
+
+    __tablename__ = "todo_change_sequence"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    last_seq: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    # Tombstones at or below this sequence have been compacted away; older sync tokens are stale.
+    compacted_seq: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+
+class TodoTombstone(Base):
+    """Marks a deleted todo for the change feed until compaction removes it."""
+
+    __tablename__ = "todo_tombstones"
+    __table_args__ = (Index("ix_todo_tombstones_change_seq_todo_id", "change_seq", "todo_id"),)
+
+    todo_id: Mapped[int] = mapped_column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    change_seq: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    deleted_at: Mapped[datetime] = mapped_column(DateTime(timezone=False), nullable=False)
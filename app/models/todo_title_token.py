@@ -0,0 +1,27 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class TodoTitleToken(Base):
+    """Inverted index over todo titles: one row per distinct canonical token of a title."""
+
+    __tablename__ = "todo_title_tokens"
+    __table_args__ = (
+        Index("ix_todo_title_tokens_todo_id", "todo_id"),
+        # A single-token search walks this index in result order and stops after one page.
+        Index("ix_todo_title_tokens_token_created_at_todo_id", "token", "created_at", "todo_id"),
+    )
+
+    # (token, todo_id) is the primary key, so a token lookup is a range scan of the clustered index.
+    token: Mapped[str] = mapped_column(String(100), primary_key=True)
+    todo_id: Mapped[int] = mapped_column(
+        BigInteger().with_variant(Integer, "sqlite"),
+        ForeignKey("todos.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    # Copy of todos.created_at, which never changes, so results can be ordered from the index alone.
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=False), nullable=False)
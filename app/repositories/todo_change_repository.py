@@ -0,0 +1,100 @@
+from datetime import datetime
+
+from sqlalchemy import and_, delete, func, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.todo_change import TodoChangeSequence, TodoTombstone
+
+SEQUENCE_ROW_ID = 1
+
+
+class TodoChangeRepository:
+    def __init__(self, db_session: Session) -> None:
+        self.db_session = db_session
+
+    def next_seq(self) -> int:
+        """Claim the next change sequence number; the counter row stays locked until commit."""
+        change_seq = self.db_session.scalar(
+            update(TodoChangeSequence)
+            .where(TodoChangeSequence.id == SEQUENCE_ROW_ID)
+            .values(last_seq=TodoChangeSequence.last_seq + 1)
+            .returning(TodoChangeSequence.last_seq)
+            .execution_options(synchronize_session=False)
+        )
+        if change_seq is not None:
+            return change_seq
+
+        # The migration creates the row; databases built from the models start without it.
+        try:
+            with self.db_session.begin_nested():
+                self.db_session.execute(
+                    insert(TodoChangeSequence).values(id=SEQUENCE_ROW_ID, last_seq=1, compacted_seq=0)
+                )
+        except IntegrityError:
+            return self.next_seq()
+        return 1
+
+    def lock_writers(self) -> None:
+        """Wait for in-flight writes and hold new ones off until commit, without claiming a number.
+
+        Every write claims its sequence number before touching `todos` or the stats, so taking the
+        counter row first keeps the same lock order as the writers and cannot deadlock with them.
+        """
+        self.db_session.execute(
+            update(TodoChangeSequence)
+            .where(TodoChangeSequence.id == SEQUENCE_ROW_ID)
+            .values(last_seq=TodoChangeSequence.last_seq)
+            .execution_options(synchronize_session=False)
+        )
+
+    def get_sequence_state(self) -> tuple[int, int]:
+        """(last_seq, compacted_seq); both 0 before the first write."""
+        row = self.db_session.execute(
+            select(TodoChangeSequence.last_seq, TodoChangeSequence.compacted_seq).where(
+                TodoChangeSequence.id == SEQUENCE_ROW_ID
+            )
+        ).first()
+        return (row.last_seq, row.compacted_seq) if row is not None else (0, 0)
+
+    def list_tombstones(self, *, after: tuple[int, int], min_seq: int, limit: int) -> list[TodoTombstone]:
+        after_seq, after_todo_id = after
+        return list(
+            self.db_session.scalars(
+                select(TodoTombstone)
+                .where(
+                    TodoTombstone.change_seq >= min_seq,
+                    or_(
+                        TodoTombstone.change_seq > after_seq,
+                        and_(TodoTombstone.change_seq == after_seq, TodoTombstone.todo_id > after_todo_id),
+                    ),
+                )
+                .order_by(TodoTombstone.change_seq, TodoTombstone.todo_id)
+                .limit(limit)
+            )
+        )
+
+    def compact(self, *, deleted_before: datetime) -> int:
+        """Drop tombstones of deletions older than `deleted_before`; returns how many were removed.
+
+        Whole sequence numbers are removed (everything up to the newest expired one), so a sync
+        token is either fully served or rejected, never served with part of a deletion missing.
+        """
+        through_seq = self.db_session.scalar(
+            select(func.max(TodoTombstone.change_seq)).where(TodoTombstone.deleted_at < deleted_before)
+        )
+        if through_seq is None:
+            return 0
+
+        removed = self.db_session.execute(
+            delete(TodoTombstone)
+            .where(TodoTombstone.change_seq <= through_seq)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        self.db_session.execute(
+            update(TodoChangeSequence)
+            .where(TodoChangeSequence.id == SEQUENCE_ROW_ID, TodoChangeSequence.compacted_seq < through_seq)
+            .values(compacted_seq=through_seq)
+            .execution_options(synchronize_session=False)
+        )
+        return removed
@@ -1,7 +1,76 @@
-from sqlalchemy import desc, func
-from sqlalchemy.orm import Session
+from collections.abc import Collection, Iterator, Sequence
+from dataclasses import dataclass
+from datetime import datetime
 
-from app.models.todo import Todo
+from sqlalchemy import (
+    ColumnElement,
+    Integer,
+    Row,
+    Select,
+    and_,
+    case,
+    delete,
+    desc,
+    func,
+    insert,
+    literal,
+    not_,
+    or_,
+    select,
+    update,
+)
+from sqlalchemy.orm import Session, aliased
+
+from app.core.normalization import canonicalize_text, tokenize_text
+from app.core.pagination import DEFAULT_TODO_SORT, TodoSort
+from app.models.todo import Todo, utc_now
+from app.models.todo_change import TodoTombstone
+from app.models.todo_title_token import TodoTitleToken
+
+# Keeps IN lists well below SQL Server's 2100 bind parameter limit.
+IN_CLAUSE_CHUNK_SIZE = 1000
+
+
+@dataclass(frozen=True)
+class TodoSelection:
+    ids: Sequence[int] | None = None
+    category: str | None = None
+    is_completed: bool | None = None
+
+
+@dataclass(frozen=True)
+class TodoListFilter:
+    category: str | None = None
+    is_completed: bool | None = None
+    created_after: datetime | None = None
+    created_before: datetime | None = None
+    updated_since: datetime | None = None
+
+
+def _list_filter_criteria(list_filter: TodoListFilter) -> list[ColumnElement[bool]]:
+    criteria: list[ColumnElement[bool]] = []
+    if list_filter.category is not None:
+        criteria.append(Todo.category_canonical == list_filter.category)
+    if list_filter.is_completed is not None:
+        criteria.append(Todo.is_completed == list_filter.is_completed)
+    if list_filter.created_after is not None:
+        criteria.append(Todo.created_at > list_filter.created_after)
+    if list_filter.created_before is not None:
+        criteria.append(Todo.created_at < list_filter.created_before)
+    if list_filter.updated_since is not None:
+        criteria.append(Todo.updated_at >= list_filter.updated_since)
+    return criteria
+
+
+def _selection_criteria(entity: type[Todo], selection: TodoSelection) -> list[ColumnElement[bool]]:
+    criteria: list[ColumnElement[bool]] = []
+    if selection.ids is not None:
+        criteria.append(entity.id.in_(selection.ids))
+    if selection.category is not None:
+        criteria.append(entity.category_canonical == selection.category)
+    if selection.is_completed is not None:
+        criteria.append(entity.is_completed == selection.is_completed)
+    return criteria
 
 
 class TodoRepository:
@@ -9,12 +78,167 @@ class TodoRepository:
         self.db_session = db_session
 
     def create_todo(self, *, title: str, category: str = "general") -> Todo:
-        todo = Todo(title=title, category=category, is_completed=False)
+        created_at = utc_now()
+        todo = Todo(
+            title=title,
+            title_canonical=canonicalize_text(title),
+            category=category,
+            category_canonical=canonicalize_text(category),
+            is_completed=False,
+            created_at=created_at,
+            updated_at=created_at,
+            title_tokens=[TodoTitleToken(token=token, created_at=created_at) for token in tokenize_text(title)],
+        )
         self.db_session.add(todo)
         return todo
 
-    def list_todos(self) -> list[Todo]:
-        return self.db_session.query(Todo).order_by(desc(Todo.created_at), desc(Todo.id)).all()
+    def create_todos(self, *, rows: Sequence[tuple[str, str]], change_seq: int = 0) -> list[Row]:
+        if not rows:
+            return []
+
+        # A single executemany INSERT; RETURNING plain rows (not ORM entities) avoids a refresh per
+        # row once the transaction commits and expires the session. Rows come back in no particular
+        # order, so callers match them up by value.
+        statement = insert(Todo).returning(
+            Todo.id,
+            Todo.title,
+            Todo.category,
+            Todo.is_completed,
+            Todo.created_at,
+            Todo.updated_at,
+            Todo.change_seq,
+        )
+        result = self.db_session.execute(
+            statement,
+            [
+                {
+                    "title": title,
+                    "title_canonical": canonicalize_text(title),
+                    "category": category,
+                    "category_canonical": canonicalize_text(category),
+                    "is_completed": False,
+                    "change_seq": change_seq,
+                }
+                for title, category in rows
+            ],
+        )
+        created_rows = list(result.all())
+        token_rows = [
+            {"token": token, "todo_id": created_row.id, "created_at": created_row.created_at}
+            for created_row in created_rows
+            for token in tokenize_text(created_row.title)
+        ]
+        if token_rows:
+            self.db_session.execute(insert(TodoTitleToken), token_rows)
+        return created_rows
+
+    def list_todos(
+        self,
+        *,
+        limit: int | None = None,
+        after: tuple[datetime, int] | None = None,
+        list_filter: TodoListFilter | None = None,
+        sort: TodoSort = DEFAULT_TODO_SORT,
+    ) -> list[Todo]:
+        sort_column = Todo.updated_at if sort.startswith("updated_") else Todo.created_at
+        descending = sort.endswith("_desc")
+
+        query = self.db_session.query(Todo)
+        if list_filter is not None:
+            query = query.filter(*_list_filter_criteria(list_filter))
+        if after is not None:
+            # Spelled out rather than a row-value comparison, which SQL Server does not support.
+            sort_value, todo_id = after
+            if descending:
+                position = or_(sort_column < sort_value, and_(sort_column == sort_value, Todo.id < todo_id))
+            else:
+                position = or_(sort_column > sort_value, and_(sort_column == sort_value, Todo.id > todo_id))
+            query = query.filter(position)
+
+        if descending:
+            query = query.order_by(desc(sort_column), desc(Todo.id))
+        else:
+            query = query.order_by(sort_column, Todo.id)
+        if limit is not None:
+            query = query.limit(limit)
+        return query.all()
+
+    def search_todos(
+        self,
+        *,
+        tokens: Sequence[str],
+        limit: int,
+        after: tuple[int, datetime, int] | None = None,
+    ) -> list[tuple[Todo, int]]:
+        """Todos whose title contains any of `tokens`, most matched tokens first, then newest first."""
+        if len(tokens) == 1:
+            # Every match scores 1, so the page is read straight off the (token, created_at, todo_id)
+            # index in order, however many titles share the token.
+            score = literal(1, type_=Integer)
+            created_at, todo_id = TodoTitleToken.created_at, TodoTitleToken.todo_id
+            statement = (
+                select(todo_id, created_at, score.label("score"))
+                .where(TodoTitleToken.token == tokens[0])
+                .order_by(desc(created_at), desc(todo_id))
+            )
+        else:
+            # Ranking needs every match's score, so this costs O(total matches of all tokens).
+            matches = (
+                select(
+                    TodoTitleToken.todo_id,
+                    func.max(TodoTitleToken.created_at).label("created_at"),
+                    func.count().label("score"),
+                )
+                .where(TodoTitleToken.token.in_(tokens))
+                .group_by(TodoTitleToken.todo_id)
+                .subquery()
+            )
+            score, created_at, todo_id = matches.c.score, matches.c.created_at, matches.c.todo_id
+            statement = select(matches).order_by(desc(score), desc(created_at), desc(todo_id))
+
+        if after is not None:
+            after_score, after_created_at, after_todo_id = after
+            statement = statement.where(
+                or_(
+                    score < after_score,
+                    and_(
+                        score == after_score,
+                        or_(
+                            created_at < after_created_at,
+                            and_(created_at == after_created_at, todo_id < after_todo_id),
+                        ),
+                    ),
+                )
+            )
+
+        page = self.db_session.execute(statement.limit(limit)).all()
+        todos = {
+            todo.id: todo
+            for todo in self.db_session.scalars(select(Todo).where(Todo.id.in_([row.todo_id for row in page])))
+        }
+        return [(todos[row.todo_id], row.score) for row in page if row.todo_id in todos]
+
+    def list_changed_todos(self, *, after: tuple[int, int] | None, limit: int) -> list[Todo]:
+        """Todos written after the (change_seq, id) position, oldest change first."""
+        statement = select(Todo).order_by(Todo.change_seq, Todo.id).limit(limit)
+        if after is not None:
+            after_seq, after_todo_id = after
+            statement = statement.where(
+                or_(Todo.change_seq > after_seq, and_(Todo.change_seq == after_seq, Todo.id > after_todo_id))
+            )
+        return list(self.db_session.scalars(statement))
+
+    def iter_todo_chunks(self, *, chunk_size: int) -> Iterator[list[Todo]]:
+        after: tuple[datetime, int] | None = None
+        while True:
+            chunk = self.list_todos(limit=chunk_size, after=after)
+            if chunk:
+                yield chunk
+            if len(chunk) < chunk_size:
+                return
+
+            last_todo = chunk[-1]
+            after = (last_todo.created_at, last_todo.id)
 
     def get_todo_by_id(self, *, todo_id: int) -> Todo | None:
         return self.db_session.query(Todo).filter(Todo.id == todo_id).first()
@@ -23,12 +247,27 @@ class TodoRepository:
         return (
             self.db_session.query(Todo)
             .filter(
-                func.lower(Todo.title) == title.lower(),
-                func.lower(Todo.category) == category.lower(),
+                Todo.title_canonical == title,
+                Todo.category_canonical == category,
             )
             .first()
         )
 
+    def find_existing_canonical_keys(self, *, keys: Collection[tuple[str, str]]) -> set[tuple[str, str]]:
+        canonical_titles = sorted({title for title, _ in keys})
+
+        existing_keys: set[tuple[str, str]] = set()
+        for start in range(0, len(canonical_titles), IN_CLAUSE_CHUNK_SIZE):
+            title_chunk = canonical_titles[start : start + IN_CLAUSE_CHUNK_SIZE]
+            rows = (
+                self.db_session.query(Todo.title_canonical, Todo.category_canonical)
+                .filter(Todo.title_canonical.in_(title_chunk))
+                .all()
+            )
+            existing_keys.update((title, category) for title, category in rows)
+
+        return existing_keys.intersection(keys)
+
     def get_duplicate_for_update(
         self,
         *,
@@ -40,15 +279,120 @@ class TodoRepository:
             self.db_session.query(Todo)
             .filter(
                 Todo.id != todo_id,
-                func.lower(Todo.title) == title.lower(),
-                func.lower(Todo.category) == category.lower(),
+                Todo.title_canonical == title,
+                Todo.category_canonical == category,
             )
             .first()
         )
 
+    def find_bulk_category_conflict(self, *, selection: TodoSelection, category: str) -> str | None:
+        selection_criteria = _selection_criteria(Todo, selection)
+
+        # Two selected rows sharing a title would collide once moved into the same category.
+        conflict_in_selection = self.db_session.scalar(
+            select(func.min(Todo.title))
+            .where(*selection_criteria)
+            .group_by(Todo.title_canonical)
+            .having(func.count() > 1)
+            .limit(1)
+        )
+        if conflict_in_selection is not None:
+            return conflict_in_selection
+
+        selected_todo = aliased(Todo)
+        selected_titles = select(selected_todo.title_canonical).where(
+            *_selection_criteria(selected_todo, selection)
+        )
+        return self.db_session.scalar(
+            select(Todo.title)
+            .where(
+                Todo.category_canonical == category,
+                Todo.title_canonical.in_(selected_titles),
+                not_(and_(*selection_criteria)),
+            )
+            .limit(1)
+        )
+
+    def count_by_category(self, *, selection: TodoSelection | None = None) -> dict[str, tuple[int, int]]:
+        """(total, completed) per canonical category, over `selection` or the whole table."""
+        statement = select(
+            Todo.category_canonical,
+            func.count(),
+            func.coalesce(func.sum(case((Todo.is_completed, 1), else_=0)), 0),
+        ).group_by(Todo.category_canonical)
+        if selection is not None:
+            statement = statement.where(*_selection_criteria(Todo, selection))
+        return {category: (total, completed) for category, total, completed in self.db_session.execute(statement)}
+
+    def update_todos(
+        self,
+        *,
+        selection: TodoSelection,
+        category: str | None = None,
+        is_completed: bool | None = None,
+        change_seq: int | None = None,
+    ) -> int:
+        values = {}
+        change_criteria: list[ColumnElement[bool]] = []
+        if category is not None:
+            # Case-only differences are not a change, mirroring single-item updates.
+            category_canonical = canonicalize_text(category)
+            category_changes = Todo.category_canonical != category_canonical
+            values["category"] = case((category_changes, category), else_=Todo.category)
+            values["category_canonical"] = category_canonical
+            change_criteria.append(category_changes)
+        if is_completed is not None:
+            values["is_completed"] = is_completed
+            change_criteria.append(Todo.is_completed != is_completed)
+        if change_seq is not None:
+            values["change_seq"] = change_seq
+
+        statement = (
+            update(Todo)
+            .where(*_selection_criteria(Todo, selection), or_(*change_criteria))
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        return self.db_session.execute(statement).rowcount
+
+    def delete_todos(self, *, selection: TodoSelection, change_seq: int) -> int:
+        # Title tokens go with their todos through the FK's ON DELETE CASCADE.
+        self._delete_tombstones(select(Todo.id).where(*_selection_criteria(Todo, selection)))
+        self.db_session.execute(
+            insert(TodoTombstone).from_select(
+                ["todo_id", "change_seq", "deleted_at"],
+                select(Todo.id, literal(change_seq), literal(utc_now())).where(*_selection_criteria(Todo, selection)),
+            )
+        )
+        statement = (
+            delete(Todo)
+            .where(*_selection_criteria(Todo, selection))
+            .execution_options(synchronize_session=False)
+        )
+        return self.db_session.execute(statement).rowcount
+
     def save(self, todo: Todo) -> Todo:
+        title_canonical = canonicalize_text(todo.title)
+        if title_canonical != todo.title_canonical:
+            existing_tokens = {title_token.token: title_token for title_token in todo.title_tokens}
+            todo.title_tokens = [
+                existing_tokens.get(token) or TodoTitleToken(token=token, created_at=todo.created_at)
+                for token in tokenize_text(todo.title)
+            ]
+        todo.title_canonical = title_canonical
+        todo.category_canonical = canonicalize_text(todo.category)
         self.db_session.add(todo)
         return todo
 
-    def delete_todo(self, *, todo: Todo) -> None:
+    def delete_todo(self, *, todo: Todo, change_seq: int) -> None:
+        self._delete_tombstones([todo.id])
+        self.db_session.add(TodoTombstone(todo_id=todo.id, change_seq=change_seq, deleted_at=utc_now()))
         self.db_session.delete(todo)
+
+    def _delete_tombstones(self, todo_ids: Collection[int] | Select) -> None:
+        # SQLite may hand a deleted id to a new row; its old tombstone makes way for the new one.
+        self.db_session.execute(
+            delete(TodoTombstone)
+            .where(TodoTombstone.todo_id.in_(todo_ids))
+            .execution_options(synchronize_session=False)
+        )
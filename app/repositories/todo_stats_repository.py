@@ -0,0 +1,104 @@
+from collections.abc import Mapping
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.todo_category_stats import TodoCategoryStats
+
+# (total, completed) per canonical category: absolute counts or deltas depending on context.
+CategoryCounts = Mapping[str, tuple[int, int]]
+
+
+class TodoStatsRepository:
+    def __init__(self, db_session: Session) -> None:
+        self.db_session = db_session
+
+    def list_category_stats(self) -> list[TodoCategoryStats]:
+        return list(
+            self.db_session.scalars(
+                select(TodoCategoryStats)
+                .where(TodoCategoryStats.total > 0)
+                .order_by(TodoCategoryStats.category_canonical)
+            )
+        )
+
+    def adjust(self, deltas: CategoryCounts) -> None:
+        """Add `deltas` to the stored counters inside the caller's transaction.
+
+        Increments are relative (`total = total + :delta`), so concurrent writers never overwrite
+        each other. Categories are visited in sorted order to keep lock acquisition consistent.
+        """
+        emptied: list[str] = []
+        for category, (total, completed) in sorted(deltas.items()):
+            if total == 0 and completed == 0:
+                continue
+            if total < 0:
+                # Only a decrement can leave a category empty.
+                emptied.append(category)
+            if self._increment(category, total, completed):
+                continue
+            try:
+                with self.db_session.begin_nested():
+                    self.db_session.execute(
+                        insert(TodoCategoryStats).values(
+                            category_canonical=category, total=total, completed=completed
+                        )
+                    )
+            except IntegrityError:
+                # Another writer created the row between our update and insert.
+                self._increment(category, total, completed)
+
+        if emptied:
+            self.db_session.execute(
+                delete(TodoCategoryStats)
+                .where(TodoCategoryStats.category_canonical.in_(emptied), TodoCategoryStats.total <= 0)
+                .execution_options(synchronize_session=False)
+            )
+
+    def replace(self, counts: CategoryCounts) -> int:
+        """Overwrite the counters with `counts`; returns how many categories were wrong."""
+        stored = {
+            row.category_canonical: (row.total, row.completed)
+            for row in self.db_session.execute(
+                select(TodoCategoryStats.category_canonical, TodoCategoryStats.total, TodoCategoryStats.completed)
+            )
+        }
+        corrected = 0
+        for category, (total, completed) in counts.items():
+            if stored.get(category) == (total, completed):
+                continue
+            corrected += 1
+            if category in stored:
+                self.db_session.execute(
+                    update(TodoCategoryStats)
+                    .where(TodoCategoryStats.category_canonical == category)
+                    .values(total=total, completed=completed)
+                    .execution_options(synchronize_session=False)
+                )
+            else:
+                self.db_session.execute(
+                    insert(TodoCategoryStats).values(category_canonical=category, total=total, completed=completed)
+                )
+
+        stale = [category for category in stored if category not in counts]
+        if stale:
+            corrected += len(stale)
+            self.db_session.execute(
+                delete(TodoCategoryStats)
+                .where(TodoCategoryStats.category_canonical.in_(stale))
+                .execution_options(synchronize_session=False)
+            )
+        return corrected
+
+    def _increment(self, category: str, total: int, completed: int) -> bool:
+        result = self.db_session.execute(
+            update(TodoCategoryStats)
+            .where(TodoCategoryStats.category_canonical == category)
+            .values(
+                total=TodoCategoryStats.total + total,
+                completed=TodoCategoryStats.completed + completed,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount > 0
@@ -1,9 +1,16 @@
 from datetime import datetime, timezone
-from typing import Any
+from typing import Annotated, Any, Literal
 
-from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, field_validator, model_validator
 
 from app.core.normalization import normalize_category, normalize_title
+from app.core.pagination import MAX_ROW_INT
+
+TODO_BATCH_MAX_ITEMS = 10_000
+TODO_BULK_MAX_IDS = 1_000
+
+# Todo ids are BIGINT; larger values would fail in the driver instead of returning 422.
+TodoId = Annotated[int, Field(ge=1, le=MAX_ROW_INT)]
 
 
 class TodoCreateRequest(BaseModel):
@@ -18,7 +25,11 @@ class TodoCreateRequest(BaseModel):
     @field_validator("category", mode="before")
     @classmethod
     def normalize_category_field(cls, value: Any) -> str:
-        return normalize_category(value, default_if_empty=True, coerce_numeric=False)
+        try:
+            return normalize_category(value, default_if_empty=True, coerce_numeric=False)
+        except TypeError as error:
+            # Pydantic only turns ValueError into a validation error; a TypeError would escape as a 500.
+            raise ValueError(str(error)) from error
 
 
 class TodoUpdateRequest(BaseModel):
@@ -49,6 +60,62 @@ class TodoUpdateRequest(BaseModel):
         return self
 
 
+class TodoBulkFilter(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    category: str | int | float | None = None
+    is_completed: bool | None = None
+
+    @field_validator("category", mode="before")
+    @classmethod
+    def normalize_optional_category(cls, value: Any) -> str | None:
+        if value is None:
+            return value
+        return normalize_category(value, default_if_empty=False, coerce_numeric=True)
+
+    @model_validator(mode="after")
+    def ensure_filter_has_at_least_one_field(self) -> "TodoBulkFilter":
+        if self.category is None and self.is_completed is None:
+            raise ValueError("At least one filter field is required")
+        return self
+
+
+class TodoBulkSelection(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    ids: list[TodoId] | None = Field(default=None, min_length=1, max_length=TODO_BULK_MAX_IDS)
+    filter: TodoBulkFilter | None = None
+
+    @model_validator(mode="after")
+    def ensure_exactly_one_selector(self) -> "TodoBulkSelection":
+        if (self.ids is None) == (self.filter is None):
+            raise ValueError("Exactly one of ids or filter is required")
+        return self
+
+
+class TodoBulkUpdateRequest(TodoBulkSelection):
+    # Titles are not bulk-updatable: giving several rows the same title always breaks uniqueness.
+    category: str | int | float | None = None
+    is_completed: bool | None = None
+
+    @field_validator("category", mode="before")
+    @classmethod
+    def normalize_optional_category(cls, value: Any) -> str | None:
+        if value is None:
+            return value
+        return normalize_category(value, default_if_empty=False, coerce_numeric=True)
+
+    @model_validator(mode="after")
+    def ensure_patch_has_at_least_one_field(self) -> "TodoBulkUpdateRequest":
+        if self.category is None and self.is_completed is None:
+            raise ValueError("At least one field is required")
+        return self
+
+
+class TodoBulkDeleteRequest(TodoBulkSelection):
+    pass
+
+
 class TodoResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
@@ -65,3 +132,80 @@ class TodoResponse(BaseModel):
         if value.tzinfo is None:
             return value.replace(tzinfo=timezone.utc)
         return value.astimezone(timezone.utc)
+
+
+# Validates ORM rows and writes JSON bytes for a whole list in one call into pydantic-core,
+# instead of a model per row followed by FastAPI's response_model pass and json.dumps.
+TODO_LIST_ADAPTER = TypeAdapter(list[TodoResponse])
+
+
+class TodoBatchItemError(BaseModel):
+    code: str
+    message: str
+
+
+class TodoBatchItemResult(BaseModel):
+    index: int
+    status: Literal["created", "duplicate", "invalid"]
+    todo: TodoResponse | None = None
+    error: TodoBatchItemError | None = None
+
+
+class TodoBatchCreateResponse(BaseModel):
+    created: int
+    duplicates: int
+    invalid: int
+    results: list[TodoBatchItemResult]
+
+
+class TodoBulkResult(BaseModel):
+    affected: int
+
+
+class TodoChangesResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    todos: list[TodoResponse]
+    deleted_ids: list[int]
+    next_token: str
+    has_more: bool
+
+
+class TodoCategoryStatsResponse(BaseModel):
+    category: str
+    total: int
+    completed: int
+    open: int
+
+
+class TodoStatsResponse(BaseModel):
+    total: int
+    completed: int
+    open: int
+    categories: list[TodoCategoryStatsResponse]
+
+
+class TodoImportRowError(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    line: int
+    code: str
+    message: str
+
+
+class TodoImportJobResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    job_id: str = Field(validation_alias="id")
+    status: Literal["running", "completed", "failed"]
+    format: Literal["csv", "jsonl"]
+    rows_read: int
+    created: int
+    duplicates: int
+    invalid: int
+    errors: list[TodoImportRowError]
+    errors_truncated: bool
+    started_at: datetime
+    finished_at: datetime | None
+    elapsed_seconds: float
+    rows_per_second: float
@@ -0,0 +1,158 @@
+"""Run the API with production settings: several workers, uvloop/httptools and a shared pool budget.
+
+Reads the SERVER_* settings (see ``app.core.config``); command-line flags override them. The
+app's modules are imported before any worker starts, so a broken deploy fails here instead of in
+a restart loop. ``app.main`` itself is not: building the app starts the log listener and, with
+several workers, a metrics writer, which the supervisor must not run. With one worker the
+preloaded modules are reused; further workers are spawned by uvicorn and import them again.
+
+Usage:
+    python -m app.server
+    python -m app.server --workers 4 --port 8080
+"""
+
+import argparse
+import importlib
+import importlib.util
+import logging
+import math
+import os
+import tempfile
+from pathlib import Path
+
+import uvicorn
+
+from app.core.config import Settings, get_settings
+from app.core.logging_config import configure_logging
+
+APP = "app.main:app"
+# Everything app.main needs (FastAPI, SQLAlchemy, models, services, routes) without building the app.
+PRELOAD_MODULES = ("app.core.database", "app.api.v1.router")
+CGROUP_V2_CPU_MAX = Path("/sys/fs/cgroup/cpu.max")
+CGROUP_V1_CPU_QUOTA = Path("/sys/fs/cgroup/cpu/cpu.cfs_quota_us")
+CGROUP_V1_CPU_PERIOD = Path("/sys/fs/cgroup/cpu/cpu.cfs_period_us")
+
+logger = logging.getLogger("app.server")
+
+
+def cgroup_cpu_limit() -> float | None:
+    """The container's CPU quota in cores, or None when it has none (or this is not Linux)."""
+    try:
+        if CGROUP_V2_CPU_MAX.exists():
+            quota, period = CGROUP_V2_CPU_MAX.read_text().split()[:2]
+            return None if quota == "max" else int(quota) / int(period)
+        if CGROUP_V1_CPU_QUOTA.exists():
+            quota = int(CGROUP_V1_CPU_QUOTA.read_text())
+            return None if quota <= 0 else quota / int(CGROUP_V1_CPU_PERIOD.read_text())
+    except (OSError, ValueError):
+        return None
+    return None
+
+
+def available_cpus() -> int:
+    # A container sees every host core in os.cpu_count(); its affinity mask and quota are the limit.
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+    limit = cgroup_cpu_limit()
+    if limit is not None:
+        cpus = min(cpus, math.ceil(limit))
+    return max(cpus, 1)
+
+
+def event_loop_implementation() -> str:
+    return "uvloop" if importlib.util.find_spec("uvloop") is not None else "asyncio"
+
+
+def http_implementation() -> str:
+    return "httptools" if importlib.util.find_spec("httptools") is not None else "h11"
+
+
+def split_pool_budget(budget: int, workers: int, pool_size: int) -> tuple[int, int]:
+    """Per-worker (pool_size, max_overflow) that keep all workers together within `budget`.
+
+    Each worker keeps up to `pool_size` connections open and may borrow the rest of its share as
+    overflow, so idle connections stay at the configured level while bursts can use the whole budget.
+    """
+    share = budget // workers
+    if share < 1:
+        raise ValueError(f"DB_POOL_BUDGET={budget} leaves no connection for each of {workers} workers")
+    worker_pool_size = min(pool_size, share)
+    return worker_pool_size, share - worker_pool_size
+
+
+def worker_environment(settings: Settings, workers: int) -> dict[str, str]:
+    """Settings overrides that every worker must see, passed through the environment."""
+    environment: dict[str, str] = {}
+    if settings.DB_POOL_BUDGET is not None:
+        pool_size, max_overflow = split_pool_budget(settings.DB_POOL_BUDGET, workers, settings.DB_POOL_SIZE)
+        environment["DB_POOL_SIZE"] = str(pool_size)
+        environment["DB_MAX_OVERFLOW"] = str(max_overflow)
+    if workers > 1 and not settings.METRICS_MULTIPROCESS_DIR:
+        # Without a shared directory /metrics would only report the worker that happened to answer.
+        environment["METRICS_MULTIPROCESS_DIR"] = tempfile.mkdtemp(prefix="todo-metrics-")
+    # Per-process backends would serve another worker's stale pages and 304s until the TTL and
+    # never deliver its events, so several workers always share them through local SQLite files.
+    if workers > 1 and settings.RESPONSE_CACHE_BACKEND == "memory":
+        environment["RESPONSE_CACHE_BACKEND"] = "sqlite"
+    if workers > 1 and settings.TODO_EVENTS_BACKEND == "memory":
+        environment["TODO_EVENTS_BACKEND"] = "sqlite"
+    return environment
+
+
+def main(argv: list[str] | None = None) -> None:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default=settings.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=settings.SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=settings.SERVER_WORKERS, help="0 means one per available CPU")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args(argv)
+
+    workers = args.workers or available_cpus()
+    try:
+        environment = worker_environment(settings, workers)
+    except ValueError as exc:
+        parser.error(str(exc))
+    for name in ("RESPONSE_CACHE_BACKEND", "TODO_EVENTS_BACKEND"):
+        if name in environment:
+            logger.warning("%s=memory is per worker; using sqlite so all %d workers share it", name, workers)
+    os.environ.update(environment)
+    get_settings.cache_clear()
+    settings = get_settings()
+    configure_logging(settings, use_queue=False)
+
+    # Preload: fail before spawning anything, and with one worker skip a second import.
+    for module in PRELOAD_MODULES:
+        importlib.import_module(module)
+
+    loop = event_loop_implementation()
+    http = http_implementation()
+    logger.info(
+        "server_starting",
+        extra={
+            "workers": workers,
+            "loop": loop,
+            "http": http,
+            "db_pool_size": settings.DB_POOL_SIZE,
+            "db_max_overflow": settings.DB_MAX_OVERFLOW,
+        },
+    )
+    uvicorn.run(
+        APP,
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        loop=loop,
+        http=http,
+        backlog=settings.SERVER_BACKLOG,
+        timeout_keep_alive=settings.SERVER_KEEPALIVE_SECONDS,
+        limit_concurrency=settings.SERVER_LIMIT_CONCURRENCY,
+        timeout_graceful_shutdown=settings.SERVER_GRACEFUL_SHUTDOWN_SECONDS,
+        access_log=settings.SERVER_ACCESS_LOG,
+        log_level=args.log_level,
+        # The app logs through its own queue handler; keep uvicorn from replacing it.
+        log_config=None,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+from collections.abc import AsyncIterator, Awaitable, Callable, Sequence
+from typing import TypeVar
+
+import anyio
+from sqlalchemy import inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.cache import ResponseCache
+from app.core.events import EventBroker
+from app.core.profiling import profile_in_thread
+from app.models.todo import Todo
+from app.models.todo_category_stats import TodoCategoryStats
+from app.schemas.todo import (
+    TodoBulkDeleteRequest,
+    TodoBulkUpdateRequest,
+    TodoCreateRequest,
+    TodoUpdateRequest,
+)
+from app.services.todo_service import TodoBatchItemOutcome, TodoChanges, TodoListQuery, TodoPage, TodoService
+
+T = TypeVar("T")
+SessionRunner = Callable[[Callable[[Session], T]], Awaitable[T]]
+
+
+def _loaded(service: TodoService, todo: Todo) -> Todo:
+    # Callers serialize results outside the runner, where a lazy refresh would either block the
+    # event loop or fail on the async driver, so expired rows are reloaded here.
+    if inspect(todo).expired:
+        service.db_session.refresh(todo)
+    return todo
+
+
+class AsyncTodoService:
+    """Awaitable facade over TodoService.
+
+    The business rules live once, in the sync service. On an AsyncSession they run on the async
+    driver through ``run_sync``; on a plain Session they run in a worker thread.
+    """
+
+    def __init__(
+        self,
+        runner: SessionRunner,
+        response_cache: ResponseCache | None = None,
+        event_broker: EventBroker | None = None,
+    ) -> None:
+        self._runner = runner
+        self.response_cache = response_cache
+        self.event_broker = event_broker
+
+    @classmethod
+    def from_session(
+        cls,
+        db_session: Session,
+        response_cache: ResponseCache | None = None,
+        event_broker: EventBroker | None = None,
+    ) -> "AsyncTodoService":
+        async def run_in_thread(operation: Callable[[Session], T]) -> T:
+            return await anyio.to_thread.run_sync(profile_in_thread(operation), db_session)
+
+        return cls(run_in_thread, response_cache, event_broker)
+
+    @classmethod
+    def from_async_session(
+        cls,
+        db_session: AsyncSession,
+        response_cache: ResponseCache | None = None,
+        event_broker: EventBroker | None = None,
+    ) -> "AsyncTodoService":
+        async def run_on_async_driver(operation: Callable[[Session], T]) -> T:
+            return await db_session.run_sync(operation)
+
+        return cls(run_on_async_driver, response_cache, event_broker)
+
+    async def _run(self, method: Callable[[TodoService], T]) -> T:
+        services: list[TodoService] = []
+
+        def operation(db_session: Session) -> T:
+            service = TodoService(db_session, self.response_cache, self.event_broker, defer_notifications=True)
+            services.append(service)
+            return method(service)
+
+        try:
+            return await self._runner(operation)
+        finally:
+            # The async driver runs `operation` on the event loop, so the cache bump and event
+            # publishing (SQLite writes with the shared backends) are sent from a worker thread.
+            # Shielded: whatever was committed must be announced even if the request is cancelled.
+            if services and services[0].has_pending_notifications:
+                with anyio.CancelScope(shield=True):
+                    await anyio.to_thread.run_sync(services[0].send_notifications)
+
+    async def create_todo(self, payload: TodoCreateRequest) -> Todo:
+        return await self._run(lambda service: _loaded(service, service.create_todo(payload)))
+
+    async def create_todos_batch(self, payloads: Sequence[TodoCreateRequest]) -> list[TodoBatchItemOutcome]:
+        return await self._run(lambda service: service.create_todos_batch(payloads))
+
+    async def list_todo_page(
+        self, *, limit: int, cursor: str | None = None, query: TodoListQuery | None = None
+    ) -> TodoPage:
+        return await self._run(lambda service: service.list_todo_page(limit=limit, cursor=cursor, query=query))
+
+    async def search_todos(self, *, q: str, limit: int, cursor: str | None = None) -> TodoPage:
+        return await self._run(lambda service: service.search_todos(q=q, limit=limit, cursor=cursor))
+
+    async def list_changes(self, *, since: str | None, limit: int) -> TodoChanges:
+        return await self._run(lambda service: service.list_changes(since=since, limit=limit))
+
+    async def get_category_stats(self) -> list[TodoCategoryStats]:
+        return await self._run(lambda service: service.get_category_stats())
+
+    async def export_todos(self, *, chunk_size: int) -> AsyncIterator[list[Todo]]:
+        chunks = await self._run(lambda service: service.export_todos(chunk_size=chunk_size))
+        while (chunk := await self._run(lambda _: next(chunks, None))) is not None:
+            yield chunk
+
+    async def get_todo(self, *, todo_id: int) -> Todo:
+        return await self._run(lambda service: service.get_todo(todo_id=todo_id))
+
+    async def update_todo(self, *, todo_id: int, payload: TodoUpdateRequest, if_match: str | None = None) -> Todo:
+        return await self._run(
+            lambda service: _loaded(
+                service, service.update_todo(todo_id=todo_id, payload=payload, if_match=if_match)
+            )
+        )
+
+    async def update_todos_bulk(self, payload: TodoBulkUpdateRequest) -> int:
+        return await self._run(lambda service: service.update_todos_bulk(payload))
+
+    async def delete_todo(self, *, todo_id: int) -> None:
+        await self._run(lambda service: service.delete_todo(todo_id=todo_id))
+
+    async def delete_todos_bulk(self, payload: TodoBulkDeleteRequest) -> int:
+        return await self._run(lambda service: service.delete_todos_bulk(payload))
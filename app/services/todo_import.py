@@ -0,0 +1,249 @@
+import codecs
+import csv
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import AsyncIterable, AsyncIterator
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Literal
+
+from app.core.errors import ImportJobConflictError, ImportJobNotFoundError, TodoValidationError
+from app.schemas.todo import TodoCreateRequest
+from app.services.async_todo_service import AsyncTodoService
+from app.services.todo_service import TodoBatchItemOutcome
+
+ImportFormat = Literal["csv", "jsonl"]
+
+# A single line longer than this is rejected rather than buffered without bound.
+MAX_IMPORT_LINE_CHARS = 1_000_000
+# Likewise a quoted CSV field that keeps going across lines, e.g. after a stray unmatched quote.
+MAX_IMPORT_RECORD_CHARS = 1_000_000
+MAX_FINISHED_IMPORT_JOBS = 100
+
+
+@dataclass(frozen=True)
+class ImportRecord:
+    line: int
+    payload: TodoCreateRequest | None = None
+    error: str | None = None
+
+
+@dataclass(frozen=True)
+class ImportRowError:
+    line: int
+    code: str
+    message: str
+
+
+@dataclass
+class ImportJob:
+    format: ImportFormat
+    max_errors: int
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: Literal["running", "completed", "failed"] = "running"
+    rows_read: int = 0
+    created: int = 0
+    duplicates: int = 0
+    invalid: int = 0
+    errors: list[ImportRowError] = field(default_factory=list)
+    errors_truncated: bool = False
+    started_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    finished_at: datetime | None = None
+    _started_monotonic: float = field(default_factory=time.monotonic, repr=False)
+    _finished_monotonic: float | None = field(default=None, repr=False)
+
+    @property
+    def elapsed_seconds(self) -> float:
+        return (self._finished_monotonic or time.monotonic()) - self._started_monotonic
+
+    @property
+    def rows_per_second(self) -> float:
+        elapsed_seconds = self.elapsed_seconds
+        return self.rows_read / elapsed_seconds if elapsed_seconds > 0 else 0.0
+
+    def record_error(self, *, line: int, code: str, message: str) -> None:
+        if len(self.errors) < self.max_errors:
+            self.errors.append(ImportRowError(line=line, code=code, message=message))
+        else:
+            self.errors_truncated = True
+
+    def record_outcome(self, line: int, outcome: TodoBatchItemOutcome) -> None:
+        if outcome.status == "created":
+            self.created += 1
+            return
+        if outcome.status == "duplicate":
+            self.duplicates += 1
+        else:
+            self.invalid += 1
+        self.record_error(line=line, code=outcome.error.code, message=outcome.error.message)
+
+    def finish(self, status: Literal["completed", "failed"]) -> None:
+        self.status = status
+        self.finished_at = datetime.now(timezone.utc)
+        self._finished_monotonic = time.monotonic()
+
+
+class ImportJobRegistry:
+    """Jobs of this process, so progress can be polled while an import runs. Old finished jobs are dropped."""
+
+    def __init__(self, max_finished_jobs: int = MAX_FINISHED_IMPORT_JOBS) -> None:
+        self.max_finished_jobs = max_finished_jobs
+        self._lock = threading.Lock()
+        self._jobs: OrderedDict[str, ImportJob] = OrderedDict()
+
+    def start(self, *, import_format: ImportFormat, max_errors: int, job_id: str | None = None) -> ImportJob:
+        job = ImportJob(format=import_format, max_errors=max_errors)
+        if job_id is not None:
+            job.id = job_id
+        with self._lock:
+            if job.id in self._jobs:
+                raise ImportJobConflictError(job.id)
+            self._jobs[job.id] = job
+            finished_ids = [other_id for other_id, other in self._jobs.items() if other.status != "running"]
+            for finished_id in finished_ids[: max(len(finished_ids) - self.max_finished_jobs, 0)]:
+                del self._jobs[finished_id]
+        return job
+
+    def get(self, job_id: str) -> ImportJob:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            raise ImportJobNotFoundError(job_id)
+        return job
+
+
+import_jobs = ImportJobRegistry()
+
+
+def get_import_jobs() -> ImportJobRegistry:
+    return import_jobs
+
+
+async def iter_text_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[str]:
+    """Decode a UTF-8 byte stream into lines (with their line endings) as the bytes arrive."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        lines = pending.split("\n")
+        pending = lines.pop()
+        if len(pending) > MAX_IMPORT_LINE_CHARS:
+            raise TodoValidationError("Import line is too long", details={"max_chars": MAX_IMPORT_LINE_CHARS})
+        for line in lines:
+            yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+def _to_payload(line: int, title: object, category: object) -> ImportRecord:
+    # Normalization and validation happen in TodoService, so invalid rows are reported per line
+    # instead of failing the chunk.
+    return ImportRecord(line=line, payload=TodoCreateRequest.model_construct(title=title, category=category))
+
+
+async def iter_csv_records(lines: AsyncIterable[str]) -> AsyncIterator[ImportRecord]:
+    header: list[str] | None = None
+    buffered: list[str] = []
+    buffered_chars = 0
+    quote_count = 0
+    line_number = 0
+    async for line in lines:
+        line_number += 1
+        buffered.append(line)
+        buffered_chars += len(line)
+        record_line = line_number - len(buffered) + 1
+        # An odd number of quotes so far means a quoted field continues on the next line.
+        quote_count += line.count('"')
+        if quote_count % 2:
+            if buffered_chars > MAX_IMPORT_RECORD_CHARS:
+                yield ImportRecord(
+                    line=record_line, error=f"Quoted field is longer than {MAX_IMPORT_RECORD_CHARS} characters"
+                )
+                buffered.clear()
+                buffered_chars = 0
+                quote_count = 0
+            continue
+
+        values = next(csv.reader(["".join(buffered)]), [])
+        buffered.clear()
+        buffered_chars = 0
+        quote_count = 0
+        if not any(value.strip() for value in values):
+            continue
+
+        if header is None:
+            header = [value.strip().lower() for value in values]
+            if "title" not in header:
+                raise TodoValidationError("CSV header must include a title column", details={"header": values})
+            continue
+
+        row = dict(zip(header, values))
+        yield _to_payload(record_line, row.get("title"), row.get("category"))
+
+    if buffered:
+        yield ImportRecord(line=line_number - len(buffered) + 1, error="Unterminated quoted field")
+
+
+async def iter_jsonl_records(lines: AsyncIterable[str]) -> AsyncIterator[ImportRecord]:
+    line_number = 0
+    async for line in lines:
+        line_number += 1
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as error:
+            yield ImportRecord(line=line_number, error=f"Invalid JSON: {error}")
+            continue
+        if not isinstance(row, dict):
+            yield ImportRecord(line=line_number, error="Each line must be a JSON object")
+            continue
+        yield _to_payload(line_number, row.get("title"), row.get("category"))
+
+
+def iter_import_records(chunks: AsyncIterable[bytes], import_format: ImportFormat) -> AsyncIterator[ImportRecord]:
+    lines = iter_text_lines(chunks)
+    return iter_csv_records(lines) if import_format == "csv" else iter_jsonl_records(lines)
+
+
+async def _import_chunk(job: ImportJob, records: list[ImportRecord], todo_service: AsyncTodoService) -> None:
+    outcomes = await todo_service.create_todos_batch([record.payload for record in records])
+    for record, outcome in zip(records, outcomes):
+        job.record_outcome(record.line, outcome)
+
+
+async def run_import(
+    job: ImportJob,
+    chunks: AsyncIterable[bytes],
+    *,
+    todo_service: AsyncTodoService,
+    chunk_size: int,
+) -> ImportJob:
+    """Stream records into the database, committing every `chunk_size` rows.
+
+    Only one chunk of records is held at a time. Committed chunks stay committed if a later chunk
+    fails; the job is then marked failed and the error propagates.
+    """
+    pending: list[ImportRecord] = []
+    try:
+        async for record in iter_import_records(chunks, job.format):
+            job.rows_read += 1
+            if record.error is not None:
+                job.invalid += 1
+                job.record_error(line=record.line, code="INVALID_ROW", message=record.error)
+                continue
+            pending.append(record)
+            if len(pending) >= chunk_size:
+                await _import_chunk(job, pending, todo_service)
+                pending = []
+        if pending:
+            await _import_chunk(job, pending, todo_service)
+    except BaseException:
+        job.finish("failed")
+        raise
+    job.finish("completed")
+    return job
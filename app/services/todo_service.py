@@ -1,26 +1,148 @@
+from collections.abc import Callable, Iterator, Sequence
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Literal
+
+from sqlalchemy import Row
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from app.core.errors import TodoDuplicateError, TodoNotFoundError, TodoValidationError
-from app.core.normalization import canonicalize_text, normalize_category, normalize_title
-from app.repositories.todo_repository import TodoRepository
-from app.schemas.todo import TodoCreateRequest, TodoUpdateRequest
+from app.core.cache import ResponseCache
+from app.core.errors import (
+    AppError,
+    ChangeTokenExpiredError,
+    TodoDuplicateError,
+    TodoNotFoundError,
+    TodoPreconditionFailedError,
+    TodoValidationError,
+)
+from app.core.etags import etag_matches, todo_etag
+from app.core.events import EventBroker, TodoEvent, TodoEventType
+from app.core.normalization import canonicalize_text, normalize_category, normalize_title, tokenize_text
+from app.core.pagination import (
+    DEFAULT_TODO_SORT,
+    TodoSort,
+    decode_change_token,
+    decode_cursor,
+    decode_search_cursor,
+    encode_change_token,
+    encode_cursor,
+    encode_search_cursor,
+)
+from app.models.todo import Todo
+from app.models.todo_category_stats import TodoCategoryStats
+from app.repositories.todo_change_repository import TodoChangeRepository
+from app.repositories.todo_repository import TodoListFilter, TodoRepository, TodoSelection
+from app.repositories.todo_stats_repository import CategoryCounts, TodoStatsRepository
+from app.schemas.todo import (
+    TodoBulkDeleteRequest,
+    TodoBulkSelection,
+    TodoBulkUpdateRequest,
+    TodoCreateRequest,
+    TodoResponse,
+    TodoUpdateRequest,
+)
+
+
+# Each query token is another index range to merge; longer queries rarely add relevance.
+SEARCH_MAX_TOKENS = 10
+
+
+@dataclass(frozen=True)
+class TodoPage:
+    items: list[Todo]
+    next_cursor: str | None
+
+
+@dataclass(frozen=True)
+class TodoChanges:
+    todos: list[Todo]
+    deleted_ids: list[int]
+    next_token: str
+    has_more: bool
+
+
+@dataclass(frozen=True)
+class TodoListQuery:
+    category: str | None = None
+    is_completed: bool | None = None
+    created_after: datetime | None = None
+    created_before: datetime | None = None
+    updated_since: datetime | None = None
+    sort: TodoSort = DEFAULT_TODO_SORT
+
+
+@dataclass(frozen=True)
+class TodoBatchItemOutcome:
+    status: Literal["created", "duplicate", "invalid"]
+    todo: Row | None = None
+    error: AppError | None = None
+
+
+def _to_naive_utc(value: datetime | None) -> datetime | None:
+    # Timestamps are stored naive in UTC; aware input is converted and naive input taken as UTC.
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _add_stats_delta(deltas: dict[str, tuple[int, int]], category: str, total: int, completed: int) -> None:
+    current_total, current_completed = deltas.get(category, (0, 0))
+    deltas[category] = (current_total + total, current_completed + completed)
+
+
+def _bulk_update_stats_deltas(
+    counts: CategoryCounts, *, category: str | None, is_completed: bool | None
+) -> dict[str, tuple[int, int]]:
+    # Every selected row leaves its old bucket and joins its new one; unchanged rows cancel out.
+    deltas: dict[str, tuple[int, int]] = {}
+    for current_category, (total, completed) in counts.items():
+        _add_stats_delta(deltas, current_category, -total, -completed)
+        next_completed = completed if is_completed is None else (total if is_completed else 0)
+        _add_stats_delta(deltas, category or current_category, total, next_completed)
+    return deltas
+
+
+def _todo_event(event_type: TodoEventType, todo: Todo) -> Callable[[], TodoEvent]:
+    # Built after the commit, when the row carries its final values.
+    return lambda: TodoEvent(
+        type=event_type,
+        change_seq=todo.change_seq,
+        data=TodoResponse.model_validate(todo).model_dump(mode="json"),
+    )
+
+
+def _bulk_event(operation: str, *, change_seq: int, count: int) -> Callable[[], TodoEvent]:
+    # Batch and bulk writes send one summary event rather than one per row, which could evict
+    # every subscriber at once; clients fetch the rows from the change feed.
+    event = TodoEvent(type="todos.changed", change_seq=change_seq, data={"operation": operation, "count": count})
+    return lambda: event
 
 
 class TodoService:
-    def __init__(self, db_session: Session) -> None:
+    def __init__(
+        self,
+        db_session: Session,
+        response_cache: ResponseCache | None = None,
+        event_broker: EventBroker | None = None,
+        *,
+        defer_notifications: bool = False,
+    ) -> None:
         self.db_session = db_session
+        self.response_cache = response_cache
+        self.event_broker = event_broker
+        # When set, commits only collect the cache bump and events; the caller sends them with
+        # `send_notifications` (the async facade does so in a worker thread).
+        self.defer_notifications = defer_notifications
+        self._pending_events: list[Callable[[], TodoEvent]] = []
+        self._committed_events: list[TodoEvent] = []
+        self._version_bump_pending = False
         self.todo_repository = TodoRepository(db_session)
+        self.todo_stats_repository = TodoStatsRepository(db_session)
+        self.todo_change_repository = TodoChangeRepository(db_session)
 
     def create_todo(self, payload: TodoCreateRequest):
-        try:
-            normalized_title = normalize_title(payload.title)
-            normalized_category = normalize_category(
-                payload.category,
-                default_if_empty=True,
-                coerce_numeric=False,
-            )
-        except (TypeError, ValueError) as error:
-            raise TodoValidationError(str(error)) from error
+        normalized_title, normalized_category = self._normalize_create_payload(payload)
 
         duplicate = self.todo_repository.get_todo_by_canonical_title_and_category(
             title=canonicalize_text(normalized_title),
@@ -30,18 +152,173 @@ class TodoService:
             raise TodoDuplicateError(title=normalized_title, category=normalized_category)
 
         todo = self.todo_repository.create_todo(title=normalized_title, category=normalized_category)
-        self.db_session.commit()
+        todo.change_seq = self.todo_change_repository.next_seq()
+        self.todo_stats_repository.adjust({canonicalize_text(normalized_category): (1, 0)})
+        self._queue_event(_todo_event("todo.created", todo))
+        self._commit_or_raise_duplicate(title=normalized_title, category=normalized_category)
         return todo
 
+    def create_todos_batch(self, payloads: Sequence[TodoCreateRequest]) -> list[TodoBatchItemOutcome]:
+        outcomes: list[TodoBatchItemOutcome | None] = [None] * len(payloads)
+        pending: dict[tuple[str, str], tuple[int, str, str]] = {}
+
+        for index, payload in enumerate(payloads):
+            try:
+                normalized_title, normalized_category = self._normalize_create_payload(payload)
+            except TodoValidationError as error:
+                outcomes[index] = TodoBatchItemOutcome(status="invalid", error=error)
+                continue
+
+            canonical_key = (canonicalize_text(normalized_title), canonicalize_text(normalized_category))
+            if canonical_key in pending:
+                outcomes[index] = TodoBatchItemOutcome(
+                    status="duplicate",
+                    error=TodoDuplicateError(title=normalized_title, category=normalized_category),
+                )
+                continue
+            pending[canonical_key] = (index, normalized_title, normalized_category)
+
+        try:
+            created_rows = self._insert_new_batch_keys(pending, outcomes)
+        except IntegrityError:
+            # A concurrent writer claimed one of the keys after the lookup; retry once so it is
+            # reported as a duplicate instead of failing the whole batch.
+            self.db_session.rollback()
+            created_rows = self._insert_new_batch_keys(pending, outcomes)
+        if created_rows:
+            deltas: dict[str, tuple[int, int]] = {}
+            for created_row in created_rows:
+                _add_stats_delta(deltas, canonicalize_text(created_row.category), 1, 0)
+            self.todo_stats_repository.adjust(deltas)
+            self._queue_event(_bulk_event("create", change_seq=created_rows[0].change_seq, count=len(created_rows)))
+            self._commit()
+
+        for created_row in created_rows:
+            index = pending[(canonicalize_text(created_row.title), canonicalize_text(created_row.category))][0]
+            outcomes[index] = TodoBatchItemOutcome(status="created", todo=created_row)
+        return outcomes
+
     def list_todos(self):
         return self.todo_repository.list_todos()
 
-    def update_todo(self, *, todo_id: int, payload: TodoUpdateRequest):
+    def list_todo_page(
+        self,
+        *,
+        limit: int,
+        cursor: str | None = None,
+        query: TodoListQuery | None = None,
+    ) -> TodoPage:
+        query = query or TodoListQuery()
+        after = decode_cursor(cursor, sort=query.sort) if cursor is not None else None
+
+        # Fetch one extra row to learn whether another page exists without a COUNT query.
+        todos = self.todo_repository.list_todos(
+            limit=limit + 1,
+            after=after,
+            list_filter=self._to_list_filter(query),
+            sort=query.sort,
+        )
+        if len(todos) <= limit:
+            return TodoPage(items=todos, next_cursor=None)
+
+        todos = todos[:limit]
+        last_todo = todos[-1]
+        sort_value = last_todo.updated_at if query.sort.startswith("updated_") else last_todo.created_at
+        return TodoPage(
+            items=todos,
+            next_cursor=encode_cursor(sort=query.sort, sort_value=sort_value, todo_id=last_todo.id),
+        )
+
+    def search_todos(self, *, q: str, limit: int, cursor: str | None = None) -> TodoPage:
+        tokens = tokenize_text(q)[:SEARCH_MAX_TOKENS]
+        if not tokens:
+            raise TodoValidationError("Search query must contain at least one word", details={"q": q})
+        after = decode_search_cursor(cursor) if cursor is not None else None
+
+        matches = self.todo_repository.search_todos(tokens=tokens, limit=limit + 1, after=after)
+        todos = [todo for todo, _ in matches[:limit]]
+        if len(matches) <= limit:
+            return TodoPage(items=todos, next_cursor=None)
+
+        last_todo, last_score = matches[limit - 1]
+        return TodoPage(
+            items=todos,
+            next_cursor=encode_search_cursor(score=last_score, created_at=last_todo.created_at, todo_id=last_todo.id),
+        )
+
+    def get_category_stats(self) -> list[TodoCategoryStats]:
+        return self.todo_stats_repository.list_category_stats()
+
+    def reconcile_category_stats(self) -> int:
+        """Recompute the category counters from `todos`; returns how many categories had drifted."""
+        # Writers wait rather than adjust counters that are being replaced.
+        self.todo_change_repository.lock_writers()
+        corrected = self.todo_stats_repository.replace(self.todo_repository.count_by_category())
+        self.db_session.commit()
+        return corrected
+
+    def list_changes(self, *, since: str | None, limit: int) -> TodoChanges:
+        """Todos written and ids deleted after the `since` token, in commit order.
+
+        Without `since` this is an initial sync: every live todo, and only deletions from then on.
+        The token's horizon is the oldest sequence whose deletions the client still needs; once
+        compaction has dropped tombstones at or past it the token is rejected with 410.
+        """
+        last_seq, compacted_seq = self.todo_change_repository.get_sequence_state()
+        if since is None:
+            # Deletions committed before this first page are of rows the client never receives.
+            after, horizon_seq = None, last_seq + 1
+        else:
+            after_seq, after_todo_id, horizon_seq = decode_change_token(since)
+            after = (after_seq, after_todo_id)
+            if compacted_seq > 0 and horizon_seq <= compacted_seq:
+                raise ChangeTokenExpiredError(token=since, compacted_seq=compacted_seq)
+
+        todos = self.todo_repository.list_changed_todos(after=after, limit=limit + 1)
+        tombstones = self.todo_change_repository.list_tombstones(
+            after=after or (horizon_seq, 0), min_seq=horizon_seq, limit=limit + 1
+        )
+        changes = sorted(
+            [(todo.change_seq, todo.id, todo) for todo in todos]
+            + [(tombstone.change_seq, tombstone.todo_id, None) for tombstone in tombstones],
+            key=lambda change: change[:2],
+        )
+        page = changes[:limit]
+        if page:
+            position_seq, position_id = page[-1][:2]
+        else:
+            position_seq, position_id = after or (horizon_seq, 0)
+
+        return TodoChanges(
+            todos=[todo for _, _, todo in page if todo is not None],
+            deleted_ids=[todo_id for _, todo_id, todo in page if todo is None],
+            next_token=encode_change_token(
+                change_seq=position_seq, todo_id=position_id, horizon_seq=max(horizon_seq, position_seq)
+            ),
+            has_more=len(changes) > limit,
+        )
+
+    def compact_tombstones(self, *, deleted_before: datetime) -> int:
+        removed = self.todo_change_repository.compact(deleted_before=_to_naive_utc(deleted_before))
+        self.db_session.commit()
+        return removed
+
+    def export_todos(self, *, chunk_size: int) -> Iterator[list[Todo]]:
+        return self.todo_repository.iter_todo_chunks(chunk_size=chunk_size)
+
+    def get_todo(self, *, todo_id: int) -> Todo:
         todo = self.todo_repository.get_todo_by_id(todo_id=todo_id)
         if todo is None:
             raise TodoNotFoundError(todo_id)
+        return todo
+
+    def update_todo(self, *, todo_id: int, payload: TodoUpdateRequest, if_match: str | None = None):
+        todo = self.get_todo(todo_id=todo_id)
+        if if_match is not None and not etag_matches(if_match, todo_etag(todo), strong=True):
+            raise TodoPreconditionFailedError(todo_id=todo.id, etag=todo_etag(todo))
 
         has_changes = False
+        previous_category, previous_completed = todo.category_canonical, todo.is_completed
         next_title = todo.title
         next_category = todo.category
 
@@ -89,15 +366,195 @@ class TodoService:
             has_changes = True
 
         if has_changes:
+            todo.change_seq = self.todo_change_repository.next_seq()
             todo = self.todo_repository.save(todo)
-            self.db_session.commit()
+            if (todo.category_canonical, todo.is_completed) != (previous_category, previous_completed):
+                deltas: dict[str, tuple[int, int]] = {}
+                _add_stats_delta(deltas, previous_category, -1, -int(previous_completed))
+                _add_stats_delta(deltas, todo.category_canonical, 1, int(todo.is_completed))
+                self.todo_stats_repository.adjust(deltas)
+            self._queue_event(_todo_event("todo.updated", todo))
+            self._commit_or_raise_duplicate(title=next_title, category=next_category)
 
         return todo
 
     def delete_todo(self, *, todo_id: int) -> None:
-        todo = self.todo_repository.get_todo_by_id(todo_id=todo_id)
-        if todo is None:
-            raise TodoNotFoundError(todo_id)
+        todo = self.get_todo(todo_id=todo_id)
+
+        change_seq = self.todo_change_repository.next_seq()
+        self.todo_repository.delete_todo(todo=todo, change_seq=change_seq)
+        self.todo_stats_repository.adjust({todo.category_canonical: (-1, -int(todo.is_completed))})
+        deleted_event = TodoEvent(type="todo.deleted", change_seq=change_seq, data={"id": todo_id})
+        self._queue_event(lambda: deleted_event)
+        self._commit()
+
+    def update_todos_bulk(self, payload: TodoBulkUpdateRequest) -> int:
+        selection = self._to_selection(payload)
+
+        next_category = None
+        if payload.category is not None:
+            next_category = self._normalize_bulk_category(payload.category)
+            conflicting_title = self.todo_repository.find_bulk_category_conflict(
+                selection=selection,
+                category=canonicalize_text(next_category),
+            )
+            if conflicting_title is not None:
+                raise TodoDuplicateError(title=conflicting_title, category=next_category)
+
+        # Counted before the write in the same transaction; a concurrent change to the selection in
+        # between is the kind of drift reconcile_category_stats repairs.
+        counts = self.todo_repository.count_by_category(selection=selection)
+        change_seq = self.todo_change_repository.next_seq()
+        try:
+            affected = self.todo_repository.update_todos(
+                selection=selection,
+                category=next_category,
+                is_completed=payload.is_completed,
+                change_seq=change_seq,
+            )
+        except IntegrityError as error:
+            self.db_session.rollback()
+            if next_category is None:
+                raise
+            conflicting_title = self.todo_repository.find_bulk_category_conflict(
+                selection=selection,
+                category=canonicalize_text(next_category),
+            )
+            if conflicting_title is None:
+                raise
+            raise TodoDuplicateError(title=conflicting_title, category=next_category) from error
+        if affected:
+            self.todo_stats_repository.adjust(
+                _bulk_update_stats_deltas(
+                    counts,
+                    category=canonicalize_text(next_category) if next_category is not None else None,
+                    is_completed=payload.is_completed,
+                )
+            )
+            self._queue_event(_bulk_event("update", change_seq=change_seq, count=affected))
+            self._commit()
+        else:
+            # Releases the change sequence row claimed for a write that matched nothing.
+            self.db_session.rollback()
+        return affected
+
+    def delete_todos_bulk(self, payload: TodoBulkDeleteRequest) -> int:
+        selection = self._to_selection(payload)
+        counts = self.todo_repository.count_by_category(selection=selection)
+        change_seq = self.todo_change_repository.next_seq()
+        affected = self.todo_repository.delete_todos(selection=selection, change_seq=change_seq)
+        if affected:
+            self.todo_stats_repository.adjust(
+                {category: (-total, -completed) for category, (total, completed) in counts.items()}
+            )
+            self._queue_event(_bulk_event("delete", change_seq=change_seq, count=affected))
+            self._commit()
+        else:
+            self.db_session.rollback()
+        return affected
 
-        self.todo_repository.delete_todo(todo=todo)
+    def _insert_new_batch_keys(
+        self,
+        pending: dict[tuple[str, str], tuple[int, str, str]],
+        outcomes: list[TodoBatchItemOutcome | None],
+    ) -> list[Row]:
+        existing_keys = self.todo_repository.find_existing_canonical_keys(keys=pending.keys())
+        to_create: list[tuple[str, str]] = []
+        for canonical_key, (index, normalized_title, normalized_category) in pending.items():
+            if canonical_key in existing_keys:
+                outcomes[index] = TodoBatchItemOutcome(
+                    status="duplicate",
+                    error=TodoDuplicateError(title=normalized_title, category=normalized_category),
+                )
+            else:
+                to_create.append((normalized_title, normalized_category))
+        if not to_create:
+            return []
+        return self.todo_repository.create_todos(rows=to_create, change_seq=self.todo_change_repository.next_seq())
+
+    def _queue_event(self, event: Callable[[], TodoEvent]) -> None:
+        if self.event_broker is not None:
+            self._pending_events.append(event)
+
+    @property
+    def has_pending_notifications(self) -> bool:
+        return self._version_bump_pending or bool(self._committed_events)
+
+    def send_notifications(self) -> None:
+        """Bump the cache version and publish the events of the commits so far.
+
+        Both may write to SQLite files, so async callers run this in a worker thread.
+        """
+        bump_version, self._version_bump_pending = self._version_bump_pending, False
+        events, self._committed_events = self._committed_events, []
+        if bump_version and self.response_cache is not None:
+            self.response_cache.bump_version()
+        if self.event_broker is not None:
+            for event in events:
+                self.event_broker.publish(event)
+
+    def _commit(self) -> None:
+        pending_events, self._pending_events = self._pending_events, []
         self.db_session.commit()
+        # Only after the commit: a reader that sees the new version must also see the new rows.
+        # Events are built here, while the session can still load the committed values.
+        self._version_bump_pending = self.response_cache is not None
+        self._committed_events.extend(event() for event in pending_events)
+        if not self.defer_notifications:
+            self.send_notifications()
+
+    def _commit_or_raise_duplicate(self, *, title: str, category: str) -> None:
+        # The unique canonical index closes the race between the duplicate check and the write.
+        # The commit expires the row on purpose: the reload returns timestamps as the database
+        # stored them (SQL Server DATETIME rounds to 1/300 s), which responses and ETags must match.
+        try:
+            self._commit()
+        except IntegrityError as error:
+            self.db_session.rollback()
+            canonical_key = (canonicalize_text(title), canonicalize_text(category))
+            if not self.todo_repository.find_existing_canonical_keys(keys=[canonical_key]):
+                raise
+            raise TodoDuplicateError(title=title, category=category) from error
+
+    @classmethod
+    def _to_list_filter(cls, query: TodoListQuery) -> TodoListFilter:
+        category = None
+        if query.category is not None:
+            category = canonicalize_text(cls._normalize_bulk_category(query.category))
+        return TodoListFilter(
+            category=category,
+            is_completed=query.is_completed,
+            created_after=_to_naive_utc(query.created_after),
+            created_before=_to_naive_utc(query.created_before),
+            updated_since=_to_naive_utc(query.updated_since),
+        )
+
+    @classmethod
+    def _to_selection(cls, payload: TodoBulkSelection) -> TodoSelection:
+        if payload.filter is None:
+            return TodoSelection(ids=payload.ids)
+
+        category = None
+        if payload.filter.category is not None:
+            category = canonicalize_text(cls._normalize_bulk_category(payload.filter.category))
+        return TodoSelection(category=category, is_completed=payload.filter.is_completed)
+
+    @staticmethod
+    def _normalize_bulk_category(category: object) -> str:
+        try:
+            return normalize_category(category, default_if_empty=False, coerce_numeric=True)
+        except (TypeError, ValueError) as error:
+            raise TodoValidationError(str(error)) from error
+
+    @staticmethod
+    def _normalize_create_payload(payload: TodoCreateRequest) -> tuple[str, str]:
+        try:
+            normalized_title = normalize_title(payload.title)
+            normalized_category = normalize_category(
+                payload.category,
+                default_if_empty=True,
+                coerce_numeric=False,
+            )
+        except (TypeError, ValueError) as error:
+            raise TodoValidationError(str(error)) from error
+        return normalized_title, normalized_category
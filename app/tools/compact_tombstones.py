@@ -0,0 +1,37 @@
+"""Drop change-feed tombstones older than the retention window.
+
+Clients whose sync token predates the removed tombstones get 410 CHANGE_TOKEN_EXPIRED from
+GET /api/v1/todos/changes and re-sync from scratch. Run it from cron, e.g. daily.
+
+Usage:
+    python -m app.tools.compact_tombstones
+    python -m app.tools.compact_tombstones --retention-days 7
+"""
+
+import argparse
+import json
+from datetime import datetime, timedelta, timezone
+
+from app.core.config import get_settings
+from app.core.database import Database
+from app.services.todo_service import TodoService
+
+
+def compact(*, retention_days: int) -> int:
+    db_session = Database(get_settings()).session()
+    try:
+        deleted_before = datetime.now(timezone.utc) - timedelta(days=retention_days)
+        return TodoService(db_session).compact_tombstones(deleted_before=deleted_before)
+    finally:
+        db_session.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--retention-days", type=int, default=get_settings().TODO_TOMBSTONE_RETENTION_DAYS)
+    args = parser.parse_args()
+    print(json.dumps({"removed_tombstones": compact(retention_days=args.retention_days)}))
+
+
+if __name__ == "__main__":
+    main()
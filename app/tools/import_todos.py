@@ -0,0 +1,87 @@
+"""Import todos from a CSV or JSONL file, committing in chunks.
+
+Uses the same streaming reader and batch insert as ``POST /api/v1/todos:import`` but talks to the
+database directly, so it is not subject to request timeouts.
+
+Usage:
+    python -m app.tools.import_todos todos.csv
+    python -m app.tools.import_todos todos.jsonl --chunk-size 5000
+"""
+
+import argparse
+import json
+import sys
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+import anyio
+
+from app.core.cache import build_response_cache
+from app.core.config import get_settings
+from app.core.database import Database
+from app.core.events import build_event_broker
+from app.schemas.todo import TodoImportJobResponse
+from app.services.async_todo_service import AsyncTodoService
+from app.services.todo_import import ImportFormat, ImportJob, run_import
+
+READ_SIZE = 64 * 1024
+
+
+async def _read_file(path: Path, job: ImportJob, *, progress: bool) -> AsyncIterator[bytes]:
+    reported_rows = 0
+    async with await anyio.open_file(path, "rb") as file:
+        while chunk := await file.read(READ_SIZE):
+            yield chunk
+            if progress and job.rows_read - reported_rows >= 10_000:
+                reported_rows = job.rows_read
+                print(
+                    f"{job.rows_read} rows read, {job.created} created, {job.rows_per_second:.0f} rows/s",
+                    file=sys.stderr,
+                )
+
+
+def _detect_format(path: Path) -> ImportFormat:
+    return "csv" if path.suffix.lower() == ".csv" else "jsonl"
+
+
+async def import_file(path: Path, import_format: ImportFormat, *, chunk_size: int, progress: bool) -> ImportJob:
+    settings = get_settings()
+    job = ImportJob(format=import_format, max_errors=settings.TODO_IMPORT_MAX_ERRORS)
+    db_session = Database(settings).session()
+    try:
+        # The shared backends, so the server's cached pages are invalidated and its streams hear about the import.
+        todo_service = AsyncTodoService.from_session(
+            db_session, build_response_cache(settings, shared=True), build_event_broker(settings, shared=True)
+        )
+        return await run_import(
+            job,
+            _read_file(path, job, progress=progress),
+            todo_service=todo_service,
+            chunk_size=chunk_size,
+        )
+    finally:
+        db_session.close()
+
+
+def main() -> None:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--format", choices=("csv", "jsonl"), help="defaults to the file extension")
+    parser.add_argument("--chunk-size", type=int, default=settings.TODO_IMPORT_CHUNK_SIZE)
+    parser.add_argument("--quiet", action="store_true", help="only print the final report")
+    args = parser.parse_args()
+
+    job = anyio.run(
+        lambda: import_file(
+            args.path,
+            args.format or _detect_format(args.path),
+            chunk_size=args.chunk_size,
+            progress=not args.quiet,
+        )
+    )
+    print(json.dumps(TodoImportJobResponse.model_validate(job).model_dump(mode="json"), indent=2))
+
+
+if __name__ == "__main__":
+    main()
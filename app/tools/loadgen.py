@@ -0,0 +1,332 @@
+"""Drive a running API with a create/list/patch/delete mix and report latency per route.
+
+Starts the production launcher (``app.server``) on a copy of a seeded SQLite database (see
+``app.tools.seed_todos``), or targets ``--url`` instead. Load is either closed (``--concurrency``
+clients, each sending its next request when the previous one returns) or open (``--rps``, requests
+sent on a fixed schedule whether or not earlier ones finished). Open-loop latency is measured from
+the scheduled send time, so a server that falls behind shows it in the percentiles instead of
+quietly getting less load.
+
+Patches hit seeded todos across the lower half of the id range. Deletes take seeded ids from the
+top down, so no request touches a row that is already gone. The process exits with status 1 when a
+route's p95 is over its budget or its error rate is over ``--max-error-rate``.
+
+Environment variables such as ``RESPONSE_CACHE_BACKEND`` or ``DB_POOL_SIZE`` are passed on to the
+server.
+
+Usage:
+    python -m app.tools.loadgen --rows 100000 --concurrency 32 --duration 30
+    python -m app.tools.loadgen --rows 100000 --rps 200 --mix create=1,list=4,patch=2,delete=1
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import shutil
+import socket
+import sqlite3
+import subprocess
+import sys
+import time
+import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import httpx
+
+from app.core.config import get_settings
+from app.tools.seed_todos import CATEGORIES, ensure_seeded_database
+
+ITEM_BUDGET_MS = 300.0
+LIST_BUDGET_MS = 500.0
+SERVER_START_TIMEOUT_SECONDS = 60.0
+OPERATIONS = ("create", "list", "patch", "delete")
+
+# The operation for one request: method, path and JSON body.
+Request = tuple[str, str, object]
+
+
+@dataclass
+class RouteStats:
+    route: str
+    budget_ms: float
+    latencies_ms: list[float] = field(default_factory=list)
+    errors: int = 0
+    status_counts: dict[int, int] = field(default_factory=dict)
+
+    def record(self, latency_ms: float, status_code: int | None) -> None:
+        self.latencies_ms.append(latency_ms)
+        key = status_code if status_code is not None else 0
+        self.status_counts[key] = self.status_counts.get(key, 0) + 1
+        if status_code is None or status_code >= 400:
+            self.errors += 1
+
+    def summary(self, elapsed_seconds: float, max_error_rate: float) -> dict:
+        latencies_ms = sorted(self.latencies_ms)
+        requests = len(latencies_ms)
+        p95_ms = percentile(latencies_ms, 0.95)
+        error_rate = self.errors / requests if requests else 0.0
+        return {
+            "route": self.route,
+            "requests": requests,
+            "throughput_rps": round(requests / elapsed_seconds, 1) if elapsed_seconds > 0 else 0.0,
+            "p50_ms": round(percentile(latencies_ms, 0.50), 2),
+            "p95_ms": round(p95_ms, 2),
+            "p99_ms": round(percentile(latencies_ms, 0.99), 2),
+            "max_ms": round(latencies_ms[-1], 2) if latencies_ms else 0.0,
+            "errors": self.errors,
+            "status_counts": {str(status): count for status, count in sorted(self.status_counts.items())},
+            "budget_ms": self.budget_ms,
+            "passed": p95_ms <= self.budget_ms and error_rate <= max_error_rate,
+        }
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(fraction * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def parse_mix(raw: str) -> dict[str, int]:
+    mix: dict[str, int] = {}
+    for part in raw.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f"unknown operation {name!r}; expected one of {', '.join(OPERATIONS)}")
+        mix[name] = int(weight or 1)
+    if not any(mix.values()):
+        raise argparse.ArgumentTypeError("the mix needs at least one operation with a positive weight")
+    return mix
+
+
+class Workload:
+    """Chooses the next request. Single-threaded (one event loop), so the counters need no lock."""
+
+    def __init__(self, *, prefix: str, rows: int, mix: dict[str, int], seed: int) -> None:
+        self.prefix = prefix
+        self.rows = rows
+        self.rng = random.Random(seed)
+        self.operations = [name for name, weight in mix.items() if weight > 0]
+        self.weights = [mix[name] for name in self.operations]
+        self.run_id = uuid.uuid4().hex[:8]
+        self.created = 0
+        self.next_delete_id = rows
+
+    def next_request(self) -> tuple[str, Request]:
+        operation = self.rng.choices(self.operations, self.weights)[0]
+        if operation == "create":
+            self.created += 1
+            body = {"title": f"loadgen {self.run_id} {self.created}", "category": self.rng.choice(CATEGORIES)}
+            return "POST /todos", ("POST", self.prefix, body)
+        if operation == "list":
+            if self.rng.random() < 0.5:
+                return "GET /todos", ("GET", f"{self.prefix}?limit=100", None)
+            return "GET /todos", ("GET", f"{self.prefix}?limit=100&category={self.rng.choice(CATEGORIES)}", None)
+        if operation == "patch":
+            todo_id = self.rng.randint(1, max(self.rows // 2, 1))
+            return "PATCH /todos/{id}", ("PATCH", f"{self.prefix}/{todo_id}", {"is_completed": self.rng.random() < 0.5})
+        if self.next_delete_id <= self.rows // 2:
+            raise RuntimeError("ran out of seeded todos to delete; seed more rows or lower the delete weight")
+        todo_id = self.next_delete_id
+        self.next_delete_id -= 1
+        return "DELETE /todos/{id}", ("DELETE", f"{self.prefix}/{todo_id}", None)
+
+
+class LoadRun:
+    def __init__(self, client: httpx.AsyncClient, workload: Workload, *, warmup_seconds: float) -> None:
+        self.client = client
+        self.workload = workload
+        self.stats = {
+            "POST /todos": RouteStats("POST /todos", ITEM_BUDGET_MS),
+            "GET /todos": RouteStats("GET /todos", LIST_BUDGET_MS),
+            "PATCH /todos/{id}": RouteStats("PATCH /todos/{id}", ITEM_BUDGET_MS),
+            "DELETE /todos/{id}": RouteStats("DELETE /todos/{id}", ITEM_BUDGET_MS),
+        }
+        self.started_at = time.perf_counter()
+        self.measure_from = self.started_at + warmup_seconds
+
+    async def send(self, scheduled_at: float | None = None) -> None:
+        route, (method, path, body) = self.workload.next_request()
+        started_at = scheduled_at if scheduled_at is not None else time.perf_counter()
+        status_code: int | None = None
+        try:
+            response = await self.client.request(method, path, json=body)
+            status_code = response.status_code
+        except httpx.HTTPError:
+            pass
+        if started_at >= self.measure_from:
+            self.stats[route].record((time.perf_counter() - started_at) * 1000, status_code)
+
+    async def run_closed(self, *, concurrency: int, until: float) -> None:
+        async def client_loop() -> None:
+            while time.perf_counter() < until:
+                await self.send()
+
+        await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+
+    async def run_open(self, *, rps: float, until: float) -> None:
+        in_flight: set[asyncio.Task] = set()
+        interval = 1.0 / rps
+        scheduled_at = time.perf_counter()
+        while scheduled_at < until:
+            delay = scheduled_at - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            task = asyncio.create_task(self.send(scheduled_at))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+            scheduled_at += interval
+        await asyncio.gather(*in_flight)
+
+
+async def drive(args: argparse.Namespace, base_url: str, rows: int) -> tuple[list[dict], float]:
+    workload = Workload(
+        prefix=f"{get_settings().API_V1_PREFIX}/todos", rows=rows, mix=args.mix, seed=args.seed
+    )
+    connections = args.concurrency or args.max_connections
+    limits = httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=args.timeout) as client:
+        run = LoadRun(client, workload, warmup_seconds=args.warmup)
+        until = run.started_at + args.warmup + args.duration
+        if args.rps:
+            await run.run_open(rps=args.rps, until=until)
+        else:
+            await run.run_closed(concurrency=args.concurrency, until=until)
+        elapsed_seconds = time.perf_counter() - run.measure_from
+    summaries = [
+        stats.summary(elapsed_seconds, args.max_error_rate) for stats in run.stats.values() if stats.latencies_ms
+    ]
+    return summaries, elapsed_seconds
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def prepare_database(db_dir: Path, rows: int) -> Path:
+    working_path = db_dir / f"loadgen-{rows}.sqlite3"
+    shutil.copyfile(ensure_seeded_database(db_dir, rows=rows), working_path)
+    # Readers must not queue behind the single writer, or the numbers mostly measure lock waits.
+    with sqlite3.connect(working_path) as connection:
+        connection.execute("PRAGMA journal_mode=WAL")
+    return working_path
+
+
+def wait_until_ready(base_url: str, process: subprocess.Popen, log_path: Path) -> None:
+    deadline = time.monotonic() + SERVER_START_TIMEOUT_SECONDS
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"server exited with status {process.returncode}; see {log_path}")
+        try:
+            if httpx.get(f"{base_url}/health", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"server did not become ready within {SERVER_START_TIMEOUT_SECONDS:.0f}s; see {log_path}")
+
+
+@contextmanager
+def run_server(database_path: Path, *, workers: int, log_path: Path) -> Iterator[str]:
+    port = free_port()
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{database_path}"}
+    command = [
+        sys.executable,
+        "-m",
+        "app.server",
+        "--host",
+        "127.0.0.1",
+        "--port",
+        str(port),
+        "--workers",
+        str(workers),
+        "--log-level",
+        "warning",
+    ]
+    with log_path.open("wb") as log_file:
+        process = subprocess.Popen(command, env=env, stdout=log_file, stderr=subprocess.STDOUT)
+        base_url = f"http://127.0.0.1:{port}"
+        try:
+            wait_until_ready(base_url, process, log_path)
+            yield base_url
+        finally:
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+
+
+def print_report(summaries: list[dict], elapsed_seconds: float) -> None:
+    print(f"{'route':<22}{'requests':>10}{'rps':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}{'budget':>8}")
+    for summary in summaries:
+        status = "ok" if summary["passed"] else "FAIL"
+        print(
+            f"{summary['route']:<22}{summary['requests']:>10}{summary['throughput_rps']:>9.1f}"
+            f"{summary['p50_ms']:>9.2f}{summary['p95_ms']:>9.2f}{summary['p99_ms']:>9.2f}"
+            f"{summary['errors']:>8}{summary['budget_ms']:>8.0f}  {status}"
+        )
+    total = sum(summary["requests"] for summary in summaries)
+    print(f"{'total':<22}{total:>10}{total / elapsed_seconds:>9.1f}")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    load = parser.add_mutually_exclusive_group()
+    load.add_argument("--concurrency", type=int, help="closed loop: clients each with one request in flight")
+    load.add_argument("--rps", type=float, help="open loop: requests started per second")
+    parser.add_argument("--duration", type=float, default=30.0, help="measured seconds, after --warmup")
+    parser.add_argument("--warmup", type=float, default=3.0)
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("create=1,list=4,patch=2,delete=1"))
+    parser.add_argument("--rows", type=int, default=100_000, help="size of the seeded database")
+    parser.add_argument("--workers", type=int, default=1, help="server worker processes; 0 means one per CPU")
+    parser.add_argument("--url", help="target this server instead of starting one; --rows must match its data")
+    parser.add_argument("--db-dir", type=Path, default=Path(".cache/benchmarks"))
+    parser.add_argument("--max-connections", type=int, default=100, help="client connection cap with --rps")
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-request timeout in seconds")
+    parser.add_argument("--max-error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0, help="seed for the request sequence")
+    parser.add_argument("--output", type=Path, help="also write the report as JSON")
+    args = parser.parse_args(argv)
+    if not args.rps and not args.concurrency:
+        args.concurrency = 16
+
+    if args.url:
+        summaries, elapsed_seconds = asyncio.run(drive(args, args.url.rstrip("/"), args.rows))
+    else:
+        args.db_dir.mkdir(parents=True, exist_ok=True)
+        database_path = prepare_database(args.db_dir, args.rows)
+        try:
+            with run_server(database_path, workers=args.workers, log_path=args.db_dir / "loadgen-server.log") as base_url:
+                summaries, elapsed_seconds = asyncio.run(drive(args, base_url, args.rows))
+        finally:
+            for suffix in ("", "-wal", "-shm"):
+                Path(f"{database_path}{suffix}").unlink(missing_ok=True)
+
+    print_report(summaries, elapsed_seconds)
+    if args.output is not None:
+        report = {
+            "load": {"concurrency": args.concurrency, "rps": args.rps},
+            "duration_seconds": round(elapsed_seconds, 2),
+            "rows": args.rows,
+            "workers": None if args.url else args.workers,
+            "mix": args.mix,
+            "routes": summaries,
+        }
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    sys.exit(0 if all(summary["passed"] for summary in summaries) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Build a SQLite database filled with a deterministic set of synthetic todos.
+
+Used by the benchmark suite and the load generator so results are comparable between runs and
+commits. The same row count always yields the same rows. Search tokens and category stats are
+filled in as the application would maintain them.
+
+Usage:
+    python -m app.tools.seed_todos .cache/todos-100k.sqlite3 --rows 100000
+"""
+
+import argparse
+import hashlib
+import random
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateTable
+
+from app.core.normalization import canonicalize_text, tokenize_text
+from app.models import Base, Todo, TodoTitleToken
+from app.services.todo_service import TodoService
+
+# Bump when the generated rows change so cached databases are rebuilt.
+SEED_VERSION = 1
+SEED_CHUNK_SIZE = 20_000
+SEED_START = datetime(2026, 1, 1)
+CATEGORIES = (
+    "general",
+    "work",
+    "home",
+    "errands",
+    "finance",
+    "health",
+    "travel",
+    "garden",
+    "school",
+    "family",
+    "car",
+    "pets",
+    "shopping",
+    "reading",
+    "music",
+    "sport",
+    "kitchen",
+    "admin",
+    "gifts",
+    "projects",
+)
+VERBS = ("buy", "call", "fix", "plan", "book", "clean", "send", "read", "pay", "check", "write", "order")
+
+
+def schema_fingerprint() -> str:
+    """Changes whenever the table definitions or the generated data change."""
+    ddl = "\n".join(str(CreateTable(table)) for table in Base.metadata.sorted_tables)
+    return hashlib.blake2b(f"{SEED_VERSION}\n{ddl}".encode("utf-8"), digest_size=4).hexdigest()
+
+
+def _rows(start_id: int, count: int, rng: random.Random) -> tuple[list[dict], list[dict]]:
+    todos: list[dict] = []
+    tokens: list[dict] = []
+    for todo_id in range(start_id, start_id + count):
+        # A few common verbs plus a long tail of nouns, so searches hit both dense and sparse tokens.
+        title = f"{rng.choice(VERBS)} item{int(rng.paretovariate(1.2)) % 5000} {todo_id}"
+        category = CATEGORIES[min(int(rng.expovariate(0.25)), len(CATEGORIES) - 1)]
+        created_at = SEED_START + timedelta(seconds=todo_id * 7)
+        todos.append(
+            {
+                "id": todo_id,
+                "title": title,
+                "title_canonical": canonicalize_text(title),
+                "category": category,
+                "category_canonical": category,
+                "is_completed": rng.random() < 0.3,
+                "created_at": created_at,
+                "updated_at": created_at + timedelta(seconds=rng.randrange(0, 86_400)),
+                "change_seq": 0,
+            }
+        )
+        tokens.extend({"token": token, "todo_id": todo_id, "created_at": created_at} for token in tokenize_text(title))
+    return todos, tokens
+
+
+def seed_database(path: Path, *, rows: int) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.unlink(missing_ok=True)
+    engine = create_engine(f"sqlite:///{path}")
+    try:
+        Base.metadata.create_all(engine)
+        rng = random.Random(rows)
+        with engine.begin() as connection:
+            for start in range(1, rows + 1, SEED_CHUNK_SIZE):
+                todos, tokens = _rows(start, min(SEED_CHUNK_SIZE, rows - start + 1), rng)
+                connection.execute(insert(Todo), todos)
+                connection.execute(insert(TodoTitleToken), tokens)
+        with Session(engine) as db_session:
+            TodoService(db_session).reconcile_category_stats()
+    finally:
+        engine.dispose()
+
+
+def ensure_seeded_database(directory: Path, *, rows: int) -> Path:
+    """Return a seeded database for `rows`, building it only if no current one is cached."""
+    path = directory / f"todos-{rows}-{schema_fingerprint()}.sqlite3"
+    if not path.exists():
+        temporary_path = path.with_suffix(".partial")
+        seed_database(temporary_path, rows=rows)
+        temporary_path.replace(path)
+    return path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    started_at = time.perf_counter()
+    seed_database(args.path, rows=args.rows)
+    print(f"seeded {args.rows} todos into {args.path} in {time.perf_counter() - started_at:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Cost of serializing a page of todos, before and after the single-pass TypeAdapter path.
+
+Builds detached ``Todo`` rows in memory and serves them from minimal FastAPI routes driven
+directly through the ASGI interface, so the figures cover serialization plus the framework's
+response handling but no database work. Variants:
+
+- ``response_model``: ``TodoResponse.model_validate`` per row, then FastAPI validates and encodes
+  the list again against ``response_model=list[TodoResponse]`` (the original list route).
+- ``model_dump_json_response``: per-row ``model_dump(mode="json")`` rendered by ``JSONResponse``.
+- ``type_adapter``: ``serialize_todo_list``, one validate and one ``dump_json`` for the whole list.
+
+Usage:
+    DATABASE_URL=sqlite:// python -m benchmarks.list_serialization --rows 1000 --iterations 50 --rounds 7
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+from fastapi import FastAPI, Response
+from fastapi.responses import JSONResponse
+
+from app.api.v1.todos import serialize_todo_list
+from app.models.todo import Todo
+from app.schemas.todo import TodoResponse
+
+
+def build_rows(count: int) -> list[Todo]:
+    created_at = datetime(2026, 1, 1, 12, 0, 0, 123456)
+    return [
+        Todo(
+            id=index,
+            title=f"Todo number {index}",
+            category="general" if index % 3 else "work",
+            title_canonical=f"todo number {index}",
+            category_canonical="general" if index % 3 else "work",
+            is_completed=index % 2 == 0,
+            created_at=created_at + timedelta(seconds=index),
+            updated_at=created_at + timedelta(seconds=index, microseconds=index),
+        )
+        for index in range(1, count + 1)
+    ]
+
+
+def build_app(rows: list[Todo]) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/response_model", response_model=list[TodoResponse])
+    async def response_model() -> list[TodoResponse]:
+        return [TodoResponse.model_validate(todo) for todo in rows]
+
+    @app.get("/model_dump_json_response")
+    async def model_dump_json_response() -> Response:
+        return JSONResponse([TodoResponse.model_validate(todo).model_dump(mode="json") for todo in rows])
+
+    @app.get("/type_adapter")
+    async def type_adapter() -> Response:
+        return Response(serialize_todo_list(rows), media_type="application/json")
+
+    return app
+
+
+async def drive(app: FastAPI, path: str, iterations: int, rounds: int) -> tuple[float, bytes]:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+    body = bytearray()
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict) -> None:
+        if message["type"] == "http.response.body":
+            body.extend(message.get("body", b""))
+
+    await app(dict(scope), receive, send)
+    first_body = bytes(body)
+
+    # Best of several rounds: the minimum is the least disturbed by GC pauses and other load.
+    best_ms = float("inf")
+    for _ in range(rounds):
+        started_at = time.perf_counter()
+        for _ in range(iterations):
+            await app(dict(scope), receive, send)
+        best_ms = min(best_ms, (time.perf_counter() - started_at) / iterations * 1000)
+    return best_ms, first_body
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=7)
+    args = parser.parse_args()
+
+    app = build_app(build_rows(args.rows))
+    variants = ("response_model", "model_dump_json_response", "type_adapter")
+    results = {name: asyncio.run(drive(app, f"/{name}", args.iterations, args.rounds)) for name in variants}
+
+    bodies = {body for _, body in results.values()}
+    baseline = results["response_model"][0]
+    print(f"{'variant':<28}{'ms/request':>12}{'ms/1k rows':>12}{'speedup':>10}")
+    for name, (per_request_ms, _) in results.items():
+        per_thousand_ms = per_request_ms / args.rows * 1000
+        print(f"{name:<28}{per_request_ms:>12.2f}{per_thousand_ms:>12.2f}{baseline / per_request_ms:>9.1f}x")
+    print(f"identical bodies: {len(bodies) == 1}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Per-request overhead of RequestContextMiddleware, before and after the pure-ASGI rewrite.
+
+Drives a trivial endpoint directly through the ASGI interface (no HTTP client or server in the
+loop) with no middleware, the previous ``BaseHTTPMiddleware`` implementation and the current
+pure-ASGI one, then reports the mean cost per request of each middleware.
+
+Usage:
+    DATABASE_URL=sqlite:// python -m benchmarks.middleware_overhead --requests 20000
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+import uuid
+
+from fastapi import FastAPI, Request
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.core.config import get_settings
+from app.core.database import Database
+from app.core.db_metrics import get_pool_status, start_request_db_stats
+from app.core.middleware import RequestContextMiddleware
+from app.core.request_context import set_trace_id
+
+logger = logging.getLogger("app.request")
+
+
+class BaseHTTPRequestContextMiddleware(BaseHTTPMiddleware):
+    """The implementation replaced by the pure-ASGI middleware, kept for comparison."""
+
+    def __init__(self, app, database: Database | None = None) -> None:
+        super().__init__(app)
+        self.database = database
+
+    async def dispatch(self, request: Request, call_next):
+        trace_id = request.headers.get("x-trace-id") or str(uuid.uuid4())
+        set_trace_id(trace_id)
+        request_db_stats = start_request_db_stats()
+
+        started_at = time.perf_counter()
+        response = await call_next(request)
+        elapsed_ms = round((time.perf_counter() - started_at) * 1000, 2)
+
+        response.headers["x-trace-id"] = trace_id
+        pool_status = get_pool_status(self.database.active_pool() if self.database is not None else None)
+
+        logger.info(
+            "request_completed",
+            extra={
+                "route": request.url.path,
+                "method": request.method,
+                "status_code": response.status_code,
+                "latency_ms": elapsed_ms,
+                "db_pool_wait_ms": round(request_db_stats.pool_wait_ms, 2),
+                "db_pool_checked_out": pool_status.get("checked_out"),
+                "db_pool_overflow": pool_status.get("overflow"),
+            },
+        )
+        return response
+
+
+def build_app(middleware_class: type | None) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping() -> dict[str, str]:
+        return {"status": "ok"}
+
+    if middleware_class is not None:
+        # Both variants look up the same (not yet created) pool for each request's log line.
+        app.add_middleware(middleware_class, database=Database(get_settings()))
+    return app
+
+
+async def drive(app: FastAPI, requests: int) -> float:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/ping",
+        "raw_path": b"/ping",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(_: dict) -> None:
+        return None
+
+    for _ in range(min(requests, 500)):
+        await app(dict(scope), receive, send)
+
+    started_at = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - started_at) / requests * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--log", action="store_true", help="include request log emission in the measurement")
+    args = parser.parse_args()
+
+    # Isolate middleware plumbing from log formatting/I/O unless explicitly requested.
+    logger.setLevel(logging.INFO if args.log else logging.WARNING)
+
+    variants = {
+        "none": None,
+        "base_http_middleware": BaseHTTPRequestContextMiddleware,
+        "pure_asgi_middleware": RequestContextMiddleware,
+    }
+    results = {name: asyncio.run(drive(build_app(middleware), args.requests)) for name, middleware in variants.items()}
+
+    baseline = results["none"]
+    print(f"{'variant':<24}{'us/request':>12}{'overhead us':>14}")
+    for name, per_request_us in results.items():
+        print(f"{name:<24}{per_request_us:>12.1f}{per_request_us - baseline:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,518 @@
+"""Latency of every repository method, service operation and endpoint on seeded databases.
+
+Each dataset size gets a deterministic SQLite database from ``app.tools.seed_todos`` (cached
+under ``--db-dir``). Cases run against a fresh copy of it, so writes never leak into the next run:
+
+- ``repository``: each ``TodoRepository`` call inside a transaction that is rolled back.
+- ``service``: each ``TodoService`` operation, committing like a request would.
+- ``api``: each endpoint through ``httpx.ASGITransport`` with the response cache disabled, so
+  reads reach the database.
+
+Setup a case needs (e.g. the todo a delete removes) runs outside the timed section. Every case
+reports p50/p95/p99 and is checked against the PRD budget of its kind: 300 ms p95 for single-item
+operations, 500 ms for lists, batches and bulk writes. Maintenance operations that scan the whole
+table are reported without a budget. Results are written as JSON; ``--baseline`` compares them
+with an earlier run and fails on p95 regressions.
+
+Usage:
+    DATABASE_URL=sqlite:// python -m benchmarks.suite --sizes 1000,100000,1000000 \\
+        --output .cache/benchmarks/results.json [--baseline previous.json]
+"""
+
+import argparse
+import asyncio
+import inspect
+import json
+import logging
+import math
+import platform
+import shutil
+import sqlite3
+import subprocess
+import sys
+import time
+from collections.abc import Callable, Generator
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Literal
+
+import fastapi
+import httpx
+import sqlalchemy
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.api.v1.dependencies import get_threaded_todo_service, get_todo_service
+from app.core.cache import get_response_cache
+from app.core.config import get_settings
+from app.core.database import enable_sqlite_foreign_keys, get_db_session
+from app.main import app
+from app.repositories.todo_repository import TodoListFilter, TodoRepository, TodoSelection
+from app.schemas.todo import (
+    TodoBulkDeleteRequest,
+    TodoBulkUpdateRequest,
+    TodoCreateRequest,
+    TodoUpdateRequest,
+)
+from app.services.todo_service import TodoListQuery, TodoService
+from app.tools.seed_todos import SEED_START, ensure_seeded_database
+
+# Bump when cases are added, removed or change what they measure.
+SUITE_VERSION = 1
+ITEM_BUDGET_MS = 300.0
+LIST_BUDGET_MS = 500.0
+BULK_SIZE = 100
+PAGE_SIZE = 100
+# p95 differences below this are timer and scheduler noise, whatever the ratio.
+REGRESSION_FLOOR_MS = 1.0
+
+Layer = Literal["repository", "service", "api"]
+# One iteration: untimed setup, then yields the call to time, then untimed cleanup.
+Step = Callable[[int], Generator[Callable[[], Any], None, None]]
+
+
+@dataclass(frozen=True)
+class Case:
+    layer: Layer
+    name: str
+    budget_ms: float | None
+    step: Step
+
+
+@dataclass(frozen=True)
+class CaseResult:
+    rows: int
+    layer: Layer
+    case: str
+    iterations: int
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    mean_ms: float
+    max_ms: float
+    budget_ms: float | None
+    passed: bool
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """Nearest-rank percentile, so a reported p95 is always a latency that was observed."""
+    rank = max(math.ceil(fraction * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+class Bench:
+    """The cases of one seeded database. Titles it hands out are unique within a run."""
+
+    def __init__(self, session_factory: sessionmaker[Session], rows: int, client: httpx.AsyncClient) -> None:
+        self.session_factory = session_factory
+        self.rows = rows
+        self.client = client
+        self._counter = 0
+        # Reads and in-place updates are spread over the whole id range.
+        self.sample_ids = sorted({1 + (index * 7919) % rows for index in range(BULK_SIZE)})
+        with session_factory() as db_session:
+            todos = TodoRepository(db_session).list_todos(limit=BULK_SIZE)
+            self.sample_keys = [(todo.title_canonical, todo.category_canonical) for todo in todos]
+
+    def unique_title(self, prefix: str) -> str:
+        self._counter += 1
+        return f"bench {prefix} {self._counter}"
+
+    def sample_id(self, iteration: int) -> int:
+        return self.sample_ids[iteration % len(self.sample_ids)]
+
+    def create_fresh(self, count: int) -> list[int]:
+        """Commit `count` new todos for a case that deletes them."""
+        with self.session_factory() as db_session:
+            outcomes = TodoService(db_session).create_todos_batch(
+                [TodoCreateRequest(title=self.unique_title("fresh"), category="bench") for _ in range(count)]
+            )
+        return [outcome.todo.id for outcome in outcomes]
+
+    def cases(self) -> list[Case]:
+        return self.repository_cases() + self.service_cases() + self.api_cases()
+
+    def repository_cases(self) -> list[Case]:
+        def case(name: str, budget_ms: float | None, call: Callable[[TodoRepository, int], Any]) -> Case:
+            def step(iteration: int) -> Generator[Callable[[], Any], None, None]:
+                with self.session_factory() as db_session:
+                    repository = TodoRepository(db_session)
+                    # Flushing inside the timed call makes writes reach the database before rollback.
+                    yield lambda: (call(repository, iteration), db_session.flush())
+                    db_session.rollback()
+
+            return Case("repository", name, budget_ms, step)
+
+        keys = self.sample_keys
+        selection = TodoSelection(ids=self.sample_ids)
+        window_start = SEED_START + timedelta(seconds=self.rows * 7 // 2)
+
+        def sample_todo(repository: TodoRepository, iteration: int):
+            return repository.get_todo_by_id(todo_id=self.sample_id(iteration))
+
+        def save(repository: TodoRepository, iteration: int) -> None:
+            todo = sample_todo(repository, iteration)
+            todo.title = self.unique_title("save")
+            repository.save(todo)
+
+        return [
+            case("create_todo", ITEM_BUDGET_MS, lambda r, i: r.create_todo(title=self.unique_title("repo"))),
+            case(
+                "create_todos",
+                LIST_BUDGET_MS,
+                lambda r, i: r.create_todos(rows=[(self.unique_title("repo"), "bench") for _ in range(BULK_SIZE)]),
+            ),
+            case("list_todos", ITEM_BUDGET_MS, lambda r, i: r.list_todos(limit=PAGE_SIZE + 1)),
+            case("list_todos_1000", LIST_BUDGET_MS, lambda r, i: r.list_todos(limit=1000)),
+            case(
+                "list_todos_filtered",
+                ITEM_BUDGET_MS,
+                lambda r, i: r.list_todos(
+                    limit=PAGE_SIZE + 1, list_filter=TodoListFilter(category="work", is_completed=False)
+                ),
+            ),
+            case(
+                "list_todos_created_after",
+                ITEM_BUDGET_MS,
+                lambda r, i: r.list_todos(limit=PAGE_SIZE + 1, list_filter=TodoListFilter(created_after=window_start)),
+            ),
+            case(
+                "list_todos_updated_desc",
+                ITEM_BUDGET_MS,
+                lambda r, i: r.list_todos(limit=PAGE_SIZE + 1, sort="updated_desc"),
+            ),
+            case("search_todos", ITEM_BUDGET_MS, lambda r, i: r.search_todos(tokens=["buy"], limit=PAGE_SIZE + 1)),
+            case(
+                "search_todos_rare",
+                ITEM_BUDGET_MS,
+                lambda r, i: r.search_todos(tokens=["item4999"], limit=PAGE_SIZE + 1),
+            ),
+            case(
+                "search_todos_multi",
+                LIST_BUDGET_MS,
+                lambda r, i: r.search_todos(tokens=["buy", "item2"], limit=PAGE_SIZE + 1),
+            ),
+            case(
+                "list_changed_todos",
+                ITEM_BUDGET_MS,
+                lambda r, i: r.list_changed_todos(after=None, limit=PAGE_SIZE + 1),
+            ),
+            case("iter_todo_chunks", ITEM_BUDGET_MS, lambda r, i: next(r.iter_todo_chunks(chunk_size=1000))),
+            case("get_todo_by_id", ITEM_BUDGET_MS, sample_todo),
+            case(
+                "get_todo_by_canonical_title_and_category",
+                ITEM_BUDGET_MS,
+                lambda r, i: r.get_todo_by_canonical_title_and_category(
+                    title=keys[i % len(keys)][0], category=keys[i % len(keys)][1]
+                ),
+            ),
+            case("find_existing_canonical_keys", ITEM_BUDGET_MS, lambda r, i: r.find_existing_canonical_keys(keys=keys)),
+            case(
+                "get_duplicate_for_update",
+                ITEM_BUDGET_MS,
+                lambda r, i: r.get_duplicate_for_update(
+                    todo_id=self.sample_id(i), title=keys[i % len(keys)][0], category=keys[i % len(keys)][1]
+                ),
+            ),
+            case(
+                "find_bulk_category_conflict",
+                ITEM_BUDGET_MS,
+                lambda r, i: r.find_bulk_category_conflict(selection=selection, category="bench"),
+            ),
+            case("count_by_category", None, lambda r, i: r.count_by_category()),
+            case(
+                "update_todos",
+                LIST_BUDGET_MS,
+                lambda r, i: r.update_todos(selection=selection, is_completed=i % 2 == 0, change_seq=1),
+            ),
+            case("delete_todos", LIST_BUDGET_MS, lambda r, i: r.delete_todos(selection=selection, change_seq=1)),
+            case("save", ITEM_BUDGET_MS, save),
+            case("delete_todo", ITEM_BUDGET_MS, lambda r, i: r.delete_todo(todo=sample_todo(r, i), change_seq=1)),
+        ]
+
+    def service_cases(self) -> list[Case]:
+        def case(name: str, budget_ms: float | None, call: Callable[[TodoService, int], Any]) -> Case:
+            def step(iteration: int) -> Generator[Callable[[], Any], None, None]:
+                with self.session_factory() as db_session:
+                    service = TodoService(db_session)
+                    yield lambda: call(service, iteration)
+
+            return Case("service", name, budget_ms, step)
+
+        def fresh_case(name: str, budget_ms: float, count: int, call: Callable[[TodoService, list[int]], Any]) -> Case:
+            def step(iteration: int) -> Generator[Callable[[], Any], None, None]:
+                todo_ids = self.create_fresh(count)
+                with self.session_factory() as db_session:
+                    service = TodoService(db_session)
+                    yield lambda: call(service, todo_ids)
+
+            return Case("service", name, budget_ms, step)
+
+        return [
+            case(
+                "create_todo",
+                ITEM_BUDGET_MS,
+                lambda s, i: s.create_todo(TodoCreateRequest(title=self.unique_title("service"))),
+            ),
+            case(
+                "create_todos_batch",
+                LIST_BUDGET_MS,
+                lambda s, i: s.create_todos_batch(
+                    [TodoCreateRequest(title=self.unique_title("service")) for _ in range(BULK_SIZE)]
+                ),
+            ),
+            case("list_todo_page", ITEM_BUDGET_MS, lambda s, i: s.list_todo_page(limit=PAGE_SIZE)),
+            case("list_todo_page_1000", LIST_BUDGET_MS, lambda s, i: s.list_todo_page(limit=1000)),
+            case(
+                "list_todo_page_filtered",
+                ITEM_BUDGET_MS,
+                lambda s, i: s.list_todo_page(limit=PAGE_SIZE, query=TodoListQuery(category="work", is_completed=False)),
+            ),
+            case("search_todos", ITEM_BUDGET_MS, lambda s, i: s.search_todos(q="buy", limit=PAGE_SIZE)),
+            case("get_todo", ITEM_BUDGET_MS, lambda s, i: s.get_todo(todo_id=self.sample_id(i))),
+            case(
+                "update_todo",
+                ITEM_BUDGET_MS,
+                lambda s, i: s.update_todo(
+                    todo_id=self.sample_id(i), payload=TodoUpdateRequest(title=self.unique_title("service"))
+                ),
+            ),
+            fresh_case("delete_todo", ITEM_BUDGET_MS, 1, lambda s, ids: s.delete_todo(todo_id=ids[0])),
+            case(
+                "update_todos_bulk",
+                LIST_BUDGET_MS,
+                lambda s, i: s.update_todos_bulk(TodoBulkUpdateRequest(ids=self.sample_ids, is_completed=i % 2 == 0)),
+            ),
+            fresh_case(
+                "delete_todos_bulk",
+                LIST_BUDGET_MS,
+                BULK_SIZE,
+                lambda s, ids: s.delete_todos_bulk(TodoBulkDeleteRequest(ids=ids)),
+            ),
+            case("get_category_stats", ITEM_BUDGET_MS, lambda s, i: s.get_category_stats()),
+            case("list_changes", ITEM_BUDGET_MS, lambda s, i: s.list_changes(since=None, limit=PAGE_SIZE)),
+            case("reconcile_category_stats", None, lambda s, i: s.reconcile_category_stats()),
+            case(
+                "compact_tombstones",
+                None,
+                lambda s, i: s.compact_tombstones(deleted_before=datetime.now(timezone.utc) - timedelta(days=30)),
+            ),
+        ]
+
+    def api_cases(self) -> list[Case]:
+        prefix = f"{get_settings().API_V1_PREFIX}/todos"
+
+        def case(name: str, budget_ms: float, request: Callable[[int], tuple[str, str, Any]]) -> Case:
+            def step(iteration: int) -> Generator[Callable[[], Any], None, None]:
+                method, path, body = request(iteration)
+                yield lambda: self._send(method, path, body)
+
+            return Case("api", name, budget_ms, step)
+
+        def fresh_case(name: str, budget_ms: float, count: int, request: Callable[[list[int]], tuple[str, str, Any]]):
+            def step(iteration: int) -> Generator[Callable[[], Any], None, None]:
+                method, path, body = request(self.create_fresh(count))
+                yield lambda: self._send(method, path, body)
+
+            return Case("api", name, budget_ms, step)
+
+        max_page_size = get_settings().TODO_PAGE_SIZE_MAX
+        return [
+            case("POST /todos", ITEM_BUDGET_MS, lambda i: ("POST", prefix, {"title": self.unique_title("api")})),
+            case(
+                "POST /todos:batch",
+                LIST_BUDGET_MS,
+                lambda i: ("POST", f"{prefix}:batch", [{"title": self.unique_title("api")} for _ in range(BULK_SIZE)]),
+            ),
+            case("GET /todos", ITEM_BUDGET_MS, lambda i: ("GET", f"{prefix}?limit={PAGE_SIZE}", None)),
+            case(
+                f"GET /todos?limit={max_page_size}",
+                LIST_BUDGET_MS,
+                lambda i: ("GET", f"{prefix}?limit={max_page_size}", None),
+            ),
+            case(
+                "GET /todos?category&is_completed",
+                ITEM_BUDGET_MS,
+                lambda i: ("GET", f"{prefix}?limit={PAGE_SIZE}&category=work&is_completed=false", None),
+            ),
+            case("GET /todos/search", ITEM_BUDGET_MS, lambda i: ("GET", f"{prefix}/search?q=buy&limit={PAGE_SIZE}", None)),
+            case("GET /todos/{id}", ITEM_BUDGET_MS, lambda i: ("GET", f"{prefix}/{self.sample_id(i)}", None)),
+            case(
+                "PATCH /todos/{id}",
+                ITEM_BUDGET_MS,
+                lambda i: ("PATCH", f"{prefix}/{self.sample_id(i)}", {"title": self.unique_title("api")}),
+            ),
+            fresh_case("DELETE /todos/{id}", ITEM_BUDGET_MS, 1, lambda ids: ("DELETE", f"{prefix}/{ids[0]}", None)),
+            case(
+                "PATCH /todos:bulk",
+                LIST_BUDGET_MS,
+                lambda i: ("PATCH", f"{prefix}:bulk", {"ids": self.sample_ids, "is_completed": i % 2 == 0}),
+            ),
+            fresh_case(
+                "DELETE /todos:bulk",
+                LIST_BUDGET_MS,
+                BULK_SIZE,
+                lambda ids: ("DELETE", f"{prefix}:bulk", {"ids": ids}),
+            ),
+            case("GET /todos/stats", ITEM_BUDGET_MS, lambda i: ("GET", f"{prefix}/stats", None)),
+            case("GET /todos/changes", ITEM_BUDGET_MS, lambda i: ("GET", f"{prefix}/changes?limit={PAGE_SIZE}", None)),
+        ]
+
+    async def _send(self, method: str, path: str, body: Any) -> None:
+        response = await self.client.request(method, path, json=body)
+        # A failing request would time the error path; stop instead of reporting it as a latency.
+        if response.status_code >= 400:
+            raise RuntimeError(f"{method} {path} returned {response.status_code}: {response.text[:200]}")
+
+
+async def run_case(case: Case, *, rows: int, iterations: int, warmup: int) -> CaseResult:
+    timings_ms: list[float] = []
+    for iteration in range(warmup + iterations):
+        steps = case.step(iteration)
+        call = next(steps)
+        started_at = time.perf_counter()
+        result = call()
+        if inspect.isawaitable(result):
+            await result
+        elapsed_ms = (time.perf_counter() - started_at) * 1000
+        next(steps, None)
+        if iteration >= warmup:
+            timings_ms.append(elapsed_ms)
+
+    timings_ms.sort()
+    p95_ms = percentile(timings_ms, 0.95)
+    return CaseResult(
+        rows=rows,
+        layer=case.layer,
+        case=case.name,
+        iterations=iterations,
+        p50_ms=round(percentile(timings_ms, 0.50), 3),
+        p95_ms=round(p95_ms, 3),
+        p99_ms=round(percentile(timings_ms, 0.99), 3),
+        mean_ms=round(sum(timings_ms) / len(timings_ms), 3),
+        max_ms=round(timings_ms[-1], 3),
+        budget_ms=case.budget_ms,
+        passed=case.budget_ms is None or p95_ms <= case.budget_ms,
+    )
+
+
+async def run_size(database_path: Path, *, rows: int, iterations: int, warmup: int) -> list[CaseResult]:
+    engine = create_engine(f"sqlite:///{database_path}", connect_args={"check_same_thread": False})
+    enable_sqlite_foreign_keys(engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def get_bench_db_session() -> Generator[Session, None, None]:
+        with session_factory() as db_session:
+            yield db_session
+
+    app.dependency_overrides[get_db_session] = get_bench_db_session
+    app.dependency_overrides[get_todo_service] = get_threaded_todo_service
+    app.dependency_overrides[get_response_cache] = lambda: None
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            bench = Bench(session_factory, rows, client)
+            results = []
+            for case in bench.cases():
+                result = await run_case(case, rows=rows, iterations=iterations, warmup=warmup)
+                print(format_result(result), flush=True)
+                results.append(result)
+            return results
+    finally:
+        app.dependency_overrides.clear()
+        engine.dispose()
+
+
+def format_result(result: CaseResult) -> str:
+    budget = f"{result.budget_ms:.0f}" if result.budget_ms is not None else "-"
+    status = "ok" if result.passed else "OVER BUDGET"
+    return (
+        f"{result.rows:>9} {result.layer:<11}{result.case:<42}"
+        f"{result.p50_ms:>9.2f}{result.p95_ms:>9.2f}{result.p99_ms:>9.2f}{budget:>8}  {status}"
+    )
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: list[CaseResult], baseline: dict[str, Any], *, max_regression: float) -> list[str]:
+    """Cases whose p95 grew by more than `max_regression` (a fraction) over the baseline run."""
+    previous = {(entry["rows"], entry["layer"], entry["case"]): entry["p95_ms"] for entry in baseline["results"]}
+    regressions = []
+    for result in results:
+        before = previous.get((result.rows, result.layer, result.case))
+        if before is None:
+            continue
+        if result.p95_ms - before > max(before * max_regression, REGRESSION_FLOOR_MS):
+            regressions.append(
+                f"{result.rows} {result.layer} {result.case}: p95 {before:.2f} ms -> {result.p95_ms:.2f} ms"
+            )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1000,100000,1000000", help="comma-separated seeded row counts")
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--db-dir", type=Path, default=Path(".cache/benchmarks"))
+    parser.add_argument("--output", type=Path, default=Path(".cache/benchmarks/results.json"))
+    parser.add_argument("--baseline", type=Path, help="results of an earlier run to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.25, help="allowed p95 growth over the baseline")
+    args = parser.parse_args()
+
+    # Per-request log lines would bury the report; formatting happens off the request path anyway.
+    logging.getLogger("app.request").setLevel(logging.WARNING)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    print(f"{'rows':>9} {'layer':<11}{'case':<42}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'budget':>8}")
+    results: list[CaseResult] = []
+    for rows in sizes:
+        seeded_path = ensure_seeded_database(args.db_dir, rows=rows)
+        working_path = args.db_dir / f"run-{rows}.sqlite3"
+        shutil.copyfile(seeded_path, working_path)
+        try:
+            results.extend(asyncio.run(run_size(working_path, rows=rows, iterations=args.iterations, warmup=args.warmup)))
+        finally:
+            working_path.unlink(missing_ok=True)
+
+    report = {
+        "suite_version": SUITE_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "git_commit": git_commit(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sqlite": sqlite3.sqlite_version,
+            "sqlalchemy": sqlalchemy.__version__,
+            "fastapi": fastapi.__version__,
+        },
+        "iterations": args.iterations,
+        "warmup": args.warmup,
+        "results": [asdict(result) for result in results],
+    }
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    print(f"wrote {args.output}")
+
+    failures = [f"{r.rows} {r.layer} {r.case}: p95 {r.p95_ms:.2f} ms > {r.budget_ms:.0f} ms" for r in results if not r.passed]
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        if baseline.get("suite_version") != SUITE_VERSION:
+            print(f"baseline is from suite version {baseline.get('suite_version')}; not comparing")
+        else:
+            failures.extend(compare(results, baseline, max_regression=args.max_regression))
+    for failure in failures:
+        print(f"FAIL {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
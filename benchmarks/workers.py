@@ -0,0 +1,82 @@
+"""Throughput of the production launcher with one worker versus several, on the same host.
+
+Runs the load generator's closed-loop workload (``app.tools.loadgen``) once per worker count,
+each against a fresh copy of the same seeded database, and reports requests per second, the
+speedup over the first count and the slowest route's p95.
+
+Usage:
+    python -m benchmarks.workers --workers 1,4 --rows 100000 --concurrency 32 --duration 30
+"""
+
+import argparse
+import asyncio
+import json
+from pathlib import Path
+
+from app.server import available_cpus
+from app.tools.loadgen import drive, parse_mix, prepare_database, run_server
+
+
+def run_workers(args: argparse.Namespace, workers: int) -> dict:
+    database_path = prepare_database(args.db_dir, args.rows)
+    try:
+        with run_server(database_path, workers=workers, log_path=args.db_dir / "workers-server.log") as base_url:
+            summaries, elapsed_seconds = asyncio.run(drive(args, base_url, args.rows))
+    finally:
+        for suffix in ("", "-wal", "-shm"):
+            Path(f"{database_path}{suffix}").unlink(missing_ok=True)
+    requests = sum(summary["requests"] for summary in summaries)
+    return {
+        "workers": workers,
+        "requests": requests,
+        "throughput_rps": round(requests / elapsed_seconds, 1),
+        "worst_p95_ms": max(summary["p95_ms"] for summary in summaries),
+        "errors": sum(summary["errors"] for summary in summaries),
+        "routes": summaries,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", default=f"1,{max(available_cpus(), 2)}", help="comma-separated worker counts")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--warmup", type=float, default=3.0)
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("create=1,list=4,patch=2,delete=1"))
+    parser.add_argument("--db-dir", type=Path, default=Path(".cache/benchmarks"))
+    parser.add_argument("--output", type=Path, help="also write the results as JSON")
+    args = parser.parse_args()
+    # Settings drive() expects from the load generator's command line.
+    args.rps = None
+    args.max_connections = args.concurrency
+    args.timeout = 30.0
+    args.max_error_rate = 0.0
+    args.seed = 0
+    args.db_dir.mkdir(parents=True, exist_ok=True)
+
+    results = [run_workers(args, int(workers)) for workers in args.workers.split(",")]
+
+    baseline_rps = results[0]["throughput_rps"] or 1.0
+    print(f"available CPUs: {available_cpus()}")
+    print(f"{'workers':>8}{'requests':>10}{'rps':>9}{'speedup':>9}{'worst p95 ms':>14}{'errors':>8}")
+    for result in results:
+        print(
+            f"{result['workers']:>8}{result['requests']:>10}{result['throughput_rps']:>9.1f}"
+            f"{result['throughput_rps'] / baseline_rps:>8.2f}x{result['worst_p95_ms']:>14.2f}{result['errors']:>8}"
+        )
+    if args.output is not None:
+        report = {
+            "available_cpus": available_cpus(),
+            "rows": args.rows,
+            "concurrency": args.concurrency,
+            "duration_seconds": args.duration,
+            "mix": args.mix,
+            "results": results,
+        }
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,24 @@
+$ErrorActionPreference = "Stop"
+
 Write-Host "[quality-gate] Backend checks (stub)"
 Write-Host "TODO: black --check ."
 Write-Host "TODO: ruff check ."
 Write-Host "TODO: mypy app"
 Write-Host "TODO: pytest -q"
+
+# Latency budgets from the PRD on seeded SQLite databases. BENCH_SIZES=1000,100000,1000000 runs the
+# full matrix; BENCH_BASELINE=<results.json> also fails on p95 regressions against an earlier run.
+Write-Host "[quality-gate] Benchmarks"
+$benchSizes = if ($env:BENCH_SIZES) { $env:BENCH_SIZES } else { "1000" }
+$benchOutput = if ($env:BENCH_OUTPUT) { $env:BENCH_OUTPUT } else { ".cache/benchmarks/results.json" }
+$benchArgs = @("--sizes", $benchSizes, "--output", $benchOutput)
+if ($env:BENCH_BASELINE) {
+    $benchArgs += @("--baseline", $env:BENCH_BASELINE)
+}
+if (-not $env:DATABASE_URL) {
+    $env:DATABASE_URL = "sqlite://"
+}
+python -m benchmarks.suite @benchArgs
+if ($LASTEXITCODE -ne 0) {
+    exit $LASTEXITCODE
+}
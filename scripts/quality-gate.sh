@@ -6,3 +6,12 @@ echo "TODO: black --check ."
 echo "TODO: ruff check ."
 echo "TODO: mypy app"
 echo "TODO: pytest -q"
+
+# Latency budgets from the PRD on seeded SQLite databases. BENCH_SIZES=1000,100000,1000000 runs the
+# full matrix; BENCH_BASELINE=<results.json> also fails on p95 regressions against an earlier run.
+echo "[quality-gate] Benchmarks"
+bench_args=(--sizes "${BENCH_SIZES:-1000}" --output "${BENCH_OUTPUT:-.cache/benchmarks/results.json}")
+if [[ -n "${BENCH_BASELINE:-}" ]]; then
+  bench_args+=(--baseline "$BENCH_BASELINE")
+fi
+DATABASE_URL="${DATABASE_URL:-sqlite://}" python -m benchmarks.suite "${bench_args[@]}"
@@ -1,14 +1,19 @@
-from collections.abc import Generator
+from collections.abc import AsyncGenerator, Generator, Iterator
+from contextlib import contextmanager
 
 import pytest_asyncio
 from httpx import ASGITransport, AsyncClient
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.pool import StaticPool
 
-from app.core.database import get_db_session
+from app.api.v1.dependencies import get_async_driver_todo_service, get_threaded_todo_service, get_todo_service
+from app.core.cache import MemoryResponseCache, get_response_cache
+from app.core.database import enable_sqlite_foreign_keys, get_async_db_session, get_db_session
 from app.main import app
 from app.models.base import Base
 
@@ -21,6 +26,7 @@ def db_session() -> Generator[Session, None, None]:
         connect_args={"check_same_thread": False},
         poolclass=StaticPool,
     )
+    enable_sqlite_foreign_keys(engine)
     testing_session_local = sessionmaker(autocommit=False, autoflush=False, bind=engine)
     Base.metadata.create_all(bind=engine)
 
@@ -32,11 +38,54 @@ def db_session() -> Generator[Session, None, None]:
         Base.metadata.drop_all(bind=engine)
 
 
+class QueryCounter:
+    """Records the statements sent to an engine, to cap how many one request may run."""
+
+    def __init__(self, engine: Engine) -> None:
+        self.engine = engine
+        self.statements: list[str] = []
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        self.statements.append(statement)
+
+    @contextmanager
+    def assert_max_queries(self, max_queries: int) -> Iterator["QueryCounter"]:
+        self.statements = []
+        event.listen(self.engine, "before_cursor_execute", self._record)
+        try:
+            yield self
+        finally:
+            event.remove(self.engine, "before_cursor_execute", self._record)
+        listing = "\n".join(f"  {index}. {statement}" for index, statement in enumerate(self.statements, 1))
+        assert len(self.statements) <= max_queries, (
+            f"expected at most {max_queries} queries, ran {len(self.statements)}:\n{listing}"
+        )
+
+
+@pytest.fixture
+def query_counter(db_session: Session) -> QueryCounter:
+    return QueryCounter(db_session.get_bind())
+
+
+@pytest.fixture
+def response_cache() -> MemoryResponseCache:
+    return MemoryResponseCache(max_entries=64, ttl_seconds=60.0)
+
+
+@pytest.fixture(autouse=True)
+def isolated_response_cache(response_cache: MemoryResponseCache) -> Generator[None, None, None]:
+    # The app-wide cache would otherwise serve one test's listing to the next.
+    app.dependency_overrides[get_response_cache] = lambda: response_cache
+    yield
+    app.dependency_overrides.pop(get_response_cache, None)
+
+
 @pytest.fixture
 def client(db_session: Session) -> Generator[TestClient, None, None]:
     def get_test_db_session() -> Generator[Session, None, None]:
         yield db_session
 
+    app.dependency_overrides[get_todo_service] = get_threaded_todo_service
     app.dependency_overrides[get_db_session] = get_test_db_session
 
     with TestClient(app) as test_client:
@@ -50,6 +99,7 @@ async def async_client(db_session: Session) -> Generator[AsyncClient, None, None
     def get_test_db_session() -> Generator[Session, None, None]:
         yield db_session
 
+    app.dependency_overrides[get_todo_service] = get_threaded_todo_service
     app.dependency_overrides[get_db_session] = get_test_db_session
 
     transport = ASGITransport(app=app)
@@ -57,3 +107,32 @@ async def async_client(db_session: Session) -> Generator[AsyncClient, None, None
         yield test_async_client
 
     app.dependency_overrides.clear()
+
+
+@pytest_asyncio.fixture
+async def async_db_session() -> AsyncGenerator[AsyncSession, None]:
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", poolclass=StaticPool)
+    enable_sqlite_foreign_keys(engine.sync_engine)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+
+    testing_session_local = async_sessionmaker(autoflush=False, bind=engine)
+    async with testing_session_local() as session:
+        yield session
+
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def async_driver_client(async_db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
+    async def get_test_async_db_session() -> AsyncGenerator[AsyncSession, None]:
+        yield async_db_session
+
+    app.dependency_overrides[get_todo_service] = get_async_driver_todo_service
+    app.dependency_overrides[get_async_db_session] = get_test_async_db_session
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as test_async_client:
+        yield test_async_client
+
+    app.dependency_overrides.clear()
@@ -0,0 +1,91 @@
+from pathlib import Path
+
+import anyio
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.core.cache import SqliteResponseCache
+from app.core.config import Settings
+from app.core.database import Database
+from app.main import create_app
+from app.models.base import Base
+
+
+def file_settings(tmp_path: Path, **overrides) -> Settings:
+    return Settings(DATABASE_URL=f"sqlite:///{tmp_path / 'app.db'}", DB_POOL_SIZE=3, **overrides)
+
+
+def test_database_creates_engines_on_first_use(tmp_path: Path) -> None:
+    database = Database(file_settings(tmp_path))
+
+    assert database.active_pool() is None
+    assert database.pool_stats()["sync"]["pool"] is None
+
+    with database.session() as db_session:
+        db_session.connection()
+
+    assert database.active_pool() is database.engine.pool
+    assert database.pool_stats()["sync"]["checkouts"] == 1
+    anyio.run(database.dispose)
+
+
+def test_database_enforces_foreign_keys_on_sqlite(tmp_path: Path) -> None:
+    database = Database(file_settings(tmp_path))
+
+    with database.session() as db_session:
+        assert db_session.execute(text("PRAGMA foreign_keys")).scalar_one() == 1
+    anyio.run(database.dispose)
+
+
+@pytest.mark.parametrize("async_enabled", [False, True])
+def test_prewarm_opens_connections_up_to_the_pool_size(tmp_path: Path, async_enabled: bool) -> None:
+    database = Database(file_settings(tmp_path, DATABASE_ASYNC_ENABLED=async_enabled))
+
+    prewarmed = anyio.run(database.prewarm, 5)
+
+    assert prewarmed == 3
+    assert database.active_pool().checkedin() == 3
+    assert database.active_pool().checkedout() == 0
+    anyio.run(database.dispose)
+    assert database.active_pool().checkedin() == 0
+
+
+def test_create_app_lifespan_prewarms_and_disposes_the_pool(tmp_path: Path) -> None:
+    settings = file_settings(tmp_path, DB_PREWARM_CONNECTIONS=2)
+
+    with TestClient(create_app(settings)) as client:
+        database = client.app.state.database
+        assert database.settings is settings
+        assert database.active_pool().checkedin() == 2
+        assert client.app.state.startup_seconds > 0
+        metrics = client.get("/metrics").text
+
+    assert "app_import_seconds" in metrics
+    assert "app_startup_seconds" in metrics
+    assert database.active_pool().checkedin() == 0
+
+
+def test_create_app_serves_requests_with_its_own_settings(tmp_path: Path) -> None:
+    settings = file_settings(
+        tmp_path,
+        DATABASE_ASYNC_ENABLED=True,
+        TODO_PAGE_SIZE_MAX=5,
+        RESPONSE_CACHE_BACKEND="sqlite",
+        RESPONSE_CACHE_SQLITE_PATH=str(tmp_path / "cache.db"),
+    )
+    app = create_app(settings)
+    database = app.state.database
+    Base.metadata.create_all(database.engine)
+
+    with TestClient(app) as client:
+        assert client.post("/api/v1/todos", json={"title": "Own settings"}).status_code == 201
+        too_large = client.get("/api/v1/todos", params={"limit": 50})
+        listed = client.get("/api/v1/todos", params={"limit": 5})
+        stats = database.pool_stats()
+
+    assert too_large.status_code == 422
+    assert too_large.json()["error"]["details"][0]["ctx"] == {"le": 5}
+    assert [todo["title"] for todo in listed.json()] == ["Own settings"]
+    assert stats["async"]["checkouts"] >= 3
+    assert isinstance(app.state.response_cache, SqliteResponseCache)
@@ -0,0 +1,41 @@
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.errors import TodoDuplicateError, TodoNotFoundError
+from app.schemas.todo import TodoCreateRequest, TodoUpdateRequest
+from app.services.async_todo_service import AsyncTodoService
+
+
+@pytest.mark.asyncio
+async def test_create_and_update_run_on_async_driver(async_db_session: AsyncSession) -> None:
+    service = AsyncTodoService.from_async_session(async_db_session)
+
+    created = await service.create_todo(TodoCreateRequest(title="  Async  ", category="Home"))
+    updated = await service.update_todo(todo_id=created.id, payload=TodoUpdateRequest(is_completed=True))
+
+    assert created.title == "Async"
+    assert updated.id == created.id
+    assert updated.is_completed is True
+    assert updated.updated_at is not None
+
+
+@pytest.mark.asyncio
+async def test_domain_errors_propagate_from_async_driver(async_db_session: AsyncSession) -> None:
+    service = AsyncTodoService.from_async_session(async_db_session)
+    await service.create_todo(TodoCreateRequest(title="Pay bills", category="Home"))
+
+    with pytest.raises(TodoDuplicateError):
+        await service.create_todo(TodoCreateRequest(title="pay bills", category="home"))
+    with pytest.raises(TodoNotFoundError):
+        await service.delete_todo(todo_id=404)
+
+
+@pytest.mark.asyncio
+async def test_export_todos_yields_chunks_on_async_driver(async_db_session: AsyncSession) -> None:
+    service = AsyncTodoService.from_async_session(async_db_session)
+    for title in ["A", "B", "C"]:
+        await service.create_todo(TodoCreateRequest(title=title))
+
+    chunks = [chunk async for chunk in service.export_todos(chunk_size=2)]
+
+    assert [[todo.title for todo in chunk] for chunk in chunks] == [["C", "B"], ["A"]]
@@ -0,0 +1,91 @@
+from pathlib import Path
+
+import anyio
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool, StaticPool
+
+from app.core.config import Settings
+from app.core.database import build_engine_options
+from app.core.db_metrics import PoolMetrics, register_pool_events, register_query_events, start_request_db_stats
+from app.core.middleware import RequestContextMiddleware
+
+
+def test_build_engine_options_skips_pool_sizing_for_in_memory_sqlite() -> None:
+    options = build_engine_options(Settings(), "sqlite://", pool_class=QueuePool, metrics=PoolMetrics())
+
+    assert "pool_size" not in options
+    assert "poolclass" not in options
+
+
+def test_pool_metrics_record_checkouts_waits_and_timeouts(tmp_path: Path) -> None:
+    settings = Settings(DB_POOL_SIZE=1, DB_MAX_OVERFLOW=0, DB_POOL_TIMEOUT=0.05)
+    database_url = f"sqlite:///{tmp_path / 'pool.db'}"
+    metrics = PoolMetrics()
+    engine = create_engine(
+        database_url,
+        **build_engine_options(settings, database_url, pool_class=QueuePool, metrics=metrics),
+    )
+    register_pool_events(engine, metrics)
+    request_db_stats = start_request_db_stats()
+
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+        with pytest.raises(PoolTimeoutError):
+            engine.connect()
+
+    snapshot = metrics.snapshot(engine.pool)
+    engine.dispose()
+
+    assert snapshot["pool"] == "InstrumentedQueuePool"
+    assert snapshot["size"] == 1
+    assert snapshot["checked_out"] == 0
+    assert snapshot["checkouts"] == 1
+    assert snapshot["checkins"] == 1
+    assert snapshot["checked_out_peak"] == 1
+    assert snapshot["timeouts"] == 1
+    assert snapshot["checkout_wait_ms_max"] >= 50
+    assert request_db_stats.pool_wait_ms >= 50
+
+
+def test_query_events_count_and_time_statements_of_the_current_request() -> None:
+    engine = create_engine("sqlite://")
+    register_query_events(engine)
+
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+        request_db_stats = start_request_db_stats()
+        connection.execute(text("SELECT 1"))
+        connection.execute(text("SELECT 2"))
+    engine.dispose()
+
+    assert request_db_stats.query_count == 2
+    assert request_db_stats.query_time_ms > 0
+
+
+def test_middleware_reports_queries_run_in_worker_threads() -> None:
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    register_query_events(engine)
+
+    def run_queries() -> None:
+        with engine.connect() as connection:
+            for _ in range(3):
+                connection.execute(text("SELECT 1"))
+
+    app = FastAPI()
+    app.add_middleware(RequestContextMiddleware, db_stats_headers=True)
+
+    @app.get("/queries")
+    async def queries() -> dict[str, bool]:
+        await anyio.to_thread.run_sync(run_queries)
+        return {"ok": True}
+
+    with TestClient(app) as client:
+        response = client.get("/queries")
+    engine.dispose()
+
+    assert response.headers["x-db-queries"] == "3"
+    assert float(response.headers["x-db-time-ms"]) > 0
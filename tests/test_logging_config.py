@@ -0,0 +1,43 @@
+import logging
+import queue
+
+from app.core.logging_config import DroppingQueueHandler, RequestLogSampler
+from app.core.request_context import set_trace_id
+
+
+def make_request_record(*, status_code: int, latency_ms: float = 5.0) -> logging.LogRecord:
+    record = logging.LogRecord("app.request", logging.INFO, __file__, 1, "request_completed", None, None)
+    record.status_code = status_code
+    record.latency_ms = latency_ms
+    return record
+
+
+def test_sampler_keeps_one_in_n_successes_but_every_error_and_slow_request() -> None:
+    sampler = RequestLogSampler(success_sample_rate=3, slow_request_ms=500)
+
+    successes = [sampler.filter(make_request_record(status_code=200)) for _ in range(6)]
+
+    assert successes == [False, False, True, False, False, True]
+    assert sampler.filter(make_request_record(status_code=404)) is True
+    assert sampler.filter(make_request_record(status_code=500)) is True
+    assert sampler.filter(make_request_record(status_code=200, latency_ms=750)) is True
+
+
+def test_sampler_passes_records_without_request_fields() -> None:
+    sampler = RequestLogSampler(success_sample_rate=100, slow_request_ms=500)
+    record = logging.LogRecord("app", logging.INFO, __file__, 1, "started", None, None)
+
+    assert sampler.filter(record) is True
+
+
+def test_queue_handler_captures_trace_id_and_counts_drops() -> None:
+    log_queue: queue.Queue = queue.Queue(maxsize=1)
+    handler = DroppingQueueHandler(log_queue)
+    set_trace_id("trace-abc")
+
+    handler.handle(make_request_record(status_code=200))
+    handler.handle(make_request_record(status_code=200))
+
+    queued = log_queue.get_nowait()
+    assert queued.trace_id == "trace-abc"
+    assert handler.dropped == 1
@@ -0,0 +1,104 @@
+import json
+import os
+import time
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from app.core.metrics import MetricsRegistry, MultiprocessMetricsWriter, merge_snapshots
+
+
+def test_registry_buckets_latency_and_counts_in_progress() -> None:
+    registry = MetricsRegistry(buckets=(0.1, 0.5))
+
+    for seconds in (0.05, 0.1, 0.3, 2.0):
+        registry.request_started()
+        registry.request_finished(route="/todos", method="GET", status_code=200, seconds=seconds)
+    registry.request_started()
+
+    snapshot = registry.snapshot()
+
+    assert snapshot["gauges"]["http_requests_in_progress"] == 1
+    assert snapshot["histograms"] == [
+        {"route": "/todos", "method": "GET", "status": 200, "buckets": [2, 1, 1], "count": 4, "sum": 2.45}
+    ]
+
+
+def test_render_emits_cumulative_buckets_and_escaped_labels() -> None:
+    registry = MetricsRegistry(buckets=(0.1, 0.5))
+    registry.request_started()
+    registry.request_finished(route='/a"b', method="GET", status_code=200, seconds=0.2)
+
+    text = registry.render()
+
+    assert '# TYPE http_request_duration_seconds histogram' in text
+    assert 'http_request_duration_seconds_bucket{route="/a\\"b",method="GET",status="200",le="0.1"} 0' in text
+    assert 'http_request_duration_seconds_bucket{route="/a\\"b",method="GET",status="200",le="0.5"} 1' in text
+    assert 'http_request_duration_seconds_bucket{route="/a\\"b",method="GET",status="200",le="+Inf"} 1' in text
+    assert 'http_requests_total{route="/a\\"b",method="GET",status="200"} 1' in text
+
+
+def test_merge_sums_series_and_only_counts_gauges_of_live_workers() -> None:
+    def worker_snapshot(pid: int, count: int) -> dict:
+        return {
+            "pid": pid,
+            "buckets": [0.1],
+            "histograms": [{"route": "/todos", "method": "GET", "status": 200, "buckets": [count, 0], "count": count, "sum": 0.01}],
+            "gauges": {"http_requests_in_progress": 2},
+            "counters": {"log_records_dropped_total": 1},
+        }
+
+    merged = merge_snapshots([worker_snapshot(1, 3), worker_snapshot(2, 4)], live_pids={2})
+
+    assert merged["histograms"][0]["buckets"] == [7, 0]
+    assert merged["histograms"][0]["count"] == 7
+    assert merged["gauges"] == {"http_requests_in_progress": 2}
+    assert merged["counters"] == {"log_records_dropped_total": 2}
+
+
+def test_merge_takes_the_largest_value_of_max_gauges() -> None:
+    registry = MetricsRegistry()
+    registry.add_gauge_collector("app_startup_seconds", "Startup time.", lambda: 0.0, merge="max")
+    snapshots = [
+        registry.snapshot() | {"pid": pid, "gauges": {"http_requests_in_progress": 1, "app_startup_seconds": seconds}}
+        for pid, seconds in ((1, 0.5), (2, 1.5), (3, 1.0))
+    ]
+
+    merged = merge_snapshots(snapshots)
+
+    assert merged["gauges"] == {"http_requests_in_progress": 3, "app_startup_seconds": 1.5}
+
+
+def test_multiprocess_writer_merges_worker_files(tmp_path: Path) -> None:
+    registry = MetricsRegistry(buckets=(0.1,))
+    registry.request_started()
+    registry.request_finished(route="/todos", method="GET", status_code=200, seconds=0.05)
+    writer = MultiprocessMetricsWriter(registry, tmp_path, interval_seconds=5.0)
+
+    stale_worker = registry.snapshot() | {"pid": os.getpid() + 1, "gauges": {"http_requests_in_progress": 9}}
+    stale_path = tmp_path / "metrics-stale.json"
+    stale_path.write_text(json.dumps(stale_worker), encoding="utf-8")
+    an_hour_ago = time.time() - 3600
+    os.utime(stale_path, (an_hour_ago, an_hour_ago))
+
+    merged = writer.collect()
+
+    assert (tmp_path / f"metrics-{os.getpid()}.json").exists()
+    assert merged["histograms"][0]["count"] == 2
+    assert merged["gauges"]["http_requests_in_progress"] == 0
+
+
+def test_metrics_endpoint_labels_requests_by_route_template(client: TestClient) -> None:
+    created = client.post("/api/v1/todos", json={"title": "Metrics", "category": "Ops"})
+    client.patch(f"/api/v1/todos/{created.json()['id']}", json={"is_completed": True})
+    client.get("/no-such-path")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'http_requests_total{route="/api/v1/todos/{todo_id}",method="PATCH",status="200"}' in response.text
+    assert 'route="/api/v1/todos",method="POST",status="201"' in response.text
+    assert 'route="unmatched",method="GET",status="404"' in response.text
+    assert f"/api/v1/todos/{created.json()['id']}\"" not in response.text
+    assert "# TYPE db_pool_checked_out gauge" in response.text
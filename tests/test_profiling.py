@@ -0,0 +1,54 @@
+import pstats
+from pathlib import Path
+
+import anyio
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.middleware import RequestContextMiddleware
+from app.core.profiling import profile_in_thread, profile_path
+
+
+def blocking_work_in_worker_thread() -> int:
+    return sum(range(1000))
+
+
+def build_app(profile_dir: Path | None) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(RequestContextMiddleware, profile_dir=profile_dir)
+
+    @app.get("/work")
+    async def work() -> dict[str, int]:
+        return {"total": await anyio.to_thread.run_sync(profile_in_thread(blocking_work_in_worker_thread))}
+
+    return app
+
+
+def test_profile_header_writes_stats_including_worker_threads(tmp_path: Path) -> None:
+    with TestClient(build_app(tmp_path)) as client:
+        response = client.get("/work", headers={"x-profile": "1", "x-trace-id": "trace-1"})
+
+    assert response.status_code == 200
+    assert response.headers["x-profile"] == "trace-1.prof"
+    stats = pstats.Stats(str(tmp_path / "trace-1.prof"))
+    profiled_functions = {function_name for _, _, function_name in stats.stats}
+    assert "blocking_work_in_worker_thread" in profiled_functions
+    assert "work" in profiled_functions
+
+
+def test_requests_are_not_profiled_without_the_header_or_when_disabled(tmp_path: Path) -> None:
+    with TestClient(build_app(tmp_path)) as client:
+        unprofiled = client.get("/work", headers={"x-trace-id": "trace-2"})
+    with TestClient(build_app(None)) as client:
+        disabled = client.get("/work", headers={"x-profile": "1", "x-trace-id": "trace-3"})
+
+    assert "x-profile" not in unprofiled.headers
+    assert "x-profile" not in disabled.headers
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_profile_path_stays_inside_the_profile_directory(tmp_path: Path) -> None:
+    path = profile_path(tmp_path, "../../etc/passwd")
+
+    assert path.parent == tmp_path
+    assert path.name == ".._.._etc_passwd.prof"
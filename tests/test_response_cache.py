@@ -0,0 +1,90 @@
+import threading
+from pathlib import Path
+
+import pytest
+
+from app.core.cache import CachedResponse, MemoryResponseCache, SqliteResponseCache, build_response_cache
+from app.core.config import Settings
+
+
+def test_memory_cache_evicts_least_recently_used_entry() -> None:
+    cache = MemoryResponseCache(max_entries=2, ttl_seconds=60.0)
+    cache.set("a", CachedResponse(body=b"a"))
+    cache.set("b", CachedResponse(body=b"b"))
+
+    cache.get("a")
+    cache.set("c", CachedResponse(body=b"c"))
+
+    assert cache.get("a") == CachedResponse(body=b"a")
+    assert cache.get("b") is None
+    assert cache.get("c") == CachedResponse(body=b"c")
+
+
+def test_memory_cache_expires_entries_after_ttl(monkeypatch: pytest.MonkeyPatch) -> None:
+    cache = MemoryResponseCache(max_entries=2, ttl_seconds=10.0)
+    monkeypatch.setattr("app.core.cache.time.monotonic", lambda: 100.0)
+    cache.set("a", CachedResponse(body=b"a"))
+
+    monkeypatch.setattr("app.core.cache.time.monotonic", lambda: 110.0)
+
+    assert cache.get("a") is None
+
+
+def test_build_key_changes_when_version_is_bumped() -> None:
+    cache = MemoryResponseCache(max_entries=2, ttl_seconds=60.0)
+    before = cache.build_key("todos:list", limit=10, cursor=None)
+
+    cache.bump_version()
+
+    assert before == "todos:list:v0:limit=10"
+    assert cache.build_key("todos:list", limit=10, cursor=None) == "todos:list:v1:limit=10"
+
+
+def test_sqlite_cache_is_shared_between_instances(tmp_path: Path) -> None:
+    path = tmp_path / "cache.sqlite3"
+    worker_a = SqliteResponseCache(path, max_entries=2, ttl_seconds=60.0)
+    worker_b = SqliteResponseCache(path, max_entries=2, ttl_seconds=60.0)
+
+    worker_a.set("a", CachedResponse(body=b"[]", headers={"x-next-cursor": "abc"}))
+    worker_a.bump_version()
+
+    assert worker_b.get("a") == CachedResponse(body=b"[]", headers={"x-next-cursor": "abc"})
+    assert worker_b.get_version() == 1
+
+
+def test_shared_cache_lets_a_tool_invalidate_the_servers_pages(tmp_path: Path) -> None:
+    settings = Settings(RESPONSE_CACHE_BACKEND="memory", RESPONSE_CACHE_SQLITE_PATH=str(tmp_path / "cache.sqlite3"))
+    server = SqliteResponseCache(tmp_path / "cache.sqlite3", max_entries=2, ttl_seconds=60.0)
+
+    build_response_cache(settings, shared=True).bump_version()
+
+    assert isinstance(build_response_cache(settings), MemoryResponseCache)
+    assert server.get_version() == 1
+    assert build_response_cache(Settings(RESPONSE_CACHE_BACKEND="none"), shared=True) is None
+
+
+def test_sqlite_cache_keeps_at_most_max_entries(tmp_path: Path) -> None:
+    cache = SqliteResponseCache(tmp_path / "cache.sqlite3", max_entries=2, ttl_seconds=60.0)
+
+    for key in ("a", "b", "c"):
+        cache.set(key, CachedResponse(body=key.encode()))
+
+    assert [cache.get(key) is not None for key in ("a", "b", "c")] == [False, True, True]
+
+
+@pytest.mark.asyncio
+async def test_sqlite_cache_lookup_and_store_run_off_the_event_loop(tmp_path: Path) -> None:
+    cache = SqliteResponseCache(tmp_path / "cache.sqlite3", max_entries=10, ttl_seconds=60.0)
+    threads: list[int] = []
+    get, set_ = cache.get, cache.set
+    cache.get = lambda key: threads.append(threading.get_ident()) or get(key)
+    cache.set = lambda key, response: threads.append(threading.get_ident()) or set_(key, response)
+
+    key, missing = await cache.lookup("todos:list", limit=10)
+    await cache.store(key, CachedResponse(body=b"[]"))
+    _, cached = await cache.lookup("todos:list", limit=10)
+
+    assert missing is None
+    assert cached == CachedResponse(body=b"[]")
+    assert len(threads) == 3
+    assert threading.get_ident() not in threads
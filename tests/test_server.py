@@ -0,0 +1,63 @@
+from pathlib import Path
+
+import pytest
+
+from app import server
+from app.core.config import Settings
+
+
+def test_split_pool_budget_keeps_all_workers_within_the_budget() -> None:
+    assert server.split_pool_budget(40, 4, pool_size=5) == (5, 5)
+    assert server.split_pool_budget(12, 4, pool_size=5) == (3, 0)
+    with pytest.raises(ValueError):
+        server.split_pool_budget(3, 4, pool_size=5)
+
+
+def test_worker_environment_splits_the_budget_and_shares_metrics(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(server.tempfile, "mkdtemp", lambda prefix: str(tmp_path))
+
+    environment = server.worker_environment(Settings(DB_POOL_BUDGET=30, DB_POOL_SIZE=5), workers=3)
+
+    assert environment["DB_POOL_SIZE"] == "5"
+    assert environment["DB_MAX_OVERFLOW"] == "5"
+    assert environment["METRICS_MULTIPROCESS_DIR"] == str(tmp_path)
+    assert environment["RESPONSE_CACHE_BACKEND"] == "sqlite"
+    assert environment["TODO_EVENTS_BACKEND"] == "sqlite"
+    assert server.worker_environment(Settings(), workers=1) == {}
+
+
+def test_worker_environment_keeps_shared_or_disabled_backends(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(server.tempfile, "mkdtemp", lambda prefix: str(tmp_path))
+
+    environment = server.worker_environment(
+        Settings(RESPONSE_CACHE_BACKEND="none", TODO_EVENTS_BACKEND="sqlite"), workers=2
+    )
+
+    assert "RESPONSE_CACHE_BACKEND" not in environment
+    assert "TODO_EVENTS_BACKEND" not in environment
+
+
+def test_available_cpus_respects_the_cgroup_quota(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(server.os, "sched_getaffinity", lambda _: set(range(8)), raising=False)
+    monkeypatch.setattr(server, "cgroup_cpu_limit", lambda: 1.5)
+
+    assert server.available_cpus() == 2
+
+
+def test_supervisor_preloads_modules_without_building_the_app(monkeypatch: pytest.MonkeyPatch) -> None:
+    imported: list[str] = []
+    logging_calls: list[dict] = []
+    monkeypatch.setattr(server, "worker_environment", lambda settings, workers: {})
+    monkeypatch.setattr(server.importlib, "import_module", imported.append)
+    monkeypatch.setattr(server, "configure_logging", lambda settings, **kwargs: logging_calls.append(kwargs))
+    monkeypatch.setattr(server.uvicorn, "run", lambda app, **options: None)
+
+    server.main(["--workers", "2"])
+
+    assert imported == list(server.PRELOAD_MODULES)
+    assert "app.main" not in imported
+    assert logging_calls == [{"use_queue": False}]
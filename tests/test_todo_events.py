@@ -0,0 +1,135 @@
+import asyncio
+import threading
+from pathlib import Path
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.core.errors import TodoDuplicateError
+from app.core.events import EventBroker, MemoryEventBackend, SqliteEventBackend, TodoEvent, get_event_broker
+from app.main import app
+from app.schemas.todo import TodoBulkDeleteRequest, TodoCreateRequest, TodoUpdateRequest
+from app.services.todo_service import TodoService
+
+
+@pytest.mark.asyncio
+async def test_broker_delivers_events_published_from_other_threads() -> None:
+    broker = EventBroker(MemoryEventBackend(), max_queue=8)
+    subscription = broker.subscribe()
+
+    publisher = threading.Thread(target=broker.publish, args=(TodoEvent(type="todo.deleted", change_seq=1),))
+    publisher.start()
+    publisher.join()
+
+    assert await subscription.get(timeout=1.0) == TodoEvent(type="todo.deleted", change_seq=1)
+    assert await subscription.get(timeout=0.01) is None
+
+
+@pytest.mark.asyncio
+async def test_broker_evicts_slow_consumers_without_blocking_others() -> None:
+    broker = EventBroker(MemoryEventBackend(), max_queue=2)
+    slow = broker.subscribe()
+    fast = broker.subscribe()
+
+    for change_seq in range(1, 4):
+        broker.publish(TodoEvent(type="todos.changed", change_seq=change_seq))
+        await asyncio.sleep(0)
+        assert (await fast.get(timeout=1.0)).change_seq == change_seq
+
+    assert slow.evicted is True
+    assert [(await slow.get(timeout=1.0)).change_seq for _ in range(2)] == [1, 2]
+    assert await slow.get(timeout=1.0) is None
+    assert fast.evicted is False
+
+
+@pytest.mark.asyncio
+async def test_sqlite_backend_shares_events_between_brokers(tmp_path: Path) -> None:
+    path = tmp_path / "events.sqlite3"
+    publisher = EventBroker(SqliteEventBackend(path, poll_interval_seconds=0.01), max_queue=8)
+    listener = EventBroker(SqliteEventBackend(path, poll_interval_seconds=0.01), max_queue=8)
+    subscription = listener.subscribe()
+
+    try:
+        publisher.publish(TodoEvent(type="todo.created", change_seq=7, data={"id": 3}))
+        event = await subscription.get(timeout=2.0)
+    finally:
+        listener.stop()
+
+    assert event == TodoEvent(type="todo.created", change_seq=7, data={"id": 3})
+
+
+def test_service_publishes_after_commit_only(db_session: Session) -> None:
+    published: list[TodoEvent] = []
+    backend = MemoryEventBackend()
+    backend.start(published.append)
+    service = TodoService(db_session, event_broker=EventBroker(backend, max_queue=8))
+
+    created = service.create_todo(TodoCreateRequest(title="A", category="Home"))
+    service.update_todo(todo_id=created.id, payload=TodoUpdateRequest(is_completed=True))
+    with pytest.raises(TodoDuplicateError):
+        service.create_todo(TodoCreateRequest(title="a", category="home"))
+    service.create_todos_batch([TodoCreateRequest(title=title) for title in "BC"])
+    service.delete_todos_bulk(TodoBulkDeleteRequest(filter={"category": "general"}))
+    service.delete_todo(todo_id=created.id)
+
+    assert [event.type for event in published] == [
+        "todo.created",
+        "todo.updated",
+        "todos.changed",
+        "todos.changed",
+        "todo.deleted",
+    ]
+    assert published[1].data["is_completed"] is True
+    assert published[2].data == {"operation": "create", "count": 2}
+    assert published[4].data == {"id": created.id}
+    assert [event.change_seq for event in published] == sorted(event.change_seq for event in published)
+
+
+@pytest.mark.asyncio
+async def test_events_endpoint_streams_events_until_client_disconnects() -> None:
+    broker = EventBroker(MemoryEventBackend(), max_queue=8)
+    app.dependency_overrides[get_event_broker] = lambda: broker
+    chunks: asyncio.Queue[bytes] = asyncio.Queue()
+    disconnected = asyncio.Event()
+    headers: dict[bytes, bytes] = {}
+
+    async def receive() -> dict:
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: dict) -> None:
+        if message["type"] == "http.response.start":
+            headers.update(message["headers"])
+        elif message["type"] == "http.response.body" and message.get("body"):
+            await chunks.put(message["body"])
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/api/v1/todos/events",
+        "raw_path": b"/api/v1/todos/events",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"test")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("test", 80),
+    }
+    try:
+        stream = asyncio.create_task(app(scope, receive, send))
+        assert await asyncio.wait_for(chunks.get(), 1.0) == b"retry: 3000\n\n"
+        assert broker.subscriber_count == 1
+
+        broker.publish(TodoEvent(type="todo.deleted", change_seq=4, data={"id": 9}))
+        event = await asyncio.wait_for(chunks.get(), 1.0)
+
+        disconnected.set()
+        await asyncio.wait_for(stream, 1.0)
+    finally:
+        app.dependency_overrides.pop(get_event_broker, None)
+
+    assert headers[b"content-type"].startswith(b"text/event-stream")
+    assert event == b'id: 4\nevent: todo.deleted\ndata: {"id": 9}\n\n'
+    assert broker.subscriber_count == 0
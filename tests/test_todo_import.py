@@ -0,0 +1,89 @@
+from collections.abc import AsyncIterator
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.core.errors import TodoValidationError
+from app.services import todo_import
+from app.services.async_todo_service import AsyncTodoService
+from app.services.todo_import import ImportJob, iter_import_records, run_import
+
+
+async def stream(*chunks: bytes) -> AsyncIterator[bytes]:
+    for chunk in chunks:
+        yield chunk
+
+
+async def collect(records) -> list:
+    return [record async for record in records]
+
+
+@pytest.mark.asyncio
+async def test_csv_records_survive_chunk_boundaries_and_quoted_newlines() -> None:
+    records = await collect(
+        iter_import_records(
+            stream(b"\xef\xbb\xbfTitle,category\r\nFirst,wo", b'rk\r\n"Multi\nline",home\n\n', b"Last,"),
+            "csv",
+        )
+    )
+
+    assert [(record.line, record.payload.title, record.payload.category) for record in records] == [
+        (2, "First", "work"),
+        (3, "Multi\nline", "home"),
+        (6, "Last", ""),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_csv_without_title_column_is_rejected() -> None:
+    with pytest.raises(TodoValidationError):
+        await collect(iter_import_records(stream(b"name,category\nA,b\n"), "csv"))
+
+
+@pytest.mark.asyncio
+async def test_csv_unterminated_quote_is_reported_once_the_record_limit_is_reached(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(todo_import, "MAX_IMPORT_RECORD_CHARS", 50)
+    rows = b"".join(b"Task %d,home\n" % index for index in range(10))
+
+    records = await collect(iter_import_records(stream(b'title,category\n"Stray,home\n', rows, b"Last,home\n"), "csv"))
+
+    errors = [(record.line, record.error) for record in records if record.error is not None]
+    assert errors == [(2, "Quoted field is longer than 50 characters")]
+    # Parsing resumes after the rejected run instead of swallowing the rest of the upload.
+    assert records[-1].line == 13
+    assert (records[-1].payload.title, records[-1].payload.category) == ("Last", "home")
+
+
+@pytest.mark.asyncio
+async def test_jsonl_reports_malformed_lines() -> None:
+    records = await collect(iter_import_records(stream(b'{"title": "A"}\n[1]\n{oops\n'), "jsonl"))
+
+    assert records[0].payload.title == "A"
+    assert (records[1].line, records[1].error) == (2, "Each line must be a JSON object")
+    assert records[2].line == 3
+    assert records[2].error.startswith("Invalid JSON")
+
+
+@pytest.mark.asyncio
+async def test_run_import_commits_in_chunks_and_reports_row_errors(db_session: Session) -> None:
+    job = ImportJob(format="jsonl", max_errors=1)
+    lines = [b'{"title": "Task %d"}\n' % index for index in range(5)]
+    lines += [b'{"title": "task 1"}\n', b'{"title": ""}\n']
+    commits = 0
+    original_commit = db_session.commit
+
+    def counting_commit() -> None:
+        nonlocal commits
+        commits += 1
+        original_commit()
+
+    db_session.commit = counting_commit
+    await run_import(job, stream(*lines), todo_service=AsyncTodoService.from_session(db_session), chunk_size=2)
+
+    assert (job.status, job.rows_read, job.created, job.duplicates, job.invalid) == ("completed", 7, 5, 1, 1)
+    assert commits == 3
+    assert [(error.line, error.code) for error in job.errors] == [(6, "TODO_DUPLICATE")]
+    assert job.errors_truncated is True
+    assert job.rows_per_second > 0
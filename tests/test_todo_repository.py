@@ -1,9 +1,14 @@
+from datetime import datetime
+
 from sqlalchemy.orm import Session
 import pytest
+from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 
+from app.core.normalization import tokenize_text
 from app.models.todo import Todo
-from app.repositories.todo_repository import TodoRepository
+from app.models.todo_title_token import TodoTitleToken
+from app.repositories.todo_repository import TodoListFilter, TodoRepository, TodoSelection
 
 
 def test_create_and_get_todo_by_id(db_session: Session) -> None:
@@ -43,7 +48,7 @@ def test_delete_todo_removes_row(db_session: Session) -> None:
     persistent_todo = repository.get_todo_by_id(todo_id=todo.id)
     assert persistent_todo is not None
 
-    repository.delete_todo(todo=persistent_todo)
+    repository.delete_todo(todo=persistent_todo, change_seq=1)
     db_session.commit()
 
     assert repository.get_todo_by_id(todo_id=todo.id) is None
@@ -86,3 +91,136 @@ def test_create_todo_rejects_category_beyond_db_limit(db_session: Session) -> No
 
     with pytest.raises(IntegrityError):
         db_session.commit()
+
+
+def test_list_todos_applies_limit_and_keyset_after(db_session: Session) -> None:
+    repository = TodoRepository(db_session)
+
+    first = repository.create_todo(title="First")
+    second = repository.create_todo(title="Second")
+    third = repository.create_todo(title="Third")
+    db_session.commit()
+
+    first_page = repository.list_todos(limit=2)
+    next_page = repository.list_todos(limit=2, after=(second.created_at, second.id))
+
+    assert [todo.id for todo in first_page] == [third.id, second.id]
+    assert [todo.id for todo in next_page] == [first.id]
+
+
+def test_list_todos_filters_and_sorts_ascending_with_keyset(db_session: Session) -> None:
+    repository = TodoRepository(db_session)
+    rows = [
+        ("Old work", "work", datetime(2026, 1, 1), True),
+        ("New work", "work", datetime(2026, 3, 1), False),
+        ("Newer work", "work", datetime(2026, 4, 1), False),
+        ("Home", "home", datetime(2026, 3, 1), False),
+    ]
+    for title, category, created_at, is_completed in rows:
+        todo = repository.create_todo(title=title, category=category)
+        todo.created_at = created_at
+        todo.is_completed = is_completed
+    db_session.commit()
+
+    list_filter = TodoListFilter(category="work", is_completed=False, created_after=datetime(2026, 2, 1))
+    first_page = repository.list_todos(limit=1, list_filter=list_filter, sort="created_asc")
+    next_page = repository.list_todos(
+        limit=1,
+        after=(first_page[0].created_at, first_page[0].id),
+        list_filter=list_filter,
+        sort="created_asc",
+    )
+
+    assert [todo.title for todo in first_page] == ["New work"]
+    assert [todo.title for todo in next_page] == ["Newer work"]
+    assert [todo.title for todo in repository.list_todos(sort="updated_desc")][0] == "Home"
+    assert repository.list_todos(list_filter=TodoListFilter(created_before=datetime(2026, 2, 1)))[0].title == "Old work"
+
+
+def test_iter_todo_chunks_walks_all_rows_in_list_order(db_session: Session) -> None:
+    repository = TodoRepository(db_session)
+
+    created = [repository.create_todo(title=f"Todo {index}") for index in range(5)]
+    db_session.commit()
+
+    chunks = list(repository.iter_todo_chunks(chunk_size=2))
+
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    assert [todo.id for chunk in chunks for todo in chunk] == [todo.id for todo in reversed(created)]
+
+
+def test_create_todo_stores_canonical_keys(db_session: Session) -> None:
+    repository = TodoRepository(db_session)
+
+    created = repository.create_todo(title="Pay  Bills", category="HOME")
+    db_session.commit()
+
+    assert created.title_canonical == "pay bills"
+    assert created.category_canonical == "home"
+    assert repository.get_todo_by_canonical_title_and_category(title="pay bills", category="home") is not None
+
+
+def test_unique_canonical_index_rejects_duplicate_keys(db_session: Session) -> None:
+    repository = TodoRepository(db_session)
+
+    repository.create_todo(title="Pay bills", category="Home")
+    repository.create_todo(title="PAY BILLS", category="home")
+
+    with pytest.raises(IntegrityError):
+        db_session.commit()
+
+
+def _title_tokens(db_session: Session) -> set[tuple[str, int]]:
+    return {tuple(row) for row in db_session.execute(select(TodoTitleToken.token, TodoTitleToken.todo_id))}
+
+
+def test_tokenize_text_returns_distinct_canonical_words() -> None:
+    assert tokenize_text("  Buy MILK, buy eggs!  ") == ["buy", "milk", "eggs"]
+    assert tokenize_text("Café-au-lait") == ["café", "au", "lait"]
+    assert tokenize_text("?!") == []
+
+
+def test_title_tokens_follow_every_write_path(db_session: Session) -> None:
+    repository = TodoRepository(db_session)
+
+    single = repository.create_todo(title="Buy milk")
+    batch = {row.title: row.id for row in repository.create_todos(rows=[("Buy eggs", "general"), ("Walk dog", "home")])}
+    db_session.commit()
+    assert _title_tokens(db_session) == {
+        ("buy", single.id),
+        ("milk", single.id),
+        ("buy", batch["Buy eggs"]),
+        ("eggs", batch["Buy eggs"]),
+        ("walk", batch["Walk dog"]),
+        ("dog", batch["Walk dog"]),
+    }
+
+    single.title = "Buy oat milk"
+    repository.save(single)
+    repository.delete_todos(selection=TodoSelection(category="home"), change_seq=1)
+    db_session.commit()
+    assert {token for token, todo_id in _title_tokens(db_session) if todo_id == single.id} == {"buy", "oat", "milk"}
+    assert all(todo_id != batch["Walk dog"] for _, todo_id in _title_tokens(db_session))
+
+    repository.delete_todo(todo=single, change_seq=2)
+    db_session.commit()
+    assert _title_tokens(db_session) == {("buy", batch["Buy eggs"]), ("eggs", batch["Buy eggs"])}
+
+
+def test_search_todos_ranks_by_matched_tokens_then_newest(db_session: Session) -> None:
+    repository = TodoRepository(db_session)
+    for index, title in enumerate(["Buy milk", "Buy oat milk", "Buy eggs", "Walk dog"]):
+        todo = repository.create_todo(title=title)
+        db_session.flush()
+        todo.created_at = datetime(2026, 1, 1 + index)
+        for title_token in todo.title_tokens:
+            title_token.created_at = todo.created_at
+    db_session.commit()
+
+    ranked = repository.search_todos(tokens=["buy", "milk"], limit=10)
+    newest_buy = repository.search_todos(tokens=["buy"], limit=2)
+    after = repository.search_todos(tokens=["buy"], limit=10, after=(1, newest_buy[-1][0].created_at, newest_buy[-1][0].id))
+
+    assert [(todo.title, score) for todo, score in ranked] == [("Buy oat milk", 2), ("Buy milk", 2), ("Buy eggs", 1)]
+    assert [todo.title for todo, _ in newest_buy] == ["Buy eggs", "Buy oat milk"]
+    assert [todo.title for todo, _ in after] == ["Buy milk"]
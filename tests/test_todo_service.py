@@ -1,13 +1,32 @@
+import base64
+import json
+from datetime import datetime, timedelta, timezone
 from unittest.mock import create_autospec
 
 import pytest
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 
-from app.core.errors import TodoDuplicateError, TodoNotFoundError, TodoValidationError
+from app.core.errors import (
+    ChangeTokenExpiredError,
+    InvalidCursorError,
+    TodoDuplicateError,
+    TodoNotFoundError,
+    TodoPreconditionFailedError,
+    TodoValidationError,
+)
+from app.core.etags import todo_etag
 from app.models.todo import Todo
+from app.models.todo_category_stats import TodoCategoryStats
 from app.repositories.todo_repository import TodoRepository
-from app.schemas.todo import TodoCreateRequest, TodoUpdateRequest
-from app.services.todo_service import TodoService
+from app.schemas.todo import (
+    TodoBulkDeleteRequest,
+    TodoBulkUpdateRequest,
+    TodoCreateRequest,
+    TodoUpdateRequest,
+)
+from app.services.todo_service import TodoListQuery, TodoService
+from tests.conftest import QueryCounter
 
 
 def test_create_todo_trims_title_and_commits(db_session: Session) -> None:
@@ -105,6 +124,27 @@ def test_update_todo_without_changes_does_not_call_commit(db_session: Session) -
     service.db_session.commit.assert_not_called()
 
 
+def test_update_todo_checks_if_match_against_current_etag(db_session: Session) -> None:
+    service = TodoService(db_session)
+    created = service.create_todo(TodoCreateRequest(title="Guarded"))
+    current_etag = todo_etag(created)
+
+    with pytest.raises(TodoPreconditionFailedError):
+        service.update_todo(
+            todo_id=created.id,
+            payload=TodoUpdateRequest(is_completed=True),
+            if_match='W/"stale"',
+        )
+    updated = service.update_todo(
+        todo_id=created.id,
+        payload=TodoUpdateRequest(is_completed=True),
+        if_match=current_etag,
+    )
+
+    assert updated.is_completed is True
+    assert todo_etag(updated) != current_etag
+
+
 def test_delete_todo_raises_not_found_for_unknown_id(db_session: Session) -> None:
     service = TodoService(db_session)
 
@@ -132,3 +172,296 @@ def test_list_todos_returns_repository_results(db_session: Session) -> None:
 
     assert len(todos) == 2
     assert [todo.title for todo in todos] == ["B", "A"]
+
+
+def test_list_todo_page_returns_cursor_until_last_page(db_session: Session) -> None:
+    service = TodoService(db_session)
+    for title in ["A", "B", "C"]:
+        service.create_todo(TodoCreateRequest(title=title))
+
+    first_page = service.list_todo_page(limit=2)
+    last_page = service.list_todo_page(limit=2, cursor=first_page.next_cursor)
+
+    assert [todo.title for todo in first_page.items] == ["C", "B"]
+    assert first_page.next_cursor is not None
+    assert [todo.title for todo in last_page.items] == ["A"]
+    assert last_page.next_cursor is None
+
+
+def test_list_todo_page_rejects_cursor_from_another_sort(db_session: Session) -> None:
+    service = TodoService(db_session)
+    for title in ["A", "B"]:
+        service.create_todo(TodoCreateRequest(title=title))
+
+    first_page = service.list_todo_page(limit=1, query=TodoListQuery(sort="updated_asc"))
+    second_page = service.list_todo_page(limit=1, cursor=first_page.next_cursor, query=TodoListQuery(sort="updated_asc"))
+
+    assert [todo.title for todo in first_page.items + second_page.items] == ["A", "B"]
+    with pytest.raises(InvalidCursorError):
+        service.list_todo_page(limit=1, cursor=first_page.next_cursor)
+
+
+def test_list_todo_page_accepts_cursors_issued_before_sorting(db_session: Session) -> None:
+    service = TodoService(db_session)
+    for title in ["A", "B"]:
+        service.create_todo(TodoCreateRequest(title=title))
+    newest = service.list_todos()[0]
+    legacy_cursor = base64.urlsafe_b64encode(
+        json.dumps([newest.created_at.isoformat(), newest.id]).encode()
+    ).decode().rstrip("=")
+
+    page = service.list_todo_page(limit=10, cursor=legacy_cursor)
+
+    assert [todo.title for todo in page.items] == ["A"]
+
+
+@pytest.mark.parametrize("invalid_cursor", ["not-a-cursor", "WyJ4Il0"])
+def test_list_todo_page_rejects_invalid_cursor(db_session: Session, invalid_cursor: str) -> None:
+    service = TodoService(db_session)
+
+    with pytest.raises(InvalidCursorError) as error:
+        service.list_todo_page(limit=10, cursor=invalid_cursor)
+
+    assert error.value.code == "INVALID_CURSOR"
+
+
+def test_search_todos_pages_with_search_cursor(db_session: Session) -> None:
+    service = TodoService(db_session)
+    for title in ["Buy milk", "Buy oat milk", "Buy eggs", "Walk dog"]:
+        service.create_todo(TodoCreateRequest(title=title))
+
+    first_page = service.search_todos(q="MILK buy", limit=2)
+    last_page = service.search_todos(q="MILK buy", limit=2, cursor=first_page.next_cursor)
+
+    assert [todo.title for todo in first_page.items] == ["Buy oat milk", "Buy milk"]
+    assert [todo.title for todo in last_page.items] == ["Buy eggs"]
+    assert last_page.next_cursor is None
+    with pytest.raises(InvalidCursorError):
+        service.list_todo_page(limit=2, cursor=first_page.next_cursor)
+
+
+def test_search_todos_rejects_query_without_words(db_session: Session) -> None:
+    service = TodoService(db_session)
+
+    with pytest.raises(TodoValidationError):
+        service.search_todos(q=" ?! ", limit=10)
+
+
+def test_create_todos_batch_reports_outcomes_in_request_order(db_session: Session) -> None:
+    service = TodoService(db_session)
+    service.create_todo(TodoCreateRequest(title="Existing", category="Home"))
+
+    outcomes = service.create_todos_batch(
+        [
+            TodoCreateRequest(title="New one"),
+            TodoCreateRequest(title=" existing ", category="home"),
+            TodoCreateRequest.model_construct(title="   ", category="general"),
+            TodoCreateRequest(title="NEW ONE", category="General"),
+            TodoCreateRequest(title="Another", category="Work"),
+        ]
+    )
+
+    assert [outcome.status for outcome in outcomes] == ["created", "duplicate", "invalid", "duplicate", "created"]
+    assert outcomes[0].todo is not None
+    assert outcomes[0].todo.title == "New one"
+    assert outcomes[4].todo is not None
+    assert outcomes[4].todo.category == "Work"
+    assert outcomes[1].error is not None
+    assert outcomes[1].error.code == "TODO_DUPLICATE"
+    assert outcomes[2].error is not None
+    assert outcomes[2].error.code == "TODO_VALIDATION_ERROR"
+    assert [todo.title for todo in service.list_todos()] == ["Another", "New one", "Existing"]
+
+
+def test_create_todos_batch_without_new_rows_does_not_call_commit(db_session: Session) -> None:
+    service = TodoService(db_session)
+    service.create_todo(TodoCreateRequest(title="Existing"))
+
+    service.db_session.commit = create_autospec(service.db_session.commit)
+
+    outcomes = service.create_todos_batch([TodoCreateRequest(title="existing")])
+
+    assert [outcome.status for outcome in outcomes] == ["duplicate"]
+    service.db_session.commit.assert_not_called()
+
+
+def test_update_todos_bulk_by_filter_changes_only_matching_rows(db_session: Session) -> None:
+    service = TodoService(db_session)
+    first = service.create_todo(TodoCreateRequest(title="Laundry", category="Home"))
+    second = service.create_todo(TodoCreateRequest(title="Dishes", category="home"))
+    service.create_todo(TodoCreateRequest(title="Report", category="Work"))
+
+    affected = service.update_todos_bulk(
+        TodoBulkUpdateRequest(filter={"category": " HOME "}, category="chores", is_completed=True)
+    )
+
+    assert affected == 2
+    moved = {todo.id: todo for todo in service.list_todos() if todo.category == "chores"}
+    assert set(moved) == {first.id, second.id}
+    assert all(todo.is_completed for todo in moved.values())
+
+
+def test_update_todos_bulk_ignores_case_only_category_change(db_session: Session) -> None:
+    service = TodoService(db_session)
+    created = service.create_todo(TodoCreateRequest(title="Laundry", category="Home"))
+
+    affected = service.update_todos_bulk(TodoBulkUpdateRequest(ids=[created.id], category="HOME"))
+
+    assert affected == 0
+    assert service.list_todos()[0].category == "Home"
+
+
+def test_update_todos_bulk_rejects_duplicate_with_unselected_row(db_session: Session) -> None:
+    service = TodoService(db_session)
+    service.create_todo(TodoCreateRequest(title="Pay bills", category="Work"))
+    moving = service.create_todo(TodoCreateRequest(title="pay bills", category="Home"))
+
+    with pytest.raises(TodoDuplicateError) as error:
+        service.update_todos_bulk(TodoBulkUpdateRequest(ids=[moving.id], category="work"))
+
+    assert error.value.code == "TODO_DUPLICATE"
+
+
+def test_update_todos_bulk_rejects_duplicate_within_selection(db_session: Session) -> None:
+    service = TodoService(db_session)
+    first = service.create_todo(TodoCreateRequest(title="Pay bills", category="Home"))
+    second = service.create_todo(TodoCreateRequest(title="Pay bills", category="Work"))
+
+    with pytest.raises(TodoDuplicateError):
+        service.update_todos_bulk(TodoBulkUpdateRequest(ids=[first.id, second.id], category="Admin"))
+
+
+def test_delete_todos_bulk_by_completion_filter(db_session: Session) -> None:
+    service = TodoService(db_session)
+    done = service.create_todo(TodoCreateRequest(title="Done"))
+    service.update_todo(todo_id=done.id, payload=TodoUpdateRequest(is_completed=True))
+    service.create_todo(TodoCreateRequest(title="Open"))
+
+    affected = service.delete_todos_bulk(TodoBulkDeleteRequest(filter={"is_completed": True}))
+
+    assert affected == 1
+    assert [todo.title for todo in service.list_todos()] == ["Open"]
+
+
+def test_create_todo_maps_unique_index_race_to_duplicate_error(
+    db_session: Session,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    service = TodoService(db_session)
+    service.create_todo(TodoCreateRequest(title="Pay bills", category="Home"))
+
+    # Simulate a concurrent insert landing between the duplicate check and the commit.
+    monkeypatch.setattr(
+        service.todo_repository,
+        "get_todo_by_canonical_title_and_category",
+        lambda **_: None,
+    )
+
+    with pytest.raises(TodoDuplicateError):
+        service.create_todo(TodoCreateRequest(title="pay bills", category="home"))
+
+    assert len(service.list_todos()) == 1
+
+
+def _stats(service: TodoService) -> dict[str, tuple[int, int]]:
+    return {stats.category_canonical: (stats.total, stats.completed) for stats in service.get_category_stats()}
+
+
+def test_category_stats_follow_every_write_path(db_session: Session) -> None:
+    service = TodoService(db_session)
+
+    first = service.create_todo(TodoCreateRequest(title="A", category="Work"))
+    service.create_todos_batch([TodoCreateRequest(title=title, category="home") for title in ["B", "C", "D"]])
+    service.update_todo(todo_id=first.id, payload=TodoUpdateRequest(is_completed=True))
+    assert _stats(service) == {"work": (1, 1), "home": (3, 0)}
+
+    service.update_todo(todo_id=first.id, payload=TodoUpdateRequest(category="HOME"))
+    service.update_todos_bulk(
+        TodoBulkUpdateRequest(filter={"category": "home", "is_completed": False}, category="Errands", is_completed=True)
+    )
+    assert _stats(service) == {"home": (1, 1), "errands": (3, 3)}
+
+    service.delete_todo(todo_id=first.id)
+    service.delete_todos_bulk(TodoBulkDeleteRequest(filter={"category": "errands"}))
+    assert _stats(service) == {}
+
+
+def test_reconcile_category_stats_repairs_drift(db_session: Session) -> None:
+    service = TodoService(db_session)
+    service.create_todo(TodoCreateRequest(title="A", category="Work"))
+    service.create_todo(TodoCreateRequest(title="B", category="Home"))
+    db_session.execute(update(TodoCategoryStats).values(total=TodoCategoryStats.total + 5))
+    db_session.add(TodoCategoryStats(category_canonical="ghost", total=2, completed=0))
+    db_session.commit()
+
+    corrected = service.reconcile_category_stats()
+
+    assert corrected == 3
+    assert _stats(service) == {"work": (1, 0), "home": (1, 0)}
+    assert service.reconcile_category_stats() == 0
+
+
+def test_reconcile_category_stats_locks_like_the_writers(db_session: Session, query_counter: QueryCounter) -> None:
+    service = TodoService(db_session)
+    service.create_todo(TodoCreateRequest(title="A", category="Work"))
+    last_seq, _ = service.todo_change_repository.get_sequence_state()
+
+    with query_counter.assert_max_queries(10):
+        service.reconcile_category_stats()
+
+    # The change-sequence row first, as every writer claims it before touching todos or the stats;
+    # locking it does not use up a sequence number.
+    assert query_counter.statements[0].startswith("UPDATE todo_change_sequence")
+    assert service.todo_change_repository.get_sequence_state()[0] == last_seq
+
+
+def test_list_changes_returns_writes_and_deletions_since_token(db_session: Session) -> None:
+    service = TodoService(db_session)
+    first = service.create_todo(TodoCreateRequest(title="A"))
+    second = service.create_todo(TodoCreateRequest(title="B"))
+
+    initial = service.list_changes(since=None, limit=10)
+    service.update_todo(todo_id=first.id, payload=TodoUpdateRequest(is_completed=True))
+    service.delete_todo(todo_id=second.id)
+    third = service.create_todo(TodoCreateRequest(title="C"))
+    delta = service.list_changes(since=initial.next_token, limit=10)
+    idle = service.list_changes(since=delta.next_token, limit=10)
+
+    assert [todo.title for todo in initial.todos] == ["A", "B"]
+    assert initial.deleted_ids == [] and initial.has_more is False
+    assert [todo.id for todo in delta.todos] == [first.id, third.id]
+    assert delta.deleted_ids == [second.id]
+    assert idle.todos == [] and idle.deleted_ids == []
+    assert idle.next_token == delta.next_token
+
+
+def test_list_changes_pages_through_one_bulk_delete(db_session: Session) -> None:
+    service = TodoService(db_session)
+    created_ids = [service.create_todo(TodoCreateRequest(title=title, category="Home")).id for title in "ABC"]
+    token = service.list_changes(since=None, limit=10).next_token
+    service.delete_todos_bulk(TodoBulkDeleteRequest(filter={"category": "home"}))
+
+    first_page = service.list_changes(since=token, limit=2)
+    second_page = service.list_changes(since=first_page.next_token, limit=2)
+
+    assert first_page.has_more is True
+    assert first_page.deleted_ids + second_page.deleted_ids == created_ids
+    assert second_page.has_more is False
+
+
+def test_list_changes_rejects_tokens_older_than_compaction(db_session: Session) -> None:
+    service = TodoService(db_session)
+    todo = service.create_todo(TodoCreateRequest(title="A"))
+    stale_token = service.list_changes(since=None, limit=10).next_token
+    service.delete_todo(todo_id=todo.id)
+    current_token = service.list_changes(since=stale_token, limit=10).next_token
+
+    removed = service.compact_tombstones(deleted_before=datetime.now(timezone.utc) + timedelta(seconds=1))
+
+    assert removed == 1
+    with pytest.raises(ChangeTokenExpiredError):
+        service.list_changes(since=stale_token, limit=10)
+    assert service.list_changes(since=None, limit=10).todos == []
+    with pytest.raises(InvalidCursorError):
+        service.list_changes(since="not-a-token", limit=10)
+    assert current_token != stale_token
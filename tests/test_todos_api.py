@@ -1,4 +1,23 @@
+import base64
+import csv
+import io
+import json
+import re
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.responses import JSONResponse
 from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.api.v1.todos import serialize_todo_list
+from app.core.config import get_settings
+from app.models.todo import Todo
+from app.schemas.todo import TodoResponse
+from tests.conftest import QueryCounter
+
+SQLITE_DATETIME = re.compile(r"\d{4}-\d\d-\d\d \d\d:\d\d:\d\d\.\d{6}")
 
 
 def test_create_todo_returns_201(client: TestClient) -> None:
@@ -31,6 +50,13 @@ def test_create_todo_rejects_whitespace_title(client: TestClient) -> None:
     assert payload["error"]["trace_id"]
 
 
+def test_create_todo_rejects_non_string_category(client: TestClient) -> None:
+    response = client.post("/api/v1/todos", json={"title": "Buy milk", "category": 7})
+
+    assert response.status_code == 422
+    assert response.json()["error"]["code"] == "REQUEST_VALIDATION_ERROR"
+
+
 def test_create_todo_defaults_empty_category_to_general(client: TestClient) -> None:
     response = client.post("/api/v1/todos", json={"title": "Buy milk", "category": "   "})
 
@@ -164,3 +190,473 @@ def test_delete_todo_then_patch_returns_404(client: TestClient) -> None:
     payload = patch_response.json()
     assert payload["error"]["code"] == "TODO_NOT_FOUND"
     assert payload["error"]["details"]["todo_id"] == created["id"]
+
+
+def test_list_todos_pages_with_next_cursor_header(client: TestClient) -> None:
+    for title in ["First", "Second", "Third"]:
+        client.post("/api/v1/todos", json={"title": title})
+
+    first_response = client.get("/api/v1/todos", params={"limit": 2})
+    next_cursor = first_response.headers["x-next-cursor"]
+    last_response = client.get("/api/v1/todos", params={"limit": 2, "cursor": next_cursor})
+
+    assert first_response.status_code == 200
+    assert [todo["title"] for todo in first_response.json()] == ["Third", "Second"]
+    assert last_response.status_code == 200
+    assert [todo["title"] for todo in last_response.json()] == ["First"]
+    assert "x-next-cursor" not in last_response.headers
+
+
+def test_list_todos_rejects_invalid_cursor(client: TestClient) -> None:
+    response = client.get("/api/v1/todos", params={"cursor": "garbage"})
+
+    assert response.status_code == 422
+    payload = response.json()
+    assert payload["error"]["code"] == "INVALID_CURSOR"
+
+
+@pytest.mark.parametrize(
+    ("path", "params", "payload"),
+    [
+        ("/api/v1/todos", {}, ["created_desc", "2026-01-01T00:00:00+00:00", 10**30]),
+        ("/api/v1/todos", {}, ["created_desc", "2026-01-01T00:00:00+00:00", -1]),
+        ("/api/v1/todos/search", {"q": "milk"}, ["relevance", 10**30, "2026-01-01T00:00:00+00:00", 1]),
+    ],
+)
+def test_tampered_cursors_with_out_of_range_ids_are_rejected(
+    client: TestClient, path: str, params: dict, payload: list
+) -> None:
+    client.post("/api/v1/todos", json={"title": "Buy milk"})
+    cursor = base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+    response = client.get(path, params={**params, "cursor": cursor})
+
+    assert response.status_code == 422
+    assert response.json()["error"]["code"] == "INVALID_CURSOR"
+
+
+@pytest.mark.parametrize("payload", [["changes", 10**30, 1, 1], ["changes", 1, -5, 1], ["changes", 1, 1, 2**63]])
+def test_tampered_change_tokens_are_rejected(client: TestClient, payload: list) -> None:
+    client.post("/api/v1/todos", json={"title": "Buy milk"})
+    token = base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+    response = client.get("/api/v1/todos/changes", params={"since": token})
+
+    assert response.status_code == 422
+    assert response.json()["error"]["code"] == "INVALID_CURSOR"
+
+
+def test_list_todos_rejects_limit_above_cap(client: TestClient) -> None:
+    response = client.get("/api/v1/todos", params={"limit": 100000})
+
+    assert response.status_code == 422
+    payload = response.json()
+    assert payload["error"]["code"] == "REQUEST_VALIDATION_ERROR"
+
+
+def test_export_todos_streams_ndjson_across_chunks(client: TestClient, monkeypatch) -> None:
+    monkeypatch.setattr(get_settings(), "TODO_EXPORT_CHUNK_SIZE", 2)
+    for title in ["First", "Second", "Third"]:
+        client.post("/api/v1/todos", json={"title": title})
+
+    response = client.get("/api/v1/todos/export")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["title"] for row in rows] == ["Third", "Second", "First"]
+    assert rows[0]["created_at"].endswith("Z")
+
+
+def test_export_todos_streams_csv_with_header(client: TestClient) -> None:
+    client.post("/api/v1/todos", json={"title": "Buy milk, eggs", "category": "home"})
+
+    response = client.get("/api/v1/todos/export", params={"format": "csv"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 1
+    assert rows[0]["title"] == "Buy milk, eggs"
+    assert rows[0]["category"] == "home"
+    assert rows[0]["is_completed"] == "False"
+
+
+def test_batch_create_returns_per_item_results(client: TestClient) -> None:
+    client.post("/api/v1/todos", json={"title": "Pay bills", "category": "Home"})
+
+    response = client.post(
+        "/api/v1/todos:batch",
+        json=[
+            {"title": "Buy milk", "category": "home"},
+            {"title": " pay bills ", "category": "  home  "},
+            {"title": "buy milk", "category": "HOME"},
+        ],
+    )
+
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["created"] == 1
+    assert payload["duplicates"] == 2
+    assert [result["status"] for result in payload["results"]] == ["created", "duplicate", "duplicate"]
+    assert payload["results"][0]["todo"]["title"] == "Buy milk"
+    assert payload["results"][1]["error"]["code"] == "TODO_DUPLICATE"
+    assert len(client.get("/api/v1/todos").json()) == 2
+
+
+def test_batch_create_reports_invalid_items_without_failing_the_batch(client: TestClient) -> None:
+    response = client.post(
+        "/api/v1/todos:batch",
+        json=[{"title": "ok"}, {"title": ""}, {"category": "home"}, {"title": "Also ok", "category": 7}],
+    )
+
+    assert response.status_code == 200
+    payload = response.json()
+    assert (payload["created"], payload["duplicates"], payload["invalid"]) == (1, 0, 3)
+    assert [result["status"] for result in payload["results"]] == ["created", "invalid", "invalid", "invalid"]
+    assert [result["index"] for result in payload["results"]] == [0, 1, 2, 3]
+    assert {result["error"]["code"] for result in payload["results"][1:]} == {"TODO_VALIDATION_ERROR"}
+    assert [todo["title"] for todo in client.get("/api/v1/todos").json()] == ["ok"]
+
+
+def test_batch_create_reports_non_object_items_per_item(client: TestClient) -> None:
+    response = client.post(
+        "/api/v1/todos:batch",
+        json=[{"title": "First"}, "not an object", None, {"title": ["x"]}, {"title": "Second", "category": "home"}],
+    )
+
+    assert response.status_code == 200
+    payload = response.json()
+    assert (payload["created"], payload["invalid"]) == (2, 3)
+    assert [result["status"] for result in payload["results"]] == [
+        "created",
+        "invalid",
+        "invalid",
+        "invalid",
+        "created",
+    ]
+    assert payload["results"][1]["error"] == {
+        "code": "TODO_VALIDATION_ERROR",
+        "message": "Each item must be a JSON object",
+    }
+    assert payload["results"][3]["error"]["message"] == "title: Input should be a valid string"
+    assert payload["results"][4]["todo"]["category"] == "home"
+
+
+def test_batch_create_rejects_empty_array(client: TestClient) -> None:
+    response = client.post("/api/v1/todos:batch", json=[])
+
+    assert response.status_code == 422
+    payload = response.json()
+    assert payload["error"]["code"] == "REQUEST_VALIDATION_ERROR"
+
+
+@pytest.mark.parametrize("ids", [[10**30], [0], [-1]])
+def test_bulk_patch_rejects_ids_outside_the_id_range(client: TestClient, ids: list[int]) -> None:
+    response = client.patch("/api/v1/todos:bulk", json={"ids": ids, "is_completed": True})
+
+    assert response.status_code == 422
+    assert response.json()["error"]["code"] == "REQUEST_VALIDATION_ERROR"
+
+
+def test_single_todo_routes_reject_ids_outside_the_id_range(client: TestClient) -> None:
+    for method in ("GET", "PATCH", "DELETE"):
+        response = client.request(method, f"/api/v1/todos/{10**30}", json={"is_completed": True})
+
+        assert response.status_code == 422
+
+
+def test_bulk_patch_and_delete_return_affected_counts(client: TestClient) -> None:
+    first = client.post("/api/v1/todos", json={"title": "Laundry", "category": "home"}).json()
+    second = client.post("/api/v1/todos", json={"title": "Dishes", "category": "home"}).json()
+    client.post("/api/v1/todos", json={"title": "Report", "category": "work"})
+
+    patch_response = client.patch(
+        "/api/v1/todos:bulk",
+        json={"ids": [first["id"], second["id"]], "is_completed": True},
+    )
+    delete_response = client.request(
+        "DELETE",
+        "/api/v1/todos:bulk",
+        json={"filter": {"is_completed": True}},
+    )
+
+    assert patch_response.status_code == 200
+    assert patch_response.json() == {"affected": 2}
+    assert delete_response.status_code == 200
+    assert delete_response.json() == {"affected": 2}
+    assert [todo["title"] for todo in client.get("/api/v1/todos").json()] == ["Report"]
+
+
+def test_bulk_patch_requires_exactly_one_selector(client: TestClient) -> None:
+    response = client.patch(
+        "/api/v1/todos:bulk",
+        json={"ids": [1], "filter": {"category": "home"}, "is_completed": True},
+    )
+
+    assert response.status_code == 422
+    payload = response.json()
+    assert payload["error"]["code"] == "REQUEST_VALIDATION_ERROR"
+
+
+def test_bulk_patch_rejects_title_changes(client: TestClient) -> None:
+    response = client.patch("/api/v1/todos:bulk", json={"ids": [1], "title": "Same for all"})
+
+    assert response.status_code == 422
+
+
+def test_list_todos_serves_cached_page_until_a_write_commits(client: TestClient, db_session) -> None:
+    client.post("/api/v1/todos", json={"title": "First"})
+    first = client.get("/api/v1/todos")
+
+    # Written behind the service's back, so the cached page is still served.
+    db_session.add(Todo(title="Hidden", category="general", title_canonical="hidden", category_canonical="general"))
+    db_session.commit()
+    cached = client.get("/api/v1/todos")
+
+    client.post("/api/v1/todos", json={"title": "Second"})
+    refreshed = client.get("/api/v1/todos")
+
+    assert cached.content == first.content
+    assert [todo["title"] for todo in refreshed.json()] == ["Second", "Hidden", "First"]
+
+
+def test_list_todos_answers_matching_if_none_match_with_304(client: TestClient, response_cache) -> None:
+    client.post("/api/v1/todos", json={"title": "Tagged"})
+    first = client.get("/api/v1/todos")
+    etag = first.headers["etag"]
+
+    from_cache = client.get("/api/v1/todos", headers={"If-None-Match": etag})
+    response_cache.bump_version()
+    from_database = client.get("/api/v1/todos", headers={"If-None-Match": etag})
+    client.post("/api/v1/todos", json={"title": "Another"})
+    changed = client.get("/api/v1/todos", headers={"If-None-Match": etag})
+
+    assert etag.startswith('W/"')
+    assert (from_cache.status_code, from_cache.content, from_cache.headers["etag"]) == (304, b"", etag)
+    assert (from_database.status_code, from_database.content) == (304, b"")
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+
+
+def test_get_todo_supports_conditional_get(client: TestClient) -> None:
+    created = client.post("/api/v1/todos", json={"title": "Single"})
+    todo_id = created.json()["id"]
+
+    fetched = client.get(f"/api/v1/todos/{todo_id}")
+    not_modified = client.get(f"/api/v1/todos/{todo_id}", headers={"If-None-Match": fetched.headers["etag"]})
+
+    assert fetched.status_code == 200
+    assert fetched.headers["etag"] == created.headers["etag"]
+    assert fetched.json()["title"] == "Single"
+    assert not_modified.status_code == 304
+    assert client.get("/api/v1/todos/999999").status_code == 404
+
+
+def test_patch_todo_honours_if_match(client: TestClient) -> None:
+    created = client.post("/api/v1/todos", json={"title": "Versioned"})
+    todo_id = created.json()["id"]
+    etag = created.headers["etag"]
+
+    updated = client.patch(f"/api/v1/todos/{todo_id}", json={"is_completed": True}, headers={"If-Match": etag})
+    conflicting = client.patch(f"/api/v1/todos/{todo_id}", json={"title": "Lost update"}, headers={"If-Match": etag})
+
+    assert updated.status_code == 200
+    assert updated.headers["etag"] != etag
+    assert conflicting.status_code == 412
+    assert conflicting.json()["error"]["code"] == "TODO_PRECONDITION_FAILED"
+    assert conflicting.json()["error"]["details"]["etag"] == updated.headers["etag"]
+
+
+def test_patch_if_match_uses_strong_comparison(client: TestClient) -> None:
+    created = client.post("/api/v1/todos", json={"title": "Strong"})
+    todo_id = created.json()["id"]
+    etag = created.headers["etag"]
+
+    path = f"/api/v1/todos/{todo_id}"
+
+    weak_match = client.patch(path, json={"is_completed": True}, headers={"If-Match": f"W/{etag}"})
+    weak_not_modified = client.get(path, headers={"If-None-Match": f"W/{etag}"})
+    strong_match = client.patch(path, json={"is_completed": True}, headers={"If-Match": etag})
+
+    assert not etag.startswith("W/")
+    assert weak_match.status_code == 412
+    assert weak_not_modified.status_code == 304
+    assert strong_match.status_code == 200
+
+
+def _round_like_sql_server_datetime(value: datetime) -> datetime:
+    # DATETIME keeps 1/300 s ticks: .000, .003, .007 and so on.
+    midnight = value.replace(hour=0, minute=0, second=0, microsecond=0)
+    ticks = round((value - midnight) / timedelta(seconds=1) * 300)
+    return midnight + timedelta(microseconds=round(ticks * 1_000_000 / 300))
+
+
+def _round_stored_datetime(value):
+    # SQLite binds datetimes as "YYYY-MM-DD HH:MM:SS.ffffff" strings.
+    if isinstance(value, str) and SQLITE_DATETIME.fullmatch(value):
+        rounded = _round_like_sql_server_datetime(datetime.fromisoformat(value))
+        return rounded.isoformat(sep=" ", timespec="microseconds")
+    return value
+
+
+def test_write_responses_match_timestamps_as_stored(client: TestClient, db_session: Session) -> None:
+    def round_datetimes(conn, cursor, statement, parameters, context, executemany):
+        def round_row(row):
+            return tuple(_round_stored_datetime(value) for value in row)
+
+        return statement, [round_row(row) for row in parameters] if executemany else round_row(parameters)
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", round_datetimes, retval=True)
+    try:
+        created = client.post("/api/v1/todos", json={"title": "Rounded"})
+        path = f"/api/v1/todos/{created.json()['id']}"
+        fetched = client.get(path)
+        updated = client.patch(path, json={"is_completed": True}, headers={"If-Match": created.headers["etag"]})
+        refetched = client.get(path)
+    finally:
+        event.remove(engine, "before_cursor_execute", round_datetimes)
+
+    assert created.json() == fetched.json()
+    assert created.headers["etag"] == fetched.headers["etag"]
+    assert updated.status_code == 200
+    assert updated.json() == refetched.json()
+    assert updated.headers["etag"] == refetched.headers["etag"]
+
+
+def test_serialize_todo_list_matches_per_row_rendering(client: TestClient, db_session) -> None:
+    client.post("/api/v1/todos", json={"title": "Caf\u00e9 \"quoted\"", "category": "Work"})
+    client.post("/api/v1/todos", json={"title": "Second"})
+    todos = db_session.query(Todo).all()
+
+    expected = JSONResponse([TodoResponse.model_validate(todo).model_dump(mode="json") for todo in todos]).body
+
+    assert serialize_todo_list(todos) == expected
+
+
+def test_import_todos_streams_csv_and_exposes_job(client: TestClient) -> None:
+    client.post("/api/v1/todos", json={"title": "Existing", "category": "home"})
+    body = "title,category\nImported,work\nexisting,HOME\n,work\n"
+
+    response = client.post("/api/v1/todos:import?format=csv", content=body, headers={"content-type": "text/csv"})
+    job = response.json()
+    polled = client.get(f"/api/v1/todos/imports/{job['job_id']}")
+
+    assert response.status_code == 200
+    assert (job["status"], job["rows_read"], job["created"], job["duplicates"], job["invalid"]) == (
+        "completed",
+        3,
+        1,
+        1,
+        1,
+    )
+    assert [(error["line"], error["code"]) for error in job["errors"]] == [
+        (3, "TODO_DUPLICATE"),
+        (4, "TODO_VALIDATION_ERROR"),
+    ]
+    assert polled.json()["job_id"] == job["job_id"]
+    assert [todo["title"] for todo in client.get("/api/v1/todos").json()] == ["Imported", "Existing"]
+
+
+def test_import_todos_rejects_csv_without_title_and_unknown_jobs(client: TestClient) -> None:
+    response = client.post("/api/v1/todos:import?format=csv", content="name\nA\n")
+
+    assert response.status_code == 422
+    assert client.get("/api/v1/todos/imports/missing").json()["error"]["code"] == "IMPORT_JOB_NOT_FOUND"
+
+
+def test_list_todos_filters_and_sorts(client: TestClient) -> None:
+    for title, category in [("Alpha", "Work"), ("Beta", "home"), ("Gamma", "work")]:
+        client.post("/api/v1/todos", json={"title": title, "category": category})
+    beta = client.get("/api/v1/todos", params={"category": "HOME"}).json()[0]
+    client.patch(f"/api/v1/todos/{beta['id']}", json={"is_completed": True})
+
+    work = client.get("/api/v1/todos", params={"category": " work ", "sort": "created_asc"})
+    open_items = client.get("/api/v1/todos", params={"is_completed": "false"})
+    recently_updated = client.get("/api/v1/todos", params={"updated_since": beta["updated_at"], "sort": "updated_desc"})
+    future = client.get("/api/v1/todos", params={"created_after": "2999-01-01T00:00:00+02:00"})
+
+    assert [todo["title"] for todo in work.json()] == ["Alpha", "Gamma"]
+    assert [todo["title"] for todo in open_items.json()] == ["Gamma", "Alpha"]
+    assert [todo["title"] for todo in recently_updated.json()][0] == "Beta"
+    assert future.json() == []
+    assert client.get("/api/v1/todos", params={"sort": "title"}).status_code == 422
+    assert client.get("/api/v1/todos", params={"category": "   "}).status_code == 422
+
+
+def test_search_todos_matches_title_words(client: TestClient) -> None:
+    for title in ["Buy milk", "Buy oat milk", "Walk dog"]:
+        client.post("/api/v1/todos", json={"title": title})
+
+    first_page = client.get("/api/v1/todos/search", params={"q": "milk", "limit": 1})
+    last_page = client.get(
+        "/api/v1/todos/search", params={"q": "milk", "limit": 1, "cursor": first_page.headers["x-next-cursor"]}
+    )
+
+    assert [todo["title"] for todo in first_page.json()] == ["Buy oat milk"]
+    assert [todo["title"] for todo in last_page.json()] == ["Buy milk"]
+    assert "x-next-cursor" not in last_page.headers
+    assert client.get("/api/v1/todos/search", params={"q": "cheese"}).json() == []
+    assert client.get("/api/v1/todos/search", params={"q": "!!"}).status_code == 422
+
+
+def test_stats_report_totals_per_category(client: TestClient) -> None:
+    for title, category in [("Alpha", "Work"), ("Beta", "work"), ("Gamma", "Home")]:
+        client.post("/api/v1/todos", json={"title": title, "category": category})
+    beta = client.get("/api/v1/todos", params={"category": "work"}).json()[0]
+    client.patch(f"/api/v1/todos/{beta['id']}", json={"is_completed": True})
+
+    response = client.get("/api/v1/todos/stats")
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "total": 3,
+        "completed": 1,
+        "open": 2,
+        "categories": [
+            {"category": "home", "total": 1, "completed": 0, "open": 1},
+            {"category": "work", "total": 2, "completed": 1, "open": 1},
+        ],
+    }
+
+
+def test_changes_feed_returns_upserts_and_tombstones(client: TestClient) -> None:
+    kept = client.post("/api/v1/todos", json={"title": "Keep"}).json()
+    removed = client.post("/api/v1/todos", json={"title": "Remove"}).json()
+    initial = client.get("/api/v1/todos/changes").json()
+
+    client.patch(f"/api/v1/todos/{kept['id']}", json={"is_completed": True})
+    client.delete(f"/api/v1/todos/{removed['id']}")
+    delta = client.get("/api/v1/todos/changes", params={"since": initial["next_token"]}).json()
+
+    assert [todo["title"] for todo in initial["todos"]] == ["Keep", "Remove"]
+    assert [(todo["id"], todo["is_completed"]) for todo in delta["todos"]] == [(kept["id"], True)]
+    assert delta["deleted_ids"] == [removed["id"]]
+    assert delta["has_more"] is False
+    assert client.get("/api/v1/todos/changes", params={"since": "bogus"}).status_code == 422
+
+
+def test_single_item_endpoints_stay_within_query_budgets(client: TestClient, query_counter: QueryCounter) -> None:
+    # The first write also creates the sequence and stats rows; budgets describe the steady state.
+    client.post("/api/v1/todos", json={"title": "Warm up", "category": "home"})
+
+    with query_counter.assert_max_queries(6):
+        created = client.post("/api/v1/todos", json={"title": "Buy milk", "category": "home"})
+    todo_id = created.json()["id"]
+    with query_counter.assert_max_queries(1):
+        client.get(f"/api/v1/todos/{todo_id}")
+    with query_counter.assert_max_queries(1):
+        client.get("/api/v1/todos")
+    # Fetch, duplicate check, sequence, token load, update, token insert and delete, then the reload
+    # that returns the timestamps as stored.
+    with query_counter.assert_max_queries(8):
+        client.patch(f"/api/v1/todos/{todo_id}", json={"title": "Buy oats"})
+    with query_counter.assert_max_queries(5):
+        client.patch(f"/api/v1/todos/{todo_id}", json={"is_completed": True})
+    # Fetch, sequence, tombstone replace and insert, stats update and cleanup, delete; the title
+    # tokens go through the FK cascade.
+    with query_counter.assert_max_queries(7):
+        deleted = client.delete(f"/api/v1/todos/{todo_id}")
+
+    assert deleted.status_code == 204
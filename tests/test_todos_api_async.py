@@ -1,6 +1,13 @@
+import threading
+from collections.abc import AsyncIterator
+
 import pytest
 from httpx import AsyncClient
 
+from app.core.cache import MemoryResponseCache
+from app.core.events import EventBroker, MemoryEventBackend, get_event_broker
+from app.main import app
+
 
 @pytest.mark.asyncio
 async def test_health_endpoint(async_client: AsyncClient) -> None:
@@ -51,3 +58,107 @@ async def test_patch_requires_payload_fields(async_client: AsyncClient) -> None:
     payload = response.json()
     assert payload["error"]["code"] == "REQUEST_VALIDATION_ERROR"
     assert payload["error"]["trace_id"]
+
+
+@pytest.mark.asyncio
+async def test_crud_contract_over_async_driver(async_driver_client: AsyncClient) -> None:
+    create_response = await async_driver_client.post("/api/v1/todos", json={"title": "Async driver"})
+    created = create_response.json()
+
+    patch_response = await async_driver_client.patch(
+        f"/api/v1/todos/{created['id']}",
+        json={"category": "work", "is_completed": True},
+    )
+    list_response = await async_driver_client.get("/api/v1/todos")
+    delete_response = await async_driver_client.delete(f"/api/v1/todos/{created['id']}")
+    missing_response = await async_driver_client.delete(f"/api/v1/todos/{created['id']}")
+
+    assert create_response.status_code == 201
+    assert patch_response.status_code == 200
+    assert patch_response.json()["category"] == "work"
+    assert patch_response.json()["is_completed"] is True
+    assert [todo["id"] for todo in list_response.json()] == [created["id"]]
+    assert delete_response.status_code == 204
+    assert missing_response.status_code == 404
+    assert missing_response.json()["error"]["code"] == "TODO_NOT_FOUND"
+
+
+@pytest.mark.asyncio
+async def test_async_driver_sends_cache_bumps_and_events_off_the_event_loop(
+    async_driver_client: AsyncClient, response_cache: MemoryResponseCache, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    backend = MemoryEventBackend()
+    threads: list[tuple[str, int]] = []
+    bump_version, publish = response_cache.bump_version, backend.publish
+    monkeypatch.setattr(
+        response_cache, "bump_version", lambda: threads.append(("bump", threading.get_ident())) or bump_version()
+    )
+    monkeypatch.setattr(
+        backend, "publish", lambda event: threads.append((event.type, threading.get_ident())) or publish(event)
+    )
+    app.dependency_overrides[get_event_broker] = lambda: EventBroker(backend, max_queue=8)
+
+    created = await async_driver_client.post("/api/v1/todos", json={"title": "Off the loop"})
+
+    assert created.status_code == 201
+    assert [name for name, _ in threads] == ["bump", "todo.created"]
+    assert threading.get_ident() not in {thread for _, thread in threads}
+    assert response_cache.get_version() == 1
+
+
+@pytest.mark.asyncio
+async def test_db_pool_stats_endpoint(async_client: AsyncClient) -> None:
+    response = await async_client.get("/internal/db-pool")
+
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["sync"]["checkouts"] >= 0
+    assert "checkout_wait_ms_max" in payload["sync"]
+
+
+@pytest.mark.asyncio
+async def test_trace_id_header_is_echoed_or_generated(async_client: AsyncClient) -> None:
+    echoed = await async_client.get("/health", headers={"x-trace-id": "trace-123"})
+    generated = await async_client.get("/health")
+
+    assert echoed.headers["x-trace-id"] == "trace-123"
+    assert generated.headers["x-trace-id"]
+    assert generated.headers["x-trace-id"] != "trace-123"
+
+
+@pytest.mark.asyncio
+async def test_request_completed_log_reports_final_status(
+    async_client: AsyncClient,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    with caplog.at_level("INFO", logger="app.request"):
+        await async_client.patch("/api/v1/todos/9999", json={"title": "missing"})
+
+    record = next(record for record in caplog.records if record.getMessage() == "request_completed")
+    assert record.route == "/api/v1/todos/9999"
+    assert record.method == "PATCH"
+    assert record.status_code == 404
+    assert record.latency_ms >= 0
+
+
+@pytest.mark.asyncio
+async def test_import_job_can_be_polled_while_the_upload_is_running(async_client: AsyncClient) -> None:
+    polled: list[dict] = []
+
+    async def upload() -> AsyncIterator[bytes]:
+        yield b"title\nFirst\nSecond\n"
+        # The server asks for the next chunk only after reading the first one.
+        polled.append((await async_client.get("/api/v1/todos/imports/upload-1")).json())
+        yield b"Third\n"
+
+    response = await async_client.post("/api/v1/todos:import?format=csv&job_id=upload-1", content=upload())
+    conflict = await async_client.post("/api/v1/todos:import?format=csv&job_id=upload-1", content=b"title\nX\n")
+
+    assert (polled[0]["status"], polled[0]["rows_read"]) == ("running", 2)
+    assert (response.json()["job_id"], response.json()["status"], response.json()["created"]) == (
+        "upload-1",
+        "completed",
+        3,
+    )
+    assert conflict.status_code == 409
+    assert conflict.json()["error"]["code"] == "IMPORT_JOB_EXISTS"